@@ -1,7 +1,14 @@
-from azure.functions import AuthLevel, FunctionApp, DecoratorApi
+from azure.functions import AuthLevel, FunctionApp
 from deployment import BLUEPRINTS
+from libs.azure.functions.manifest import (
+    blueprint_files,
+    import_blueprints,
+    read_manifest,
+    register_from_manifest,
+)
+from libs.utils.import_profiler import finish_profile, profile
 
-import importlib.util, inspect, os, logging
+import os, logging
 
 logger = logging.getLogger("azure")
 logger.setLevel(logging.WARNING)
@@ -27,64 +34,17 @@ def find_blueprints(path):
     It scans the path for Python files and processes them as blueprints.
 
     Steps:
-    1. Initialize variables for recursive and single-file search.
-    2. Check if the path ends with "/*" to determine if it is recursive.
-    3. Check if the path ends with "/" to determine if it is a single file.
-    4. Define a function to process a single file.
-    5. If it is a single file, process it.
-    6. If it is recursive, scan the path for Python files and process each file.
-    7. Return the list of registered blueprints.
+    1. List the Python files matched by the path: every file below the directory if
+       it ends with "/*", the files directly in it if it ends with "/", and a single
+       file otherwise.
+    2. Import each file and collect its blueprints.
+    3. Return the list of found blueprints.
 
     The find_blueprints method can be used to find and retrieve blueprints from a specific path.
     """
     blueprints = []
-    recursive = False
-    single_file = False
-
-    # Check if path ends with /*
-    if path.endswith("/*"):
-        path = path[:-2]  # Remove /* from the end
-        recursive = True
-    elif path.endswith("/"):
-        path = path[:-1]  # Remove / from the end
-    else:
-        single_file = True  # If it doesn't end with / or /*, assume it's a single file
-
-    # Function to process a single file
-    def process_file(file_path):
-        # Check if the file exists
-        if not os.path.exists(file_path):
-            return
-
-        # Load the module
-        spec = importlib.util.spec_from_file_location(
-            os.path.basename(file_path)[:-3], file_path
-        )
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        # Scan the module for Blueprint instances
-        for _, obj in inspect.getmembers(module):
-            if issubclass(type(obj), DecoratorApi):
-                blueprints.append(obj)
-
-    # If it's a single file, just process it
-    if single_file:
-        if not path.endswith(".py"):
-            path += ".py"
-        process_file(path)
-    else:
-        # Scan the path for .py files
-        for root, _, files in os.walk(path):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    process_file(file_path)
-
-            # If not recursive, break after the first path
-            if not recursive:
-                break
-
+    for file_path in blueprint_files(path):
+        blueprints.extend(bp for _, bp in import_blueprints(file_path))
     return blueprints
 
 
@@ -92,6 +52,17 @@ app = FunctionApp(http_auth_level=AuthLevel.ANONYMOUS)
 debug = os.environ.get("DEBUG", "false").lower() == "true"
 site_name = os.environ.get("WEBSITE_SITE_NAME", os.environ.get("FUNCTION_NAME", ""))
 
+# A manifest built with `python -m libs.azure.functions.manifest build` registers the
+# functions without importing their modules until they are first invoked.
+manifest = read_manifest(os.environ.get("FUNCTION_MANIFEST", "function_manifest.json"))
+
 for path in BLUEPRINTS[site_name] + (BLUEPRINTS["debug"] if debug else []):
-    for bp in find_blueprints(path):
-        app.register_functions(bp)
+    with profile(path, kind="path"):
+        if manifest and register_from_manifest(app, manifest, path):
+            continue
+        for bp in find_blueprints(path):
+            app.register_functions(bp)
+
+# Opt-in: with IMPORT_PROFILE set, report the import cost of each blueprint and
+# fail if it exceeds the IMPORT_BUDGET_* limits.
+finish_profile(site_name)
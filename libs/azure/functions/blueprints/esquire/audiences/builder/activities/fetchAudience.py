@@ -52,8 +52,7 @@ def activity_esquireAudienceBuilder_fetchAudience(ingress: dict):
             "sql",
             url=os.environ["DATABIND_SQL_KEYSTONE"],
             schemas=["keystone"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
     provider = from_bind("keystone")
     if provider is None:
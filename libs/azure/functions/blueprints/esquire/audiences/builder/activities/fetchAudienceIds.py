@@ -30,8 +30,7 @@ def activity_esquireAudienceBuilder_fetchAudienceIds(ingress: dict):
             "sql",
             url=os.environ["DATABIND_SQL_KEYSTONE"],
             schemas=["keystone"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
     provider = from_bind("keystone")
     audience = provider.models["keystone"]["Audience"]
@@ -91,8 +91,7 @@ def activity_esquireAudiencesBuilder_putAudience(ingress: Dict[str, Any]) -> Dic
             "sql",
             url=os.environ["DATABIND_SQL_KEYSTONE"],
             schemas=["keystone"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
     provider = from_bind("keystone")
     Audience = provider.models["keystone"]["Audience"]  # SQLAlchemy mapped class
@@ -12,8 +12,7 @@ if not from_bind("keystone"):
             "sales":None, 
             "utils":["estated"]
             },
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
 if not from_bind("general"):
     register_binding(
@@ -22,8 +21,7 @@ if not from_bind("general"):
         "sql",
         url=os.environ["DATABIND_SQL_GENERAL"],
         schemas={"dbo":None},
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
 if not from_bind("audiences"):
     register_binding(
@@ -32,8 +30,7 @@ if not from_bind("audiences"):
         "sql",
         url=os.environ["DATABIND_SQL_AUDIENCES"],
         schemas={"dbo":None},
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
 
 MAPPING_DATASOURCE = {
@@ -234,8 +234,7 @@ def enforce_bindings():
             "sql",
             url=os.environ["DATABIND_SQL_KEYSTONE"],
             schemas=["keystone", "sales"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
     if not from_bind("general"):
         register_binding(
@@ -244,8 +243,7 @@ def enforce_bindings():
             "sql",
             url=os.environ["DATABIND_SQL_GENERAL"],
             schemas=["dbo"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
     if not from_bind("audiences"):
         register_binding(
@@ -254,8 +252,7 @@ def enforce_bindings():
             "sql",
             url=os.environ["DATABIND_SQL_AUDIENCES"],
             schemas=["dbo"],
-            pool_size=1000,
-            max_overflow=100,
+            pool_size="auto",
         )
 
     MAPPING_DATASOURCE = {
@@ -11,6 +11,5 @@ if not from_bind("keystone"):
         "sql",
         url=os.environ["DATABIND_SQL_KEYSTONE"],
         schemas={"keystone": None},
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
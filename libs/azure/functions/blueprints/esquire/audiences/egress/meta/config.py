@@ -8,8 +8,7 @@ if not from_bind("keystone"):
         "sql",
         url=os.environ["DATABIND_SQL_KEYSTONE"],
         schemas={"keystone": None},
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
 if not from_bind("audiences"):
     register_binding(
@@ -18,6 +17,5 @@ if not from_bind("audiences"):
         "sql",
         url=os.environ["DATABIND_SQL_AUDIENCES"],
         schemas={"dbo": None},
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
\ No newline at end of file
@@ -15,8 +15,7 @@ if not from_bind("audiences"):
         "sql",
         url=os.environ["DATABIND_SQL_AUDIENCES"],
         schemas=["dbo"],
-        pool_size=1000,
-        max_overflow=100
+        pool_size="auto"
     )
 
 # if not from_bind("salesforce"):
@@ -17,8 +17,7 @@ if not from_bind("keystone"):
         "sql",
         url=os.environ["DATABIND_SQL_KEYSTONE"],
         schemas=["keystone"],
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
 
 # if not from_bind("salesforce"):
@@ -11,6 +11,9 @@ import orjson as json, numpy as np, os, pandas as pd
 # Create a Blueprint instance for defining Azure Functions
 bp = Blueprint()
 
+# maximum number of zipcodes per query (MS SQL parses at most ~2100 parameters)
+max_sql_parameters = 1000
+
 # Define an activity function
 @bp.activity_trigger(input_name="settings")
 def activity_campaignProposal_collectMovers(settings: dict):
@@ -36,50 +39,38 @@ def activity_campaignProposal_collectMovers(settings: dict):
     start_date = end_date - timedelta(days=num_days)
 
     # initialize objects needed for the mover data collection
-    address_to_zipcodes = []
-    unique_zipcodes_list = []
     radii = settings['moverRadii']
     zipcode_engine = ZipcodeEngine(from_bind("legacy"))
     mover_engine = MoverEngine(from_bind("audiences"))
 
     # INDIVIDUAL LOCATION COUNTS
-    # on the first run-through, we grab all the unique zipcodes and map each addr/radius with its associated zipcodes 
-    for i, addr in addresses.iterrows():
-        # print(addr['address'])
-        # addr_dict = {
-        #     **addr
-        # }
-
-        # mapping between each addr/radius pair and the zipcodes within it
+    # get the zipcodes within each radius of each address in a single query
+    radius_zips = zipcode_engine.load_from_radii(
+        points=addresses[['latitude', 'longitude']].to_numpy(),
+        radii=[1609 * radius for radius in radii]
+    )
+    radius_zips = radius_zips.groupby(['point_id', 'radius'])['zipcode'].unique()
+
+    # map each addr/radius pair with its associated zipcodes
+    address_to_zipcodes = []
+    for point_id, i in enumerate(addresses.index):
         mapping_dict = {
             "addr_index":i,
         }
-
         for radius in radii:
-            # print('\t',radius)
-            # get zipcodes in radius around store latlong
-            zip_radius_list = zipcode_engine.load_from_radius(
-                latitude=addr["latitude"], longitude=addr["longitude"], radius=1609 * radius
-            )
-            zips = pd.DataFrame(zip_radius_list)
-            if not len(zips):
+            if (point_id, 1609 * radius) not in radius_zips.index:
                 raise Exception(f"Error: No zipcodes found within {radius} miles of the address at index {i}.")
-            zips["GeoJSON"] = zips["GeoJSON"].apply(json.loads)
-
-            # store the unique zipcode geometries (for mapping purposes later)
-            for i, z in zips.iterrows():
-                if z['Zipcode'] not in [item['Zipcode'] for item in unique_zipcodes_list]:
-                    unique_zipcodes_list.append({
-                        'Zipcode':z['Zipcode'],
-                        'GeoJSON':z['GeoJSON']  
-                    })
-            
-            # update the add/radius -> zipcodes mapping
-            mapping_dict[f"zips_{radius}"] = zips['Zipcode'].unique()    
+            mapping_dict[f"zips_{radius}"] = radius_zips[(point_id, 1609 * radius)]
         address_to_zipcodes.append(mapping_dict)
 
-    # DataFrame of all unique zipcodes and their corresponding geometry
-    unique_zipcodes = pd.DataFrame(unique_zipcodes_list)
+    # DataFrame of all unique zipcodes and their corresponding geometry (for mapping purposes later)
+    zipcode_list = list(np.unique(np.hstack(radius_zips.to_list())))
+    unique_zipcodes = pd.DataFrame([
+        row
+        for start in range(0, len(zipcode_list), max_sql_parameters)
+        for row in zipcode_engine.load_from_list(zipcode_list[start:start + max_sql_parameters])
+    ])[['Zipcode', 'GeoJSON']]
+    unique_zipcodes["GeoJSON"] = unique_zipcodes["GeoJSON"].apply(json.loads)
 
     # get mover counts for each zipcode
     zipcode_mover_counts = dict(mover_engine.load_from_zipcodes(
@@ -8,8 +8,7 @@ if not from_bind("audiences"):
         "sql",
         url=os.environ["DATABIND_SQL_AUDIENCES"],
         schemas=["dbo"],
-        pool_size=1000,
-        max_overflow=100
+        pool_size="auto"
 )
     
 if not from_bind("keystone"):
@@ -19,8 +18,7 @@ if not from_bind("keystone"):
         "sql",
         url=os.environ["DATABIND_SQL_KEYSTONE"],
         schemas=["keystone"],
-        pool_size=1000,
-        max_overflow=100,
+        pool_size="auto",
     )
     
 if not from_bind("legacy"):
@@ -30,6 +28,5 @@ if not from_bind("legacy"):
         "sql",
         url=os.environ["DATABIND_SQL_UNIVERSAL"],
         schemas=["dbo","esquire"],
-        pool_size=1000,
-        max_overflow=100
+        pool_size="auto"
 )
\ No newline at end of file
@@ -1,9 +1,10 @@
 # File: libs/azure/functions/blueprints/esquire/audiences/daily_audience_generation/activities/read_cache.py
 
 from azure.durable_functions import Blueprint
+from libs.utils.geometry_conversion import convert
 from sqlalchemy import create_engine
 from typing import List
-import pandas as pd, os, shapely, geojson
+import pandas as pd, os
 
 bp: Blueprint = Blueprint()
 
@@ -26,6 +27,6 @@ def activity_rooftopPolys_readCache(addresses: List[str]):
     df = pd.read_sql(read_query, pg_engine)
 
     if not df.empty:
-        df["boundary"] = df["boundary"].apply(lambda x: geojson.dumps(shapely.geometry.mapping(shapely.from_wkb(x))))
+        df["boundary"] = convert(df["boundary"], "wkb", "geojson")
         return df[["query", "boundary"]].to_dict()
     return {}
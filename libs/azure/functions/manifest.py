@@ -0,0 +1,564 @@
+# File: libs/azure/functions/manifest.py
+
+from azure.functions import Blueprint, DecoratorApi
+from azure.functions.decorators.core import BindingDirection, DataType, Setting
+from azure.functions.decorators.function_app import Function, FunctionBuilder
+from azure.functions.decorators.generic import (
+    GenericInputBinding,
+    GenericOutputBinding,
+    GenericTrigger,
+)
+from azure.functions.decorators.utils import StringifyEnumJsonEncoder
+from libs.utils.import_profiler import profile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import argparse, hashlib, importlib, importlib.util, inspect, json, logging, os, re, subprocess, sys, threading, typing
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST = "function_manifest.json"
+
+_MODULES: Dict[str, Any] = {}
+_LOCK = threading.RLock()
+
+
+def blueprint_files(path: str) -> List[str]:
+    """
+    List the blueprint files matched by a `deployment.BLUEPRINTS` path.
+
+    Parameters
+    ----------
+    path : str
+        The blueprint path. A path ending with "/*" matches every Python file below
+        the directory, one ending with "/" the Python files directly in it, and any
+        other path a single file (the ".py" suffix is optional).
+
+    Returns
+    -------
+    List[str]
+        The paths of the existing matching files, in walk order.
+    """
+
+    recursive = False
+    if path.endswith("/*"):
+        path = path[:-2]
+        recursive = True
+    elif path.endswith("/"):
+        path = path[:-1]
+    else:
+        if not path.endswith(".py"):
+            path += ".py"
+        return [path] if os.path.exists(path) else []
+
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            if name.endswith(".py"):
+                files.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return files
+
+
+def import_blueprints(file_path: str) -> List[Tuple[str, DecoratorApi]]:
+    """
+    Import a blueprint file and collect the blueprints it defines.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the Python file.
+
+    Returns
+    -------
+    List[Tuple[str, DecoratorApi]]
+        The attribute name and instance of every blueprint in the module.
+
+    Notes
+    -----
+    When import profiling is enabled (see `libs.utils.import_profiler`), the import
+    is measured.
+    """
+
+    spec = importlib.util.spec_from_file_location(
+        os.path.basename(file_path)[:-3], file_path
+    )
+    module = importlib.util.module_from_spec(spec)
+    with profile(file_path):
+        spec.loader.exec_module(module)
+    return [
+        (name, obj)
+        for name, obj in inspect.getmembers(module)
+        if issubclass(type(obj), DecoratorApi)
+    ]
+
+
+def describe_function(function: Function) -> dict:
+    """
+    Describe a registered function so it can be registered again without its module.
+
+    Parameters
+    ----------
+    function : Function
+        The function, as held by a blueprint's function builder.
+
+    Returns
+    -------
+    dict
+        The function's name, bindings (in function.json form), settings, HTTP type,
+        and the signature of the callable the worker will invoke.
+    """
+
+    bindings = function.get_bindings()
+    user_function = function.get_user_function()
+    signature = inspect.signature(user_function)
+    annotations = getattr(user_function, "__annotations__", {})
+    return {
+        "name": function.get_function_name(),
+        "bindings": [_normalize(binding.get_dict_repr()) for binding in bindings],
+        "trigger": bindings.index(function.get_trigger()),
+        "settings": [_normalize(setting.get_dict_repr()) for setting in function._settings],
+        "http_type": function.http_type,
+        "is_async": inspect.iscoroutinefunction(user_function),
+        "parameters": [
+            {
+                "name": parameter.name,
+                "kind": parameter.kind.name,
+                "annotation": _encode_annotation(
+                    annotations.get(parameter.name, inspect.Parameter.empty)
+                ),
+            }
+            for parameter in signature.parameters.values()
+        ],
+        "returns": _encode_annotation(annotations.get("return", inspect.Parameter.empty)),
+    }
+
+
+def build_manifest(paths: Iterable[str]) -> dict:
+    """
+    Import the blueprints of the given paths and describe their functions.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The `deployment.BLUEPRINTS` paths to describe.
+
+    Returns
+    -------
+    dict
+        The manifest. Paths whose files fail to import are left out, so they are
+        loaded eagerly at runtime.
+
+    Example
+    -------
+    >>> from deployment import BLUEPRINTS
+    >>> manifest = build_manifest(BLUEPRINTS["esquire-meta"])
+    >>> write_manifest(manifest, "function_manifest.json")
+    """
+
+    manifest = {"version": MANIFEST_VERSION, "paths": {}}
+    for path in dict.fromkeys(paths):
+        records = []
+        try:
+            for file_path in blueprint_files(path):
+                functions = []
+                for attribute, blueprint in import_blueprints(file_path):
+                    for builder in blueprint._function_builders:
+                        functions.append(
+                            {"blueprint": attribute, **describe_function(builder._function)}
+                        )
+                records.append(
+                    {"file": file_path, "sha1": _digest(file_path), "functions": functions}
+                )
+        except Exception:
+            logger.exception(f"Unable to describe the blueprints of '{path}'.")
+            continue
+        manifest["paths"][path] = records
+    return manifest
+
+
+def write_manifest(manifest: dict, path: str = DEFAULT_MANIFEST) -> None:
+    """
+    Write a manifest to a JSON file.
+    """
+
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=1)
+
+
+def read_manifest(path: str = DEFAULT_MANIFEST) -> Optional[dict]:
+    """
+    Read a manifest from a JSON file.
+
+    Returns
+    -------
+    dict or None
+        The manifest, or None when the path is empty, missing, or written by an
+        incompatible version.
+    """
+
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as file:
+        manifest = json.load(file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.warning(f"Ignoring '{path}': unsupported manifest version.")
+        return None
+    return manifest
+
+
+def register_from_manifest(app: Any, manifest: dict, path: str) -> bool:
+    """
+    Register the functions of a blueprint path from the manifest.
+
+    The functions are registered with their recorded bindings and signature, and
+    their module is only imported the first time one of them is invoked.
+
+    Parameters
+    ----------
+    app : FunctionApp
+        The app to register the functions with.
+    manifest : dict
+        The manifest, as returned by `read_manifest`.
+    path : str
+        The `deployment.BLUEPRINTS` path.
+
+    Returns
+    -------
+    bool
+        Whether the functions were registered. False when the path is missing from
+        the manifest or one of its files changed since the manifest was built, in
+        which case the caller should load the path eagerly.
+    """
+
+    records = manifest["paths"].get(path)
+    if records is None:
+        return False
+    if sorted(record["file"] for record in records) != sorted(blueprint_files(path)) or any(
+        _digest(record["file"]) != record["sha1"] for record in records
+    ):
+        logger.warning(f"The manifest is stale for '{path}', loading it eagerly.")
+        return False
+
+    blueprint = Blueprint()
+    for record in records:
+        for entry in record["functions"]:
+            blueprint._function_builders.append(_function_builder(record["file"], entry))
+    app.register_functions(blueprint)
+    return True
+
+
+def _function_builder(file_path: str, entry: dict) -> FunctionBuilder:
+    builder = FunctionBuilder(_lazy_function(file_path, entry), "function_app.py")
+    for index, spec in enumerate(entry["bindings"]):
+        if index == entry["trigger"]:
+            builder.add_trigger(_binding(spec, trigger=True))
+        else:
+            builder.add_binding(_binding(spec, trigger=False))
+    for spec in entry["settings"]:
+        builder.add_setting(_ManifestSetting(**spec))
+    builder.configure_http_type(entry["http_type"])
+    return builder
+
+
+def _binding(spec: dict, trigger: bool) -> Any:
+    spec = dict(spec)
+    name, type_, direction = spec.pop("name"), spec.pop("type"), spec.pop("direction")
+    data_type = spec.pop("dataType", None)
+    if trigger:
+        cls = GenericTrigger
+    elif direction == BindingDirection.OUT.name:
+        cls = GenericOutputBinding
+    else:
+        cls = GenericInputBinding
+    binding = cls(
+        name=name,
+        type=type_,
+        data_type=DataType[data_type] if data_type else None,
+        # The generic bindings camel-case their keyword arguments back into function.json keys.
+        **{_snake_case(key): value for key, value in spec.items()},
+    )
+    binding._direction = binding._dict["direction"] = BindingDirection[direction]
+    return binding
+
+
+class _ManifestSetting(Setting):
+    def __init__(self, setting_name: str, **kwargs) -> None:
+        super().__init__(setting_name=setting_name)
+
+
+def _lazy_function(file_path: str, entry: dict) -> Callable:
+    target = None
+
+    def resolve() -> Callable:
+        nonlocal target
+        if target is None:
+            target = _load_function(file_path, entry["blueprint"], entry["name"])
+        return target
+
+    if entry["is_async"]:
+
+        async def function(*args, **kwargs):
+            return await resolve()(*args, **kwargs)
+
+    else:
+
+        def function(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+
+    # The worker binds arguments by inspecting the signature and annotations.
+    parameters, annotations = [], {}
+    for spec in entry["parameters"]:
+        annotation = _decode_annotation(spec["annotation"])
+        parameters.append(
+            inspect.Parameter(
+                spec["name"],
+                getattr(inspect.Parameter, spec["kind"]),
+                annotation=annotation,
+            )
+        )
+        if annotation is not inspect.Parameter.empty:
+            annotations[spec["name"]] = annotation
+    returns = _decode_annotation(entry["returns"])
+    if returns is not inspect.Parameter.empty:
+        annotations["return"] = returns
+    function.__name__ = function.__qualname__ = entry["name"]
+    function.__signature__ = inspect.Signature(parameters, return_annotation=returns)
+    function.__annotations__ = annotations
+    return function
+
+
+def _load_function(file_path: str, attribute: str, name: str) -> Callable:
+    with _LOCK:
+        if file_path not in _MODULES:
+            logger.info(f"Importing '{file_path}' for function '{name}'.")
+            _MODULES[file_path] = dict(import_blueprints(file_path))
+        blueprint = _MODULES[file_path][attribute]
+    for builder in blueprint._function_builders:
+        if builder._function.get_function_name() == name:
+            return builder._function.get_user_function()
+    raise LookupError(f"Function '{name}' is not defined in '{file_path}'.")
+
+
+def _normalize(value: dict) -> dict:
+    return json.loads(json.dumps(value, cls=StringifyEnumJsonEncoder))
+
+
+def _snake_case(key: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key).lower()
+
+
+def _digest(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _encode_annotation(annotation: Any) -> Optional[dict]:
+    # Annotations are stored as import paths; anything else (e.g. string forward
+    # references) is dropped, which the worker treats as an unannotated parameter.
+    if annotation is inspect.Parameter.empty:
+        return None
+    if annotation is None:
+        return {"path": "builtins:None"}
+    if annotation is type(None):
+        return {"path": "builtins:NoneType"}
+    origin = typing.get_origin(annotation)
+    if origin is not None:
+        args = [_encode_annotation(arg) for arg in typing.get_args(annotation)]
+        encoded = _encode_annotation(origin)
+        if encoded is None or None in args:
+            return None
+        return {**encoded, "args": args}
+    module = getattr(annotation, "__module__", None)
+    name = getattr(annotation, "__qualname__", None) or getattr(annotation, "_name", None)
+    if not module or not name or "<" in name:
+        return None
+    return {"path": f"{module}:{name}"}
+
+
+def _decode_annotation(spec: Optional[dict]) -> Any:
+    if spec is None:
+        return inspect.Parameter.empty
+    try:
+        module, name = spec["path"].split(":")
+        if spec["path"] == "builtins:None":
+            return None
+        if spec["path"] == "builtins:NoneType":
+            return type(None)
+        value = importlib.import_module(module)
+        for part in name.split("."):
+            value = getattr(value, part)
+        if "args" in spec:
+            args = tuple(_decode_annotation(arg) for arg in spec["args"])
+            value = value[args if len(args) > 1 else args[0]]
+        return value
+    except Exception:
+        logger.debug(f"Unable to resolve the annotation {spec}.")
+        return inspect.Parameter.empty
+
+
+def benchmark(sites: Iterable[str], manifest: str = DEFAULT_MANIFEST, repeat: int = 3) -> List[dict]:
+    """
+    Measure the cold-start import time of `function_app` per site.
+
+    Each measurement imports `function_app` in a fresh interpreter, once with eager
+    blueprint loading and once with the manifest.
+
+    Parameters
+    ----------
+    sites : Iterable[str]
+        The sites (keys of `deployment.BLUEPRINTS`) to measure.
+    manifest : str, optional
+        The manifest to measure against, by default "function_manifest.json".
+    repeat : int, optional
+        The number of imports per site and mode; the fastest is reported, by default 3.
+
+    Returns
+    -------
+    List[dict]
+        For each site, the best import time in seconds, the number of loaded modules
+        and the number of registered functions in the "eager" and "manifest" modes.
+    """
+
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import function_app\n"
+        "seconds = time.perf_counter() - start\n"
+        "print(json.dumps({'seconds': seconds, 'modules': len(sys.modules),"
+        " 'functions': len(function_app.app.get_functions())}))\n"
+    )
+    results = []
+    for site in sites:
+        result = {"site": site}
+        for mode, path in (("eager", ""), ("manifest", os.path.abspath(manifest))):
+            env = {**os.environ, "WEBSITE_SITE_NAME": site, "FUNCTION_MANIFEST": path}
+            runs = []
+            for _ in range(repeat):
+                output = subprocess.run(
+                    [sys.executable, "-c", script],
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            result[mode] = min(runs, key=lambda run: run["seconds"])
+        results.append(result)
+    return results
+
+
+def profile_site(
+    site: str,
+    report: str,
+    seconds: float = None,
+    module_seconds: float = None,
+    rss_mb: float = None,
+) -> int:
+    """
+    Profile the blueprint imports of a site in a fresh interpreter.
+
+    `function_app` is imported with eager blueprint loading and import profiling
+    enabled; the child prints the profile table and writes the JSON report.
+
+    Parameters
+    ----------
+    site : str
+        The site (key of `deployment.BLUEPRINTS`) to profile.
+    report : str
+        The path of the JSON report.
+    seconds : float, optional
+        The budget for the total import time.
+    module_seconds : float, optional
+        The budget for the import time of any single module.
+    rss_mb : float, optional
+        The budget for the peak RSS, in megabytes.
+
+    Returns
+    -------
+    int
+        The exit code of the child interpreter, non-zero when the budget is exceeded.
+    """
+
+    budget = {
+        "IMPORT_BUDGET_SECONDS": seconds,
+        "IMPORT_BUDGET_MODULE_SECONDS": module_seconds,
+        "IMPORT_BUDGET_RSS_MB": rss_mb,
+    }
+    env = {
+        **os.environ,
+        "WEBSITE_SITE_NAME": site,
+        "FUNCTION_MANIFEST": "",
+        "IMPORT_PROFILE": report,
+        **{key: str(value) for key, value in budget.items() if value is not None},
+    }
+    print(f"# {site}")
+    return subprocess.run([sys.executable, "-c", "import function_app"], env=env).returncode
+
+
+def main(argv: List[str] = None) -> None:
+    """
+    Build a manifest, benchmark or profile cold starts from the command line.
+
+    Examples
+    --------
+    Run from the repository root before publishing:
+
+    >>> python -m libs.azure.functions.manifest build
+    >>> python -m libs.azure.functions.manifest benchmark --site esquire-meta
+    >>> python -m libs.azure.functions.manifest profile --site esquire-meta --budget-seconds 10
+    """
+
+    sys.path.insert(0, os.getcwd())
+    from deployment import BLUEPRINTS
+
+    parser = argparse.ArgumentParser(prog="python -m libs.azure.functions.manifest")
+    parser.add_argument("command", choices=["build", "benchmark", "profile"])
+    parser.add_argument("--site", action="append", help="A deployment site, by default all of them.")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--report", default="import_profile-{site}.json")
+    parser.add_argument("--budget-seconds", type=float)
+    parser.add_argument("--budget-module-seconds", type=float)
+    parser.add_argument("--budget-rss-mb", type=float)
+    args = parser.parse_args(argv)
+    sites = args.site or list(BLUEPRINTS)
+
+    if args.command == "build":
+        paths = [path for site in sites for path in BLUEPRINTS[site]]
+        manifest = build_manifest(paths)
+        write_manifest(manifest, args.manifest)
+        print(
+            f"Described {sum(len(record['functions']) for records in manifest['paths'].values() for record in records)}"
+            f" functions from {len(manifest['paths'])}/{len(set(paths))} paths into '{args.manifest}'."
+        )
+        return
+
+    if args.command == "profile":
+        failed = [
+            site
+            for site in sites
+            if profile_site(
+                site,
+                args.report.format(site=site),
+                seconds=args.budget_seconds,
+                module_seconds=args.budget_module_seconds,
+                rss_mb=args.budget_rss_mb,
+            )
+        ]
+        if failed:
+            sys.exit(f"Import budget exceeded for: {', '.join(failed)}")
+        return
+
+    print(f"{'site':<40}{'eager (s)':>12}{'manifest (s)':>14}{'speedup':>9}{'modules':>16}")
+    for result in benchmark(sites, args.manifest, args.repeat):
+        eager, lazy = result["eager"], result["manifest"]
+        print(
+            f"{result['site']:<40}{eager['seconds']:>12.3f}{lazy['seconds']:>14.3f}"
+            f"{eager['seconds'] / lazy['seconds']:>8.1f}x"
+            f"{eager['modules']:>8}/{lazy['modules']:<7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
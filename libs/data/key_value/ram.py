@@ -1,5 +1,7 @@
+from collections import OrderedDict
 from libs.utils.decorators import staticproperty
 from typing import Any, Callable, List
+import heapq, pickle, sys, threading, time
 
 
 class MemoryKeyValueProvider:
@@ -36,7 +38,16 @@ class MemoryKeyValueProvider:
 
         return self.SUPPORTED_SCHEMES[0]
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        max_entries: int = None,
+        max_bytes: int = None,
+        ttl: float = None,
+        policy: str = "lru",
+        sizeof: Callable = None,
+        **kwargs,
+    ) -> None:
         """
         Initialize an instance of MemoryKeyValueProvider.
 
@@ -44,11 +55,107 @@ class MemoryKeyValueProvider:
         ----------
         *args : tuple
             Additional positional arguments.
+        max_entries : int, optional
+            The maximum number of entries to keep, by default unbounded.
+        max_bytes : int, optional
+            The maximum total size of the stored values, by default unbounded.
+        ttl : float, optional
+            The default number of seconds an entry stays valid, by default forever.
+        policy : str, optional
+            The eviction policy used when a bound is exceeded, "lru" (least recently
+            used) or "lfu" (least frequently used), by default "lru".
+        sizeof : Callable, optional
+            A function returning the size in bytes of a stored value, used with
+            `max_bytes`. By default the length of bytes and strings, or of the
+            pickled value for other types.
         **kwargs : dict
             Additional keyword arguments.
+
+        Examples
+        --------
+        >>> from libs.data import register_binding, from_bind
+        >>> register_binding(
+        >>>     "zipcodes_cache", "KeyValue", "ram", max_entries=10000, ttl=3600
+        >>> )
+        >>> cache = from_bind("zipcodes_cache")
+
+        Notes
+        -----
+        Without `max_entries`, `max_bytes` or `ttl` the store is an unbounded dictionary.
+        All operations are guarded by a lock, so a provider can be shared between threads.
+        """
+
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unsupported eviction policy '{policy}'.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.policy = policy
+        self.sizeof = sizeof or _sizeof
+
+        self.store = OrderedDict()
+        self._lock = threading.RLock()
+        self._sizes = {}
+        self._bytes = 0
+        self._expires = {}
+        self._expiry_heap = []
+        # LFU bookkeeping: the use count of each key, and the keys for each count in LRU order.
+        self._counts = {}
+        self._buckets = {}
+        self._min_count = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @property
+    def bounded(self) -> bool:
+        """
+        Whether the store has a size bound or a TTL.
+        """
+
+        return bool(self.max_entries or self.max_bytes or self.ttl)
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        dict
+            The hit, miss, eviction and expiration counters, along with the current
+            number of entries and total size in bytes (when `max_bytes` is set).
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> from_bind("zipcodes_cache").stats()
+        {'hits': 10, 'misses': 2, 'evictions': 0, 'expirations': 0, 'entries': 2, 'bytes': 0}
+        """
+
+        with self._lock:
+            return {**self._stats, "entries": len(self.store), "bytes": self._bytes}
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the store. The statistics are kept.
         """
 
-        self.store = {}
+        with self._lock:
+            self.store.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._expires.clear()
+            self._expiry_heap.clear()
+            self._counts.clear()
+            self._buckets.clear()
+            self._min_count = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self.store and not self._expire(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire_all()
+            return len(self.store)
 
     def __getitem__(self, handle: str) -> Any:
         """
@@ -80,7 +187,14 @@ class MemoryKeyValueProvider:
 
         return self.load(key=handle)
 
-    def save(self, key: str, value: Any, encoder: Callable = None, **kwargs) -> None:
+    def save(
+        self,
+        key: str,
+        value: Any,
+        encoder: Callable = None,
+        ttl: float = None,
+        **kwargs,
+    ) -> None:
         """
         Save a key-value pair in the store.
 
@@ -92,6 +206,8 @@ class MemoryKeyValueProvider:
             The value to be saved.
         encoder : Callable, optional
             The encoder function to use for encoding the value, by default None.
+        ttl : float, optional
+            The number of seconds the entry stays valid, by default the provider's `ttl`.
         **kwargs : dict
             Additional keyword arguments.
 
@@ -100,15 +216,38 @@ class MemoryKeyValueProvider:
         >>> from libs.data import from_bind
         >>> provider = from_bind('ram_handle')
         >>> provider.save("my_key", "my_value")
+        >>> provider.save("my_token", token, ttl=300)
 
         Notes
         -----
         This method saves a key-value pair in the store. If an encoder function is provided,
         the value is encoded before saving. The encoded value or the original value is stored
         in the internal store dictionary with the specified key.
+        With a `ttl`, the entry expires after that many seconds, whether or not the store
+        is bounded. When the store is bounded, the least recently (or frequently) used
+        entries are evicted until it is back within its bounds.
         """
 
-        self.store[key] = encoder(value, **kwargs) if encoder else value
+        value = encoder(value, **kwargs) if encoder else value
+        with self._lock:
+            if self.bounded:
+                if key in self.store:
+                    self._touch(key)
+                else:
+                    self._add(key)
+            self.store[key] = value
+            if self.max_bytes:
+                size = self.sizeof(value)
+                self._bytes += size - self._sizes.get(key, 0)
+                self._sizes[key] = size
+            ttl = ttl if ttl is not None else self.ttl
+            if ttl is not None:
+                expires = time.monotonic() + ttl
+                self._expires[key] = expires
+                heapq.heappush(self._expiry_heap, (expires, key))
+            else:
+                self._expires.pop(key, None)
+            self._evict(keep=key)
 
     def load(self, key: str, decoder: Callable = None, **kwargs) -> Any:
         """
@@ -141,9 +280,18 @@ class MemoryKeyValueProvider:
         This method retrieves a value from the store using the specified key.
         If a decoder function is provided, the retrieved value is decoded before returning.
         The decoded value or the original stored value is returned.
+        A KeyError is raised for missing and expired keys.
         """
 
-        return decoder(self.store[key], **kwargs) if decoder else self.store[key]
+        with self._lock:
+            if key not in self.store or self._expire(key):
+                self._stats["misses"] += 1
+                raise KeyError(key)
+            self._stats["hits"] += 1
+            value = self.store[key]
+            if self.bounded:
+                self._touch(key)
+        return decoder(value, **kwargs) if decoder else value
 
     def drop(self, key: str) -> None:
         """
@@ -167,4 +315,86 @@ class MemoryKeyValueProvider:
         If the key is not found in the store, a KeyError is raised.
         """
 
+        with self._lock:
+            if key not in self.store:
+                raise KeyError(key)
+            self._remove(key)
+
+    def _add(self, key: str) -> None:
+        if self.policy == "lfu":
+            self._counts[key] = 1
+            self._buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_count = 1
+
+    def _touch(self, key: str) -> None:
+        if self.policy == "lru":
+            self.store.move_to_end(key)
+            return
+        count = self._counts[key]
+        self._unlink(key, count)
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+        if not self._min_count or self._min_count > count + 1:
+            self._min_count = count + 1
+
+    def _unlink(self, key: str, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = min(self._buckets) if self._buckets else 0
+
+    def _remove(self, key: str) -> None:
         del self.store[key]
+        self._bytes -= self._sizes.pop(key, 0)
+        self._expires.pop(key, None)
+        if key in self._counts:
+            self._unlink(key, self._counts.pop(key))
+
+    def _expire(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return True
+        return False
+
+    def _expire_all(self) -> None:
+        now = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires, key = heapq.heappop(self._expiry_heap)
+            # Skip heap entries made stale by an overwrite or a removal.
+            if self._expires.get(key) == expires:
+                self._remove(key)
+                self._stats["expirations"] += 1
+
+    def _evict(self, keep: str) -> None:
+        self._expire_all()
+        while len(self.store) > 1 and (
+            (self.max_entries and len(self.store) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            if self.policy == "lfu":
+                victims = iter(self._buckets[self._min_count])
+            else:
+                victims = iter(self.store)
+            victim = next(victims)
+            if victim == keep:
+                victim = next(victims, None)
+                if victim is None:
+                    # The newest entry is the only one in the LFU bucket; fall back to
+                    # the least recently used entry from the next bucket.
+                    counts = sorted(self._buckets)
+                    victim = next(iter(self._buckets[counts[1]]))
+            self._remove(victim)
+            self._stats["evictions"] += 1
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview, str)):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from libs.utils.decorators import staticproperty
 from shutil import copyfileobj
 import fsspec
-from typing import Any, Callable, List
+from fsspec.asyn import _run_coros_in_chunks, sync
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+import threading
 
 _RENAME = {"azure": "azure_blob"}
 
+# Default number of concurrent requests made by the bulk operations.
+DEFAULT_CONCURRENCY = 32
+
 
 class StreamKeyValueProvider:
     """
@@ -28,7 +35,7 @@ class StreamKeyValueProvider:
         return list(
             map(
                 lambda x: _RENAME[x] if x in _RENAME else x,
-                filter(len, fsspec.registry.target),
+                filter(len, fsspec.available_protocols()),
             )
         )
 
@@ -52,7 +59,26 @@ class StreamKeyValueProvider:
             if self.scheme == value:
                 self.scheme = key
         self.config = {**kwargs}
-    
+        self._fs = None
+        self._fs_lock = threading.Lock()
+
+    @property
+    def filesystem(self) -> fsspec.AbstractFileSystem:
+        """
+        The provider's filesystem, created on first use and reused for every key.
+
+        Returns
+        -------
+        fsspec.AbstractFileSystem
+            The filesystem for the provider's scheme and configuration.
+        """
+
+        if self._fs is None:
+            with self._fs_lock:
+                if self._fs is None:
+                    self._fs = fsspec.filesystem(self.scheme, **self.config)
+        return self._fs
+
     def __getitem__(self, handle):
         return self.connect(handle)
 
@@ -87,8 +113,7 @@ class StreamKeyValueProvider:
         The connection object can be used with standard file-like operations such as write, read, and close.
         """
 
-        fs = fsspec.filesystem(self.scheme, **self.config)
-        return fs.open(key, **{**kwargs, **self.config})
+        return self.filesystem.open(key, **{**kwargs, **self.config})
 
     def save(self, key: str, value: Any, encoder: Callable = None, **kwargs) -> None:
         """
@@ -193,5 +218,180 @@ class StreamKeyValueProvider:
         Any additional keyword arguments are ignored in this implementation.
         """
 
-        fs = fsspec.filesystem(self.scheme, **self.config)
-        fs.rm(key)
+        self.filesystem.rm(key)
+
+    def load_many(
+        self,
+        keys: Iterable[str],
+        decoder: Callable = None,
+        binary: bool = False,
+        on_error: str = "raise",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Load the values of many keys concurrently.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The keys to load.
+        decoder : Callable, optional
+            The decoder function to use for decoding each value, by default None.
+            As with `load`, it receives a binary file object.
+        binary : bool, optional
+            Whether undecoded values are returned as bytes rather than text, by default False.
+        on_error : str, optional
+            "raise" to raise the first error (e.g. FileNotFoundError), "omit" to leave
+            failed keys out of the result, or "return" to return the exception as the
+            key's value, by default "raise".
+        concurrency : int, optional
+            The maximum number of requests in flight, by default 32.
+        **kwargs : dict
+            Additional keyword arguments passed to the decoder.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The values keyed by the requested keys, in request order.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('blob_handle')
+        >>> values = provider.load_many(["general/a.json", "general/b.json"], decoder=json.load)
+
+        Notes
+        -----
+        Async filesystems (Azure Blob, S3, HTTP, ...) fetch every key in one batch of
+        concurrent requests through fsspec's event loop. Other filesystems use a
+        thread pool of `concurrency` threads.
+        """
+
+        keys = list(keys)
+        results = self._run_many(
+            "cat_file", [(key,) for key in keys], concurrency
+        )
+        output = {}
+        for key, value in zip(keys, results):
+            if isinstance(value, Exception):
+                if on_error == "raise":
+                    raise value
+                if on_error == "omit":
+                    continue
+            elif decoder:
+                value = decoder(BytesIO(value), **kwargs)
+            elif not binary:
+                value = value.decode()
+            output[key] = value
+        return output
+
+    def save_many(
+        self,
+        items: Mapping[str, Any] | Iterable[Tuple[str, Any]],
+        encoder: Callable = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs,
+    ) -> None:
+        """
+        Save many key-value pairs concurrently.
+
+        Parameters
+        ----------
+        items : Mapping[str, Any] or Iterable[Tuple[str, Any]]
+            The key-value pairs to save. Values may be bytes, strings or file objects.
+        encoder : Callable, optional
+            The encoder function to use for encoding each value, by default None.
+        concurrency : int, optional
+            The maximum number of requests in flight, by default 32.
+        **kwargs : dict
+            Additional keyword arguments passed to the encoder.
+
+        Raises
+        ------
+        Exception
+            The first error raised while writing, after every write has finished.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('blob_handle')
+        >>> provider.save_many({"general/a.txt": "a", "general/b.txt": b"b"})
+        """
+
+        items = items.items() if hasattr(items, "items") else items
+        arguments = []
+        for key, value in items:
+            if encoder is not None:
+                value = encoder(value, **kwargs)
+            if callable(getattr(value, "read", None)):
+                value = value.read()
+            if isinstance(value, str):
+                value = value.encode()
+            arguments.append((key, value))
+        for result in self._run_many("pipe_file", arguments, concurrency):
+            if isinstance(result, Exception):
+                raise result
+
+    def exists_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY
+    ) -> Dict[str, bool]:
+        """
+        Check whether many keys exist, concurrently.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The keys to check.
+        concurrency : int, optional
+            The maximum number of requests in flight, by default 32.
+
+        Returns
+        -------
+        Dict[str, bool]
+            Whether each key exists, keyed by the requested keys.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('blob_handle')
+        >>> missing = [k for k, found in provider.exists_many(keys).items() if not found]
+        """
+
+        keys = list(keys)
+        results = self._run_many("exists", [(key,) for key in keys], concurrency)
+        return {
+            key: (not isinstance(found, Exception)) and bool(found)
+            for key, found in zip(keys, results)
+        }
+
+    def _run_many(
+        self, method: str, arguments: List[tuple], concurrency: int
+    ) -> List[Any]:
+        """
+        Call a filesystem method for each argument tuple, returning results or exceptions.
+        """
+
+        fs = self.filesystem
+        if not arguments:
+            return []
+        if getattr(fs, "async_impl", False):
+            # The per-file coroutines behind fsspec's `_cat`/`_pipe`, run directly so
+            # keys containing glob characters are not expanded.
+            return sync(
+                fs.loop,
+                _run_coros_in_chunks,
+                [getattr(fs, f"_{method}")(*args) for args in arguments],
+                batch_size=concurrency,
+                nofiles=True,
+                return_exceptions=True,
+            )
+
+        def call(args: tuple) -> Any:
+            try:
+                return getattr(fs, method)(*args)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(arguments)))) as pool:
+            return list(pool.map(call, arguments))
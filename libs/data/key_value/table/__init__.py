@@ -1,5 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from libs.utils.decorators import staticproperty
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+# Azure Tables accepts at most 100 operations per entity group transaction.
+MAX_TRANSACTION_OPERATIONS = 100
+# Azure Tables accepts at most 15 comparisons per filter; one is used by the PartitionKey.
+MAX_FILTER_ROW_KEYS = 14
+# Default number of concurrent requests made by the bulk operations.
+DEFAULT_CONCURRENCY = 8
 
 
 class TableKeyValueProvider:
@@ -178,6 +186,243 @@ class TableKeyValueProvider:
                 conn = self.connect(table_name)
                 conn.delete_entity(partition_key=partition_key, row_key=row_key)
 
+    def get_many(
+        self,
+        keys: Iterable[str],
+        decoder: Callable = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Load many entities with batched point queries.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The "table.partition.row" keys to load.
+        decoder : Callable, optional
+            The decoder function to use for decoding each entity, by default None.
+        concurrency : int, optional
+            The maximum number of queries in flight, by default 8.
+        **kwargs : dict
+            Additional keyword arguments.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The entities keyed by the requested keys. Keys without an entity are omitted.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('table_handle')
+        >>> entities = provider.get_many(["placekeys.addresses." + h for h in hashes])
+
+        Notes
+        -----
+        Row keys are grouped by table and partition and looked up with OData filters of
+        the form `PartitionKey eq @pk and (RowKey eq @r0 or RowKey eq @r1 ...)`, 14 row
+        keys per query (the service allows 15 comparisons per filter).
+        """
+
+        keys = list(keys)
+        match self.scheme:
+            case "azure_table":
+                groups = self._group_keys(keys)
+                queries = [
+                    (table_name, partition_key, row_keys[i : i + MAX_FILTER_ROW_KEYS])
+                    for (table_name, partition_key), row_keys in groups.items()
+                    for i in range(0, len(row_keys), MAX_FILTER_ROW_KEYS)
+                ]
+                conns = {table_name: self.connect(table_name) for table_name, _ in groups}
+
+                def query(args: tuple) -> List[Tuple[str, Any]]:
+                    table_name, partition_key, row_keys = args
+                    parameters = {"pk": partition_key}
+                    comparisons = []
+                    for i, row_key in enumerate(row_keys):
+                        parameters[f"r{i}"] = row_key
+                        comparisons.append(f"RowKey eq @r{i}")
+                    entities = conns[table_name].query_entities(
+                        f"PartitionKey eq @pk and ({' or '.join(comparisons)})",
+                        parameters=parameters,
+                    )
+                    delimiter = self.RESOURCE_TYPE_DELIMITER
+                    return [
+                        (
+                            delimiter.join(
+                                [table_name, partition_key, entity["RowKey"]]
+                            ),
+                            entity,
+                        )
+                        for entity in entities
+                    ]
+
+                found = {}
+                for results in self._map(query, queries, concurrency):
+                    found.update(results)
+                output = {}
+                for key in keys:
+                    table_name, partition_key, row_key = self.parse_key(key)
+                    lookup = self.RESOURCE_TYPE_DELIMITER.join(
+                        [table_name, partition_key, row_key]
+                    )
+                    if lookup in found:
+                        output[key] = (
+                            decoder(found[lookup]) if decoder else found[lookup]
+                        )
+                return output
+
+    def upsert_many(
+        self,
+        items: Mapping[str, Any] | Iterable[Tuple[str, Any]],
+        encoder: Callable = None,
+        mode: str = "merge",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs,
+    ) -> int:
+        """
+        Insert or update many entities with entity group transactions.
+
+        Parameters
+        ----------
+        items : Mapping[str, Any] or Iterable[Tuple[str, Any]]
+            The "table.partition.row" keys and their values. Values that are not
+            mappings are stored in a "value" property, as with `save`.
+        encoder : Callable, optional
+            The encoder function to use for encoding each value, by default None.
+        mode : str, optional
+            "merge" to update only the given properties or "replace" to replace the
+            whole entity, by default "merge".
+        concurrency : int, optional
+            The maximum number of transactions in flight, by default 8.
+        **kwargs : dict
+            Additional keyword arguments passed to the encoder.
+
+        Returns
+        -------
+        int
+            The number of entities written.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('table_handle')
+        >>> provider.upsert_many({"dashboard.state.a": {"status": "done"}})
+
+        Notes
+        -----
+        Entities are grouped by table and partition into transactions of up to 100
+        operations, and partitions are written concurrently. When the same key appears
+        more than once, the last value wins.
+        """
+
+        from azure.data.tables import UpdateMode
+
+        update_mode = UpdateMode.REPLACE if mode == "replace" else UpdateMode.MERGE
+        items = items.items() if hasattr(items, "items") else items
+        entities = {}
+        for key, value in items:
+            if encoder:
+                value = encoder(value, **kwargs)
+            if not hasattr(value, "keys"):
+                value = {"value": value}
+            table_name, partition_key, row_key = self.parse_key(key)
+            entities[(table_name, partition_key, row_key)] = {
+                **value,
+                "PartitionKey": partition_key,
+                "RowKey": row_key,
+            }
+        operations = {}
+        for (table_name, partition_key, _), entity in entities.items():
+            operations.setdefault((table_name, partition_key), []).append(
+                ("upsert", entity, {"mode": update_mode})
+            )
+        self._submit(operations, concurrency)
+        return len(entities)
+
+    def delete_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY, **kwargs
+    ) -> int:
+        """
+        Delete many entities with entity group transactions.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The "table.partition.row" keys to delete.
+        concurrency : int, optional
+            The maximum number of transactions in flight, by default 8.
+        **kwargs : dict
+            Additional keyword arguments.
+
+        Returns
+        -------
+        int
+            The number of keys processed.
+
+        Notes
+        -----
+        A transaction fails as a whole if one of its entities does not exist, so a
+        failed transaction is retried one entity at a time, ignoring missing entities.
+        """
+
+        operations = {}
+        for (table_name, partition_key), row_keys in self._group_keys(keys).items():
+            operations[(table_name, partition_key)] = [
+                ("delete", {"PartitionKey": partition_key, "RowKey": row_key})
+                for row_key in row_keys
+            ]
+        self._submit(operations, concurrency)
+        return sum(len(ops) for ops in operations.values())
+
+    def _group_keys(self, keys: Iterable[str]) -> Dict[Tuple[str, str], List[str]]:
+        groups = {}
+        for key in keys:
+            table_name, partition_key, row_key = self.parse_key(key)
+            row_keys = groups.setdefault((table_name, partition_key), [])
+            if row_key not in row_keys:
+                row_keys.append(row_key)
+        return groups
+
+    def _submit(
+        self, operations: Dict[Tuple[str, str], List[tuple]], concurrency: int
+    ) -> None:
+        from azure.core.exceptions import ResourceNotFoundError
+        from azure.data.tables import TableTransactionError
+
+        conns = {table_name: self.connect(table_name) for table_name, _ in operations}
+        batches = [
+            (table_name, ops[i : i + MAX_TRANSACTION_OPERATIONS])
+            for (table_name, _), ops in operations.items()
+            for i in range(0, len(ops), MAX_TRANSACTION_OPERATIONS)
+        ]
+
+        def submit(args: tuple) -> None:
+            table_name, batch = args
+            conn = conns[table_name]
+            try:
+                conn.submit_transaction(batch)
+            except TableTransactionError:
+                if any(operation[0] != "delete" for operation in batch):
+                    raise
+                for _, entity in batch:
+                    try:
+                        conn.delete_entity(
+                            partition_key=entity["PartitionKey"],
+                            row_key=entity["RowKey"],
+                        )
+                    except ResourceNotFoundError:
+                        pass
+
+        list(self._map(submit, batches, concurrency))
+
+    def _map(self, func: Callable, arguments: List[Any], concurrency: int):
+        if len(arguments) <= 1:
+            return map(func, arguments)
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(arguments)))) as pool:
+            return list(pool.map(func, arguments))
+
     def parse_key(self, key: str):
         """
         Parse a key into table name, partition key, and row key.
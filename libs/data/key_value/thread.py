@@ -1,6 +1,125 @@
+from contextvars import ContextVar
 from libs.utils.decorators import staticproperty
 from libs.utils.threaded import current
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, List, Optional
+import functools, inspect
+
+_MISSING = object()
+
+
+class ContextScope:
+    """
+    A key-value scope bound to the current `contextvars` context.
+
+    While a scope is entered, `ThreadKeyValueProvider` reads and writes its entries
+    instead of the shared `current` object, so coroutines multiplexed on one thread
+    each see their own values. Tasks created inside the scope share it, since asyncio
+    copies the context into new tasks; a task that needs its own values enters a
+    nested scope.
+    """
+
+    def __init__(self, inherit: bool = False, flush: Any = None) -> None:
+        """
+        Initialize a ContextScope.
+
+        Parameters
+        ----------
+        inherit : bool, optional
+            Whether keys missing from this scope are looked up in the enclosing
+            scope, by default False. Writes and drops never reach the enclosing scope.
+        flush : Callable | KeyValueProvider, optional
+            Where the scope's entries go when it exits without an error. Either a
+            callable receiving the entries as a dictionary (it may be a coroutine
+            function when the scope is used with `async with`), or a provider whose
+            `save()` is called for each entry. By default the entries are discarded.
+        """
+
+        self.inherit = inherit
+        self.flush = flush
+        self.parent: Optional["ContextScope"] = None
+        self.data: Dict[str, Any] = {}
+        self._dropped = set()
+        self._token = None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.data.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.parent is not None and key not in self._dropped:
+            return self.parent[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.data[key] = value
+        self._dropped.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.data:
+            del self.data[key]
+        elif self.parent is None or key in self._dropped or key not in self.parent:
+            raise KeyError(key)
+        if self.parent is not None:
+            # Hide the inherited value without touching the enclosing scope.
+            self._dropped.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __enter__(self) -> "ContextScope":
+        if self._token is not None:
+            raise RuntimeError("A ContextScope cannot be entered more than once.")
+        self.parent = _SCOPE.get() if self.inherit else None
+        self._token = _SCOPE.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None and self.data:
+                result = self._flush()
+                if inspect.isawaitable(result):
+                    result.close()
+                    raise TypeError(
+                        "Asynchronous flush callables require `async with`."
+                    )
+        finally:
+            self._close()
+
+    async def __aenter__(self) -> "ContextScope":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None and self.data:
+                result = self._flush()
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            self._close()
+
+    def _flush(self) -> Any:
+        if self.flush is None:
+            return None
+        if callable(getattr(self.flush, "save", None)):
+            for key, value in self.data.items():
+                self.flush.save(key, value)
+            return None
+        return self.flush(dict(self.data))
+
+    def _close(self) -> None:
+        _SCOPE.reset(self._token)
+        self._token = None
+        self.parent = None
+        self.data.clear()
+        self._dropped.clear()
+
+
+_SCOPE: ContextVar[Optional[ContextScope]] = ContextVar(
+    "thread_key_value_scope", default=None
+)
 
 
 class ThreadKeyValueProvider:
@@ -8,7 +127,8 @@ class ThreadKeyValueProvider:
     Thread-based key-value storage provider.
 
     This class provides methods to save, load, and delete key-value pairs
-    using thread-based storage mechanisms.
+    using thread-based storage mechanisms. Inside a `scope()`, the pairs are kept
+    in a per-context scope instead, which isolates concurrent asyncio tasks.
     """
 
     @staticproperty
@@ -62,7 +182,89 @@ class ThreadKeyValueProvider:
 
         if not hasattr(cls, "instance"):
             cls.instance = super(ThreadKeyValueProvider, cls).__new__(cls)
-            return cls.instance
+        return cls.instance
+
+    def scope(self, inherit: bool = False, flush: Any = None) -> ContextScope:
+        """
+        Open a context-local scope for the key-value pairs.
+
+        Parameters
+        ----------
+        inherit : bool, optional
+            Whether keys missing from the new scope are looked up in the enclosing
+            scope, by default False.
+        flush : Callable | KeyValueProvider, optional
+            Where the scope's entries go on a clean exit, either a callable receiving
+            them as a dictionary or a provider to save them to, by default None.
+
+        Returns
+        -------
+        ContextScope
+            The scope, to be used with `with` or `async with`.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('thread_handle')
+        >>> async with provider.scope():
+        >>>     provider.save("my_key", "my_value")
+        >>>     await asyncio.gather(*tasks)  # the tasks see "my_key"
+
+        Notes
+        -----
+        Scopes rely on `contextvars`, so they follow asyncio tasks and
+        `asyncio.to_thread`, but not `loop.run_in_executor` or plain threads, which
+        start from an empty context and fall back to the thread-based storage.
+        """
+
+        return ContextScope(inherit=inherit, flush=flush)
+
+    def scoped(self, func: Callable = None, inherit: bool = False, flush: Any = None):
+        """
+        Decorate a function so that each call runs in its own scope.
+
+        Parameters
+        ----------
+        func : Callable, optional
+            The function or coroutine function to decorate.
+        inherit : bool, optional
+            Whether the call's scope inherits from the caller's scope, by default False.
+        flush : Callable | KeyValueProvider, optional
+            Where the scope's entries go when the call returns, by default None.
+
+        Returns
+        -------
+        Callable
+            The decorated function, or a decorator when `func` is omitted.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> provider = from_bind('thread_handle')
+        >>> @bp.activity_trigger(input_name="ingress")
+        >>> @provider.scoped
+        >>> async def activity_lookup(ingress: dict):
+        >>>     ...
+        """
+
+        if func is None:
+            return functools.partial(self.scoped, inherit=inherit, flush=flush)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with self.scope(inherit=inherit, flush=flush):
+                    return await func(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.scope(inherit=inherit, flush=flush):
+                    return func(*args, **kwargs)
+
+        return wrapper
 
     def __getitem__(self, handle: str) -> Any:
         """
@@ -123,7 +325,12 @@ class ThreadKeyValueProvider:
         using the specified key.
         """
 
-        current.__setattr__(key, encoder(value) if encoder else value)
+        value = encoder(value) if encoder else value
+        scope = _SCOPE.get()
+        if scope is not None:
+            scope[key] = value
+        else:
+            current.__setattr__(key, value)
 
     def load(self, key: str, decoder: Callable = None, **kwargs) -> Any:
         """
@@ -157,13 +364,15 @@ class ThreadKeyValueProvider:
         If a decoder function is provided, the retrieved value is decoded before returning.
         The method retrieves the value from the thread-local storage using the specified key.
         The decoded or raw value is returned.
+        Inside a scope, a KeyError is raised for keys missing from the scope.
         """
 
-        return (
-            decoder(current.__getattribute__(key)._get_current_object())
-            if decoder
-            else current.__getattribute__(key)._get_current_object()
-        )
+        scope = _SCOPE.get()
+        if scope is not None:
+            value = scope[key]
+        else:
+            value = current.__getattribute__(key)._get_current_object()
+        return decoder(value) if decoder else value
 
     def drop(self, key: str) -> None:
         """
@@ -184,7 +393,11 @@ class ThreadKeyValueProvider:
         Notes
         -----
         This method deletes a key-value pair from the thread-based storage using the specified key.
-        It removes the key from the thread-local storage.
+        It removes the key from the thread-local storage, or from the current scope.
         """
 
-        current.__delattr__(key)
+        scope = _SCOPE.get()
+        if scope is not None:
+            del scope[key]
+        else:
+            current.__delattr__(key)
@@ -0,0 +1,382 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from libs.utils.decorators import staticproperty
+from typing import Any, Callable, Dict, List
+import atexit, logging, threading, time
+
+logger = logging.getLogger(__name__)
+
+WRITE_POLICIES = ("read_through", "write_through", "write_back")
+
+
+class TieredKeyValueProvider:
+    """
+    Key-value storage provider that stacks other providers into a cache hierarchy.
+
+    Reads check each tier in order (e.g. RAM, then local disk, then blob storage or
+    Azure Tables) and promote hits into the faster tiers above them. Misses can be
+    cached for a short time so repeated lookups of absent keys stay cheap.
+    """
+
+    @staticproperty
+    def SUPPORTED_SCHEMES(self) -> List[str]:
+        """
+        List of supported schemes.
+
+        Returns
+        -------
+        List[str]
+            A list of supported schemes.
+        """
+
+        return ["tiered"]
+
+    @staticproperty
+    def scheme(self) -> str:
+        """
+        Scheme supported by the provider.
+
+        Returns
+        -------
+        str
+            The supported scheme.
+        """
+
+        return self.SUPPORTED_SCHEMES[0]
+
+    def __init__(
+        self,
+        *args,
+        tiers: List[Any] = (),
+        policy: str = "write_through",
+        promote: bool = True,
+        negative_ttl: float = None,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize an instance of TieredKeyValueProvider.
+
+        Parameters
+        ----------
+        *args : tuple
+            Additional positional arguments.
+        tiers : List[str | dict | KeyValueProvider]
+            The tiers, fastest first. Each tier is either the handle of a registered
+            binding, a provider instance, or a mapping with the tier's "scheme" (or
+            "handle") and the provider's keyword arguments. Mappings may also set
+            "key_format", a format string applied to keys for that tier
+            (e.g. "general/cache/placekeys/{key}.json").
+        policy : str, optional
+            How writes are applied, by default "write_through":
+            - "read_through": only the last tier is written and the tiers above it
+              are invalidated; they are filled by subsequent reads.
+            - "write_through": every tier is written before `save` returns.
+            - "write_back": the first tier is written immediately and the others
+              in a background thread. Use `flush()` to wait for pending writes.
+        promote : bool, optional
+            Whether a hit in a lower tier is copied into the tiers above it, by default True.
+        negative_ttl : float, optional
+            The number of seconds a miss in every tier is remembered, by default None
+            (misses are not cached).
+        **kwargs : dict
+            Additional keyword arguments.
+
+        Examples
+        --------
+        >>> from libs.data import register_binding, from_bind
+        >>> register_binding(
+        >>>     "placekeys",
+        >>>     "KeyValue",
+        >>>     "tiered",
+        >>>     tiers=[
+        >>>         {"scheme": "ram", "max_entries": 100000, "ttl": 3600},
+        >>>         {"scheme": "file", "key_format": "/tmp/placekeys/{key}"},
+        >>>         {"handle": "placekey_table", "key_format": "placekeys.cache.{key}"},
+        >>>     ],
+        >>>     policy="write_back",
+        >>>     negative_ttl=300,
+        >>> )
+        >>> cache = from_bind("placekeys")
+        """
+
+        if policy not in WRITE_POLICIES:
+            raise ValueError(f"Unsupported write policy '{policy}'.")
+        if not tiers:
+            raise ValueError("At least one tier is required.")
+        self.policy = policy
+        self.promote = promote
+        self.negative_ttl = negative_ttl
+        self._tier_specs = tiers
+        self._tiers = None
+        self._lock = threading.RLock()
+        self._negative: Dict[str, float] = {}
+        self._stats = {
+            "hits": [0] * len(tiers),
+            "misses": 0,
+            "negative_hits": 0,
+            "promotions": 0,
+            "errors": 0,
+        }
+        self._executor = None
+        self._pending: List[Future] = []
+
+    @property
+    def tiers(self) -> List[tuple]:
+        """
+        The resolved tiers as (provider, key_format) pairs.
+
+        Notes
+        -----
+        Tiers are resolved on first use, so handles may be registered after the
+        tiered binding itself.
+        """
+
+        if self._tiers is None:
+            with self._lock:
+                if self._tiers is None:
+                    self._tiers = [_resolve_tier(spec) for spec in self._tier_specs]
+        return self._tiers
+
+    def __getitem__(self, handle: str) -> Any:
+        """
+        Retrieve an item from the tiers using a handle.
+
+        Parameters
+        ----------
+        handle : str
+            The handle associated with the item.
+
+        Returns
+        -------
+        Any
+            The retrieved item.
+        """
+
+        return self.load(key=handle)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self.load(key)
+            return True
+        except KeyError:
+            return False
+
+    def save(self, key: str, value: Any, encoder: Callable = None, **kwargs) -> None:
+        """
+        Save a key-value pair according to the write policy.
+
+        Parameters
+        ----------
+        key : str
+            The key associated with the value.
+        value : Any
+            The value to be saved.
+        encoder : Callable, optional
+            The encoder function to use for encoding the value, by default None.
+            The encoded value is stored in every tier.
+        **kwargs : dict
+            Additional keyword arguments.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> from_bind("placekeys").save(address_hash, placekey)
+        """
+
+        value = encoder(value, **kwargs) if encoder else value
+        with self._lock:
+            self._negative.pop(key, None)
+        tiers = self.tiers
+        match self.policy:
+            case "read_through":
+                self._save_tier(tiers[-1], key, value, raise_errors=True)
+                for tier in tiers[:-1]:
+                    self._drop_tier(tier, key)
+            case "write_through":
+                for tier in tiers:
+                    self._save_tier(tier, key, value, raise_errors=True)
+            case "write_back":
+                self._save_tier(tiers[0], key, value, raise_errors=True)
+                if len(tiers) > 1:
+                    self._write_back(tiers[1:], key, value)
+
+    def load(self, key: str, decoder: Callable = None, **kwargs) -> Any:
+        """
+        Load a value from the first tier that has it.
+
+        Parameters
+        ----------
+        key : str
+            The key associated with the value.
+        decoder : Callable, optional
+            The decoder function to use for decoding the value, by default None.
+        **kwargs : dict
+            Additional keyword arguments.
+
+        Returns
+        -------
+        Any
+            The retrieved value.
+
+        Raises
+        ------
+        KeyError
+            If no tier has the key.
+
+        Example
+        -------
+        >>> from libs.data import from_bind
+        >>> placekey = from_bind("placekeys").load(address_hash)
+
+        Notes
+        -----
+        A tier that raises for any reason (missing key, expired entry, network error)
+        is treated as a miss and the next tier is tried.
+        """
+
+        with self._lock:
+            expires = self._negative.get(key)
+            if expires is not None:
+                if expires > time.monotonic():
+                    self._stats["negative_hits"] += 1
+                    raise KeyError(key)
+                del self._negative[key]
+
+        tiers = self.tiers
+        for index, tier in enumerate(tiers):
+            try:
+                value = tier[0].load(_format_key(tier, key))
+            except Exception:
+                continue
+            with self._lock:
+                self._stats["hits"][index] += 1
+            if self.promote and index:
+                for upper in tiers[:index]:
+                    self._save_tier(upper, key, value)
+                with self._lock:
+                    self._stats["promotions"] += 1
+            return decoder(value, **kwargs) if decoder else value
+
+        with self._lock:
+            self._stats["misses"] += 1
+            if self.negative_ttl:
+                self._negative[key] = time.monotonic() + self.negative_ttl
+        raise KeyError(key)
+
+    def drop(self, key: str, **kwargs) -> None:
+        """
+        Delete a key-value pair from every tier.
+
+        Parameters
+        ----------
+        key : str
+            The key associated with the value to be deleted.
+        **kwargs : dict
+            Additional keyword arguments.
+        """
+
+        with self._lock:
+            self._negative.pop(key, None)
+        for tier in self.tiers:
+            self._drop_tier(tier, key)
+
+    def flush(self, timeout: float = None) -> None:
+        """
+        Wait for pending write-back writes to finish.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum number of seconds to wait for each write, by default no limit.
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        dict
+            The hits per tier, the misses in every tier, the lookups answered by the
+            negative cache, the number of promotions, and the number of failed writes.
+        """
+
+        with self._lock:
+            return {**self._stats, "hits": list(self._stats["hits"])}
+
+    def _save_tier(
+        self, tier: tuple, key: str, value: Any, raise_errors: bool = False
+    ) -> None:
+        try:
+            tier[0].save(_format_key(tier, key), value)
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            if raise_errors:
+                raise
+            logger.warning(f"Unable to write {key} to {type(tier[0]).__name__}: {e}")
+
+    def _drop_tier(self, tier: tuple, key: str) -> None:
+        try:
+            tier[0].drop(_format_key(tier, key))
+        except Exception:
+            pass
+
+    def _write_back(self, tiers: List[tuple], key: str, value: Any) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="tiered-write-back"
+                )
+                atexit.register(self.flush)
+            self._pending = [f for f in self._pending if not f.done()]
+            for tier in tiers:
+                self._pending.append(
+                    self._executor.submit(self._save_tier, tier, key, value)
+                )
+
+
+def _resolve_tier(spec: Any) -> tuple:
+    if isinstance(spec, str):
+        spec = {"handle": spec}
+    if not hasattr(spec, "keys"):
+        return (spec, None)
+    from libs.data import _REGISTRY, from_bind
+
+    spec = dict(spec)
+    key_format = spec.pop("key_format", None)
+    if "handle" in spec:
+        provider = from_bind(spec["handle"])
+        if provider is None:
+            raise ValueError(f"No binding is registered for '{spec['handle']}'.")
+    else:
+        # Build a dedicated instance: the registry caches providers by configuration,
+        # and tiers must not share their storage with other bindings.
+        # The plugin loader imports this package under its own module name, so the
+        # provider classes are registered on the registry instance in libs.data.
+        scheme = spec.pop("scheme")
+        provider_class = next(
+            (
+                provider
+                for provider in _REGISTRY["KeyValueRegistry"]._providers
+                if scheme in provider.SUPPORTED_SCHEMES
+            ),
+            None,
+        )
+        if provider_class is None:
+            raise ValueError(
+                f"Storage provider for the '{scheme}' scheme is not supported."
+            )
+        provider = provider_class(scheme=scheme, **spec)
+    return (provider, key_format)
+
+
+def _format_key(tier: tuple, key: str) -> str:
+    return tier[1].format(key=key) if tier[1] else key
@@ -1,16 +1,23 @@
 # File: libs/data/structured/sqlalchemy/__init__.py
 
 from libs.utils.decorators import staticproperty
+from libs.data.structured.sqlalchemy.bulk import bulk_write
+from libs.data.structured.sqlalchemy.cache import MetadataCache
+from libs.data.structured.sqlalchemy.engines import get_engine
 from libs.data.structured.sqlalchemy.interface import QueryFrame
-from libs.data.structured.sqlalchemy.marshmallow import extend_models as extend_models_marshmallow, schema
+from libs.data.structured.sqlalchemy.lazy import LazyModels
+from libs.data.structured.sqlalchemy.marshmallow import (
+    extend_models as extend_models_marshmallow,
+    extend_models_lazy as extend_models_marshmallow_lazy,
+    schema,
+)
 from libs.data.structured.sqlalchemy.utils import (
     extend_models as extend_models_base,
     name_for_collection_relationship,
     name_for_scalar_relationship,
 )
-from libs.utils.azure_storage import get_blob_service_client
 from sqlalchemy import (
-    create_engine,
+    inspect,
     Column,
     Engine,
     Integer,
@@ -18,15 +25,53 @@ from sqlalchemy import (
     PrimaryKeyConstraint,
     Table,
 )
+from sqlalchemy.exc import InvalidRequestError, NoSuchTableError
 from sqlalchemy.ext.automap import automap_base, AutomapBase
 from sqlalchemy.orm import Session
-from typing import Any, Callable, List
-import uuid, tempfile, os, hashlib, pickle
+from typing import Any, Callable, Dict, List, Sequence
+import threading, uuid
 
 MODEL_EXTENSION_STEPS: List[Callable] = [
     extend_models_base,
     extend_models_marshmallow,
 ]
+# Steps applied to models mapped on demand by lazy providers.
+# The Marshmallow schema is generated the first time a model's schema is used.
+LAZY_MODEL_EXTENSION_STEPS: List[Callable] = [
+    extend_models_base,
+    extend_models_marshmallow_lazy,
+]
+
+
+def prime_table(table: Table) -> None:
+    """
+    Ensure a reflected table has a primary key so it can be automapped.
+
+    Parameters
+    ----------
+    table : Table
+        The reflected table.
+
+    Notes
+    -----
+    A column named "id", "uuid", "guid" or ending in "_id" is promoted to the primary key.
+    If no such column exists, a synthetic `fake_pk_id` column is appended.
+    """
+
+    # Check if the table has a primary key defined
+    if not table.primary_key:
+        # Iterate over each column in the table
+        for col in table.c:
+            # Check if the column name indicates a primary key
+            c = col.name.lower()
+            if c in ["id", "uuid", "guid"] or c[-3:] == "_id":
+                # Set the column as the primary key
+                col.primary_key = True
+                table.append_constraint(PrimaryKeyConstraint(col))
+        # If no primary key is found, add a fake primary key column
+        if not table.primary_key:
+            table.append_column(Column("fake_pk_id", Integer, primary_key=True))
+            table.append_constraint(PrimaryKeyConstraint("fake_pk_id"))
 
 
 class SQLAlchemyStructuredProvider:
@@ -171,12 +216,32 @@ class SQLAlchemyStructuredProvider:
             - url : str
                 The URL string to create the SQLAlchemy Engine object.
                 This parameter is ignored if `engine` is provided.
+                Providers with the same URL and engine options share one engine
+                (and connection pool) through `engines.get_engine`.
+            - pool_size : int | str
+                The connection pool size, or "auto" to size the pool from
+                `FUNCTIONS_WORKER_PROCESS_COUNT` and `PYTHON_THREADPOOL_THREAD_COUNT`.
+            - max_connections : int
+                With `pool_size="auto"`, the number of connections the app may hold
+                across every worker process.
             - schema : str
                 The default schema to use if no schema is specified explicitly.
                 This parameter is ignored if `schemas` is provided.
-            - schemas : List[str]
-                The list of schemas to reflect and consider for models.
+            - schemas : List[str] | Dict[str, List[str] | None]
+                The list of schemas to reflect and consider for models, or a mapping
+                of schema names to the tables to reflect (None reflects every table).
                 If provided, the `schema` parameter will be ignored.
+            - metadata_cache : bool
+                Whether to cache reflected metadata locally and in blob storage, by default True.
+            - metadata_cache_container : str
+                The blob container used for the shared cache tier, by default "sqlalchemy-cache".
+            - metadata_cache_validate : bool
+                Whether to invalidate cached metadata when the schema fingerprint changes,
+                by default True. When False, cached metadata is used without querying the database.
+            - lazy : bool
+                Whether to reflect and automap tables on first use, by default False.
+                In lazy mode only the requested table and its foreign key closure are
+                reflected, and Marshmallow schemas are generated on first use of each model.
 
         Examples
         --------
@@ -189,10 +254,6 @@ class SQLAlchemyStructuredProvider:
         It also sets up the session and provides access to the models for performing CRUD operations on the structured data.
         """
 
-        # Serialize kwargs to create a unique identifier for caching
-        kwargs_serialized = pickle.dumps(kwargs)
-        self._hash_kwargs = hashlib.md5(kwargs_serialized).hexdigest()
-
         kw = kwargs.keys()
 
         # Remove the 'scheme' key from kwargs
@@ -202,113 +263,123 @@ class SQLAlchemyStructuredProvider:
         self.id: str = uuid.uuid4().hex
 
         # Determine the schemas to reflect (if provided)
-        self.schemas: List[str] = kwargs.pop(
+        schemas = kwargs.pop(
             "schemas", [s] if (s := kwargs.pop("schema", None)) else None
         )
+        # Normalize lists of schema names into a mapping of schema -> tables
+        self.schemas: Dict[str, List[str] | None] = (
+            dict(schemas.items())
+            if hasattr(schemas, "items")
+            else {s: None for s in schemas} if schemas else None
+        )
+
+        # Reflection cache settings
+        use_cache = kwargs.pop("metadata_cache", True)
+        cache_container = kwargs.pop("metadata_cache_container", "sqlalchemy-cache")
+        cache_validate = kwargs.pop("metadata_cache_validate", True)
+
+        # Reflect tables on first use instead of all at once
+        self.lazy: bool = kwargs.pop("lazy", False)
 
         # Set up the database engine
         self.engine: Engine = (
             kwargs.pop("engine")
             if "engine" in kw
-            else create_engine(kwargs.pop("url"), **kwargs) if "url" in kw else None
+            else get_engine(kwargs.pop("url"), **kwargs) if "url" in kw else None
         )
         if not self.engine:
             raise Exception("No engine configuration values specified.")
 
+        self.metadata_cache: MetadataCache = (
+            MetadataCache(
+                self.engine,
+                self.schemas,
+                container_name=cache_container,
+                validate=cache_validate,
+            )
+            if use_cache
+            else None
+        )
+
         self._metadata: MetaData = None
         self._base: AutomapBase = None
         self._models = None
+        self._lock = threading.RLock()
+        self._extended = set()
+        self._table_names = {}
 
     def session(self) -> Session:
         return Session(self.engine)
 
     @property
     def metadata(self) -> MetaData:
-        if not self._metadata:
-            cache_filename = f"sqlalchemy_provider_{self._hash_kwargs}.pkl"
-            temp_path = os.path.join(tempfile.gettempdir(), cache_filename)
-
-            # Azure Storage initialization
-            if os.environ.get("AzureWebJobsStorage"):
-                try:
-                    self.blob_service_client = get_blob_service_client(
-                        connection_string=os.environ["AzureWebJobsStorage"]
-                    )
-                    self.container_name = "sqlalchemy-cache"
-                    container_client = self.blob_service_client.get_container_client(
-                        self.container_name
-                    )
-                    if not container_client.exists():
-                        self.blob_service_client.create_container(self.container_name)
+        """
+        The reflected metadata for the configured schemas.
 
-                    blob_client = self.blob_service_client.get_blob_client(
-                        container=self.container_name, blob=cache_filename
-                    )
-                    if blob_client.exists():
-                        blob_data = blob_client.download_blob().readall()
-                        self._metadata = pickle.loads(blob_data)
-                except:
-                    pass
-
-            if os.path.exists(temp_path):
-                with open(temp_path, "rb") as f:
-                    self._metadata = pickle.load(f)
-
-            # Create the metadata object
-            self._metadata = MetaData()
-            
-
-            def prime_table(table: Table):
-                # Check if the table has a primary key defined
-                if not table.primary_key:
-                    # Iterate over each column in the table
-                    for col in table.c:
-                        # Check if the column name indicates a primary key
-                        c = col.name.lower()
-                        if c in ["id", "uuid", "guid"] or c[-3:] == "_id":
-                            # Set the column as the primary key
-                            col.primary_key = True
-                            table.append_constraint(PrimaryKeyConstraint(col))
-                    # If no primary key is found, add a fake primary key column
-                    if not table.primary_key:
-                        table.append_column(
-                            Column("fake_pk_id", Integer, primary_key=True)
-                        )
-                        table.append_constraint(PrimaryKeyConstraint("fake_pk_id"))
-
-            # Reflect the database tables
-            if self.schemas:
-                # Reflect tables for specific schemas
-                for s, tables in self.schemas.items():
-                    # Reflect tables for the given schema and include views
-                    self._metadata.reflect(
-                        bind=self.engine,
-                        schema=s,
-                        views=True,
-                        only=(list(tables) if tables is not None else None)
-                    )
-                    for table in self._metadata.tables.values():
-                        # Check if the table belongs to the current schema
-                        if table.schema == s:
-                            # Update the table's primary key if necessary
-                            prime_table(table)
+        Returns
+        -------
+        MetaData
+            The reflected (and primed) SQLAlchemy metadata.
+
+        Notes
+        -----
+        When the reflection cache is enabled, the metadata is loaded from the local
+        cache file or the `sqlalchemy-cache` blob container, and only reflected from
+        the database on a miss or when the schema fingerprint has changed.
+        """
+
+        if self._metadata is None:
+            if self.lazy:
+                # Tables are reflected into this metadata one at a time by load_model
+                self._metadata = MetaData()
+            elif self.metadata_cache:
+                self._metadata = self.metadata_cache.get_or_reflect(self.reflect)
             else:
-                # Reflect tables for all schemas and include views
-                self._metadata.reflect(bind=self.engine, views=True)
-                for table in self._metadata.tables.values():
-                    # Update the table's primary key if necessary
-                    prime_table(table)
-            try:
-                pickled_data = pickle.dumps(self._metadata)
-                if os.environ.get("AzureWebJobsStorage"):
-                    blob_client.upload_blob(pickled_data, overwrite=True)
-                else:
-                    with open(temp_path, "wb") as f:
-                        f.write(pickled_data)
-            except:
-                pass
+                self._metadata = self.reflect()
         return self._metadata
 
+    def reflect(self) -> MetaData:
+        """
+        Reflect the configured schemas from the database.
+
+        Returns
+        -------
+        MetaData
+            A freshly reflected metadata object.
+
+        Notes
+        -----
+        Tables without a primary key are primed with one, either from a column whose
+        name looks like an identifier or from a synthetic `fake_pk_id` column, so that
+        they can be automapped.
+        """
+
+        metadata = MetaData()
+
+        # Reflect the database tables
+        if self.schemas:
+            # Reflect tables for specific schemas
+            for s, tables in self.schemas.items():
+                # Reflect tables for the given schema and include views
+                metadata.reflect(
+                    bind=self.engine,
+                    schema=s,
+                    views=True,
+                    only=(list(tables) if tables is not None else None)
+                )
+                for table in metadata.tables.values():
+                    # Check if the table belongs to the current schema
+                    if table.schema == s:
+                        # Update the table's primary key if necessary
+                        prime_table(table)
+        else:
+            # Reflect tables for all schemas and include views
+            metadata.reflect(bind=self.engine, views=True)
+            for table in metadata.tables.values():
+                # Update the table's primary key if necessary
+                prime_table(table)
+        return metadata
+
     @property
     def base(self) -> AutomapBase:
         if not self._base:
@@ -322,6 +393,10 @@ class SQLAlchemyStructuredProvider:
     
     @property
     def models(self):
+        if self.lazy:
+            if self._models is None:
+                self._models = LazyModels(self)
+            return self._models
         if not self._models:
             # Retrieve the models for the provider's ID
             self._models = self.base.by_module.get(self.id)
@@ -339,6 +414,127 @@ class SQLAlchemyStructuredProvider:
                     )
         return self._models
 
+    def _mapped(self, schema: str, table: str) -> Any:
+        models = self.base.by_module.get(self.id)
+        if models is not None and schema in models and table in models[schema]:
+            return models[schema][table]
+        return None
+
+    def load_model(self, schema: str, table: str) -> Any:
+        """
+        Reflect, map and extend a single table on demand.
+
+        Parameters
+        ----------
+        schema : str
+            The schema name.
+        table : str
+            The table (or view) name.
+
+        Returns
+        -------
+        Any
+            The automapped model class.
+
+        Raises
+        ------
+        KeyError
+            If the table does not exist or is not part of the configured schemas.
+
+        Examples
+        --------
+        >>> Audience = provider.load_model("keystone", "Audience")
+
+        Notes
+        -----
+        Only the requested table and the tables it references through foreign keys are
+        reflected. Newly mapped models go through `LAZY_MODEL_EXTENSION_STEPS`.
+        """
+
+        if (model := self._mapped(schema, table)) is not None:
+            return model
+        with self._lock:
+            if (model := self._mapped(schema, table)) is not None:
+                return model
+            if self.schemas:
+                if schema not in self.schemas:
+                    raise KeyError(schema)
+                if self.schemas[schema] is not None and table not in self.schemas[schema]:
+                    raise KeyError(f"{schema}.{table}")
+            try:
+                self.metadata.reflect(
+                    bind=self.engine,
+                    schema=None if schema == self.DEFAULT_SCHEMA and not self.schemas else schema,
+                    views=True,
+                    only=[table],
+                )
+            except (InvalidRequestError, NoSuchTableError) as e:
+                raise KeyError(f"{schema}.{table}") from e
+            for t in self.metadata.tables.values():
+                prime_table(t)
+            self.base.prepare(
+                modulename_for_table=self.modulename_for_table,
+                name_for_scalar_relationship=name_for_scalar_relationship,
+                name_for_collection_relationship=name_for_collection_relationship,
+            )
+            new_models = [
+                model
+                for models in self.base.by_module[self.id].values()
+                for model in models.values()
+                if model not in self._extended
+            ]
+            for func in LAZY_MODEL_EXTENSION_STEPS:
+                func(models=new_models, session=self.session)
+            self._extended.update(new_models)
+            if (model := self._mapped(schema, table)) is None:
+                raise KeyError(f"{schema}.{table}")
+            return model
+
+    def loaded_models(self, schema: str) -> List[str]:
+        """
+        List the names of the models already mapped for a schema.
+
+        Parameters
+        ----------
+        schema : str
+            The schema name.
+
+        Returns
+        -------
+        List[str]
+            The mapped table names.
+        """
+
+        models = self.base.by_module.get(self.id)
+        if models is None or schema not in models:
+            return []
+        return list(models[schema].keys())
+
+    def table_names(self, schema: str) -> List[str]:
+        """
+        List the tables and views available in a schema without reflecting them.
+
+        Parameters
+        ----------
+        schema : str
+            The schema name.
+
+        Returns
+        -------
+        List[str]
+            The table and view names, restricted to the configured tables if any.
+        """
+
+        if self.schemas and self.schemas.get(schema) is not None:
+            return list(self.schemas[schema])
+        if schema not in self._table_names:
+            inspector = inspect(self.engine)
+            s = None if schema == self.DEFAULT_SCHEMA and not self.schemas else schema
+            self._table_names[schema] = inspector.get_table_names(
+                schema=s
+            ) + inspector.get_view_names(schema=s)
+        return self._table_names[schema]
+
     def __getitem__(self, handle):
         """
         Get a QueryFrame for the specified handle.
@@ -367,7 +563,7 @@ class SQLAlchemyStructuredProvider:
         selectors = handle.split(self.RESOURCE_TYPE_DELIMITER)
         if self.schemas:
             if selectors[0] not in self.schemas:
-                selectors = [self.schemas[0]] + selectors
+                selectors = [next(iter(self.schemas))] + selectors
         else:
             selectors = [self.DEFAULT_SCHEMA] + selectors
         for selector in selectors:
@@ -441,6 +637,74 @@ class SQLAlchemyStructuredProvider:
             session.add(model(**value))
         session.commit()
 
+    def bulk_save(
+        self,
+        key: str,
+        data: Any,
+        mode: str = "insert",
+        conflict_columns: Sequence[str] = None,
+        batch_size: int = 50000,
+        schema_name: str = None,
+        table_name: str = None,
+        model: Any = None,
+    ) -> dict:
+        """
+        Bulk write many rows to a table.
+
+        Parameters
+        ----------
+        key : str
+            The "schema.table" key of the target table.
+        data : pandas.DataFrame, pyarrow.Table, pyarrow.RecordBatch or Iterable
+            The rows to write. Iterables may yield DataFrames, Tables or RecordBatches,
+            so large inputs can be streamed. Column names must match the table.
+        mode : str, optional
+            "insert" to append rows or "upsert" to insert-or-update them idempotently,
+            by default "insert".
+        conflict_columns : Sequence[str], optional
+            The unique key used by upserts, by default the table's primary key.
+        batch_size : int, optional
+            The maximum number of rows sent per batch, by default 50000.
+        schema_name : str, optional
+            The schema name, by default None.
+        table_name : str, optional
+            The table name, by default None.
+        model : Any, optional
+            The model to use, by default None.
+
+        Returns
+        -------
+        dict
+            The number of rows written, elapsed seconds, rows per second and the
+            write method used.
+
+        Examples
+        --------
+        >>> stats = provider.bulk_save("sales.entities", df, mode="upsert")
+        >>> stats["rows_per_second"]
+
+        Notes
+        -----
+        The write path is chosen from the engine's dialect and driver: `COPY FROM STDIN`
+        for psycopg/psycopg2, `fast_executemany` for pyodbc, multi-row inserts for pymssql
+        and Core `executemany` otherwise. All rows are written in a single transaction.
+        """
+
+        if not model:
+            if not table_name and not schema_name:
+                schema_name, table_name, _ = self.parse_key(key)
+            model = self.models[schema_name or self.DEFAULT_SCHEMA][table_name]
+        table: Table = getattr(model, "__table__", model)
+        with self.engine.begin() as connection:
+            return bulk_write(
+                connection,
+                table,
+                data,
+                mode=mode,
+                conflict_columns=conflict_columns,
+                batch_size=batch_size,
+            )
+
     def load(
         self,
         key: str,
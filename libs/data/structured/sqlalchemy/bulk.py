@@ -0,0 +1,436 @@
+# File: libs/data/structured/sqlalchemy/bulk.py
+
+from sqlalchemy import Connection, Table, insert
+from typing import Any, Iterable, Iterator, List, Sequence
+import datetime, io, logging, orjson as json, time, uuid
+
+logger = logging.getLogger(__name__)
+
+# SQL Server rejects statements with more than 2100 parameters.
+MSSQL_MAX_PARAMETERS = 2000
+MSSQL_MAX_ROWS_PER_INSERT = 1000
+
+# Staged with upserts so rows repeating a key resolve to the last one.
+ORDINAL_COLUMN = "_bulk_ordinal"
+
+
+def iter_record_batches(data: Any, batch_size: int = 50000) -> Iterator[Any]:
+    """
+    Normalize tabular input into a stream of pyarrow RecordBatches.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, pyarrow.Table, pyarrow.RecordBatch or Iterable
+        The rows to write. Iterables may yield DataFrames, Tables or RecordBatches.
+    batch_size : int, optional
+        The maximum number of rows per batch, by default 50000.
+
+    Yields
+    ------
+    pyarrow.RecordBatch
+        The input rows in batches of at most `batch_size` rows.
+    """
+
+    import pyarrow as pa
+
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    if isinstance(data, pa.Table):
+        yield from data.to_batches(max_chunksize=batch_size)
+        return
+    if hasattr(data, "to_records") and hasattr(data, "columns"):
+        # pandas DataFrame: convert slices so NaN/NaT become nulls without copying the whole frame
+        for start in range(0, len(data), batch_size):
+            yield pa.RecordBatch.from_pandas(
+                data.iloc[start : start + batch_size], preserve_index=False
+            )
+        return
+    for item in data:
+        yield from iter_record_batches(item, batch_size=batch_size)
+
+
+def _with_ordinals(batches: Iterable[Any]) -> Iterator[Any]:
+    """
+    Append the position of each row in the stream as the ORDINAL_COLUMN of its batch.
+    """
+
+    import pyarrow as pa
+
+    offset = 0
+    for batch in batches:
+        yield batch.append_column(
+            ORDINAL_COLUMN,
+            pa.array(range(offset, offset + batch.num_rows), type=pa.int64()),
+        )
+        offset += batch.num_rows
+
+
+def _rows(batch: Any, columns: Sequence[str]) -> List[tuple]:
+    return list(zip(*[batch.column(column).to_pylist() for column in columns]))
+
+
+def _csv_value(value: Any) -> str:
+    """
+    Encode a value as a field of PostgreSQL's CSV COPY format with NULL '\\N'.
+
+    Only NULL is written unquoted. Every other value is quoted, so a string that equals
+    the NULL marker still loads as that string.
+    """
+
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = "\\x" + bytes(value).hex()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value).decode()
+    elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+class BulkWriter:
+    """
+    Dialect-aware bulk writer for a single table.
+
+    Parameters
+    ----------
+    connection : Connection
+        An open SQLAlchemy connection inside a transaction.
+    table : Table
+        The target table.
+
+    Notes
+    -----
+    The fastest available path is picked from the connection's dialect and driver:
+
+    - PostgreSQL via psycopg (3) or psycopg2: `COPY ... FROM STDIN`.
+    - SQL Server via pyodbc: parameterized inserts with `fast_executemany`.
+    - SQL Server via pymssql: multi-row `INSERT ... VALUES` statements sized to the
+      parameter limit.
+    - Anything else: Core `executemany`.
+
+    Upserts stage the rows in a temporary table with the same fast path, then merge
+    them into the target with `INSERT ... ON CONFLICT` (PostgreSQL) or `MERGE`
+    (SQL Server). SQLite upserts use `INSERT ... ON CONFLICT` directly. On every
+    dialect, the last of several input rows with the same key wins.
+    """
+
+    def __init__(self, connection: Connection, table: Table) -> None:
+        self.connection = connection
+        self.table = table
+        self.dialect = connection.dialect
+        self.preparer = connection.dialect.identifier_preparer
+
+    @property
+    def driver(self) -> str:
+        return self.dialect.driver
+
+    @property
+    def method(self) -> str:
+        """
+        The write path used for plain inserts.
+        """
+
+        match self.dialect.name, self.driver:
+            case "postgresql", "psycopg" | "psycopg2":
+                return "copy"
+            case "mssql", "pyodbc":
+                return "fast_executemany"
+            case "mssql", _:
+                return "multi_values"
+            case _:
+                return "executemany"
+
+    def _quoted_table(self, table: Table = None) -> str:
+        return self.preparer.format_table(table if table is not None else self.table)
+
+    def _quoted_columns(self, columns: Sequence[str]) -> str:
+        return ", ".join(self.preparer.quote(column) for column in columns)
+
+    def _cursor(self):
+        return self.connection.connection.driver_connection.cursor()
+
+    def write(self, batch: Any, columns: Sequence[str], target: str = None) -> int:
+        """
+        Insert a RecordBatch into the target (or a staging) table.
+
+        Parameters
+        ----------
+        batch : pyarrow.RecordBatch
+            The rows to insert.
+        columns : Sequence[str]
+            The column names to write, all present in the batch.
+        target : str, optional
+            A quoted table name to write to instead of the bound table.
+
+        Returns
+        -------
+        int
+            The number of rows written.
+        """
+
+        target = target or self._quoted_table()
+        rows = _rows(batch, columns)
+        if not rows:
+            return 0
+        match self.method:
+            case "copy":
+                self._copy(rows, columns, target)
+            case "fast_executemany":
+                cursor = self._cursor()
+                cursor.fast_executemany = True
+                cursor.executemany(
+                    f"INSERT INTO {target} ({self._quoted_columns(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    rows,
+                )
+            case "multi_values":
+                chunk = max(
+                    1, min(MSSQL_MAX_ROWS_PER_INSERT, MSSQL_MAX_PARAMETERS // len(columns))
+                )
+                cursor = self._cursor()
+                row_sql = f"({', '.join('%s' for _ in columns)})"
+                for start in range(0, len(rows), chunk):
+                    part = rows[start : start + chunk]
+                    cursor.execute(
+                        f"INSERT INTO {target} ({self._quoted_columns(columns)}) VALUES "
+                        + ", ".join(row_sql for _ in part),
+                        tuple(value for row in part for value in row),
+                    )
+            case _:
+                if target == self._quoted_table():
+                    self.connection.execute(
+                        insert(self.table), [dict(zip(columns, row)) for row in rows]
+                    )
+                else:
+                    cursor = self._cursor()
+                    marker = "?" if self.dialect.paramstyle == "qmark" else "%s"
+                    cursor.executemany(
+                        f"INSERT INTO {target} ({self._quoted_columns(columns)}) "
+                        f"VALUES ({', '.join(marker for _ in columns)})",
+                        rows,
+                    )
+        return len(rows)
+
+    def _copy(self, rows: List[tuple], columns: Sequence[str], target: str) -> None:
+        sql = f"COPY {target} ({self._quoted_columns(columns)}) FROM STDIN"
+        cursor = self._cursor()
+        if self.driver == "psycopg":
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write(",".join(_csv_value(value) for value in row) + "\n")
+            buffer.seek(0)
+            cursor.copy_expert(f"{sql} WITH (FORMAT csv, NULL '\\N')", buffer)
+
+    def upsert(
+        self,
+        batches: Iterable[Any],
+        columns: Sequence[str],
+        conflict_columns: Sequence[str],
+    ) -> int:
+        """
+        Idempotently insert or update rows keyed by `conflict_columns`.
+
+        Parameters
+        ----------
+        batches : Iterable[pyarrow.RecordBatch]
+            The rows to write.
+        columns : Sequence[str]
+            The column names to write.
+        conflict_columns : Sequence[str]
+            The unique key identifying existing rows. When the input repeats a key,
+            the last row with that key is written.
+
+        Returns
+        -------
+        int
+            The number of rows staged.
+        """
+
+        update_columns = [c for c in columns if c not in conflict_columns]
+        match self.dialect.name:
+            case "postgresql":
+                stage = self.preparer.quote(f"stage_{uuid.uuid4().hex}")
+                ordinal = self.preparer.quote(ORDINAL_COLUMN)
+                self.connection.exec_driver_sql(
+                    f"CREATE TEMP TABLE {stage} AS SELECT {self._quoted_columns(columns)}, "
+                    f"CAST(NULL AS BIGINT) AS {ordinal} "
+                    f"FROM {self._quoted_table()} WITH NO DATA"
+                )
+                rows = sum(
+                    self.write(batch, [*columns, ORDINAL_COLUMN], target=stage)
+                    for batch in _with_ordinals(batches)
+                )
+                keys = self._quoted_columns(conflict_columns)
+                action = (
+                    "DO UPDATE SET "
+                    + ", ".join(
+                        f"{self.preparer.quote(c)} = EXCLUDED.{self.preparer.quote(c)}"
+                        for c in update_columns
+                    )
+                    if update_columns
+                    else "DO NOTHING"
+                )
+                self.connection.exec_driver_sql(
+                    f"INSERT INTO {self._quoted_table()} ({self._quoted_columns(columns)}) "
+                    f"SELECT DISTINCT ON ({keys}) {self._quoted_columns(columns)} FROM {stage} "
+                    f"ORDER BY {keys}, {ordinal} DESC "
+                    f"ON CONFLICT ({keys}) {action}"
+                )
+                self.connection.exec_driver_sql(f"DROP TABLE {stage}")
+                return rows
+            case "mssql":
+                stage = f"#stage_{uuid.uuid4().hex}"
+                ordinal = self.preparer.quote(ORDINAL_COLUMN)
+                self.connection.exec_driver_sql(
+                    f"SELECT TOP 0 {self._quoted_columns(columns)}, "
+                    f"CAST(NULL AS BIGINT) AS {ordinal} INTO {stage} "
+                    f"FROM {self._quoted_table()}"
+                )
+                rows = sum(
+                    self.write(batch, [*columns, ORDINAL_COLUMN], target=stage)
+                    for batch in _with_ordinals(batches)
+                )
+                # MERGE fails if two source rows match the same target row, so keep
+                # only the last row per key
+                source = (
+                    f"(SELECT {self._quoted_columns(columns)} FROM ("
+                    f"SELECT *, ROW_NUMBER() OVER (PARTITION BY "
+                    f"{self._quoted_columns(conflict_columns)} ORDER BY {ordinal} DESC) "
+                    f"AS [_bulk_rank] FROM {stage}) AS r WHERE [_bulk_rank] = 1)"
+                )
+                on = " AND ".join(
+                    f"t.{self.preparer.quote(c)} = s.{self.preparer.quote(c)}"
+                    for c in conflict_columns
+                )
+                matched = (
+                    "WHEN MATCHED THEN UPDATE SET "
+                    + ", ".join(
+                        f"t.{self.preparer.quote(c)} = s.{self.preparer.quote(c)}"
+                        for c in update_columns
+                    )
+                    if update_columns
+                    else ""
+                )
+                self.connection.exec_driver_sql(
+                    f"MERGE {self._quoted_table()} AS t USING {source} AS s ON {on} {matched} "
+                    f"WHEN NOT MATCHED THEN INSERT ({self._quoted_columns(columns)}) "
+                    f"VALUES ({', '.join('s.' + self.preparer.quote(c) for c in columns)});"
+                )
+                self.connection.exec_driver_sql(f"DROP TABLE {stage}")
+                return rows
+            case "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+                rows = 0
+                for batch in batches:
+                    records = [dict(zip(columns, row)) for row in _rows(batch, columns)]
+                    if not records:
+                        continue
+                    statement = sqlite_insert(self.table)
+                    statement = (
+                        statement.on_conflict_do_update(
+                            index_elements=list(conflict_columns),
+                            set_={c: statement.excluded[c] for c in update_columns},
+                        )
+                        if update_columns
+                        else statement.on_conflict_do_nothing(
+                            index_elements=list(conflict_columns)
+                        )
+                    )
+                    self.connection.execute(statement, records)
+                    rows += len(records)
+                return rows
+            case _:
+                raise NotImplementedError(
+                    f"Bulk upserts are not supported for the '{self.dialect.name}' dialect."
+                )
+
+
+def bulk_write(
+    connection: Connection,
+    table: Table,
+    data: Any,
+    mode: str = "insert",
+    conflict_columns: Sequence[str] = None,
+    batch_size: int = 50000,
+) -> dict:
+    """
+    Bulk write tabular data into a table using the fastest path for the dialect.
+
+    Parameters
+    ----------
+    connection : Connection
+        An open SQLAlchemy connection inside a transaction.
+    table : Table
+        The target table.
+    data : pandas.DataFrame, pyarrow.Table, pyarrow.RecordBatch or Iterable
+        The rows to write.
+    mode : str, optional
+        "insert" or "upsert", by default "insert".
+    conflict_columns : Sequence[str], optional
+        The key used by upserts, by default the table's primary key.
+    batch_size : int, optional
+        The maximum number of rows per batch, by default 50000.
+
+    Returns
+    -------
+    dict
+        The number of rows written, elapsed seconds, rows per second and write method.
+
+    Raises
+    ------
+    ValueError
+        If the data has columns the table does not, or an upsert has no key.
+    """
+
+    writer = BulkWriter(connection, table)
+    batches = iter_record_batches(data, batch_size=batch_size)
+    start = time.perf_counter()
+
+    first = next(batches, None)
+    if first is None:
+        return {"rows": 0, "seconds": 0.0, "rows_per_second": 0.0, "method": writer.method}
+    unknown = [c for c in first.schema.names if c not in table.c]
+    if unknown:
+        raise ValueError(f"Columns {unknown} do not exist on {table.fullname}.")
+    columns = list(first.schema.names)
+
+    def chained():
+        yield first
+        yield from batches
+
+    match mode:
+        case "insert":
+            rows = sum(writer.write(batch, columns) for batch in chained())
+            method = writer.method
+        case "upsert":
+            conflict_columns = list(
+                conflict_columns
+                or [c.name for c in table.primary_key.columns if c.name != "fake_pk_id"]
+            )
+            if not conflict_columns:
+                raise ValueError(f"No conflict columns available for {table.fullname}.")
+            rows = writer.upsert(chained(), columns, conflict_columns)
+            method = f"upsert:{writer.method}"
+        case _:
+            raise ValueError(f"Unsupported bulk write mode '{mode}'.")
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else float(rows),
+        "method": method,
+    }
+    logger.info(
+        f"Bulk wrote {rows} rows to {table.fullname} via {method} "
+        f"in {seconds:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+    )
+    return stats
@@ -0,0 +1,352 @@
+# File: libs/data/structured/sqlalchemy/cache.py
+
+from sqlalchemy import Engine, MetaData, bindparam, text
+from typing import Callable, Dict, List, Optional
+import hashlib, logging, os, pickle, tempfile, threading, time
+
+logger = logging.getLogger(__name__)
+
+# Process-wide counters shared by every MetadataCache instance.
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, float] = {
+    "hits_local": 0,
+    "hits_blob": 0,
+    "misses": 0,
+    "invalidations": 0,
+    "errors": 0,
+    "load_seconds": 0.0,
+    "fingerprint_seconds": 0.0,
+    "reflect_seconds": 0.0,
+}
+
+# Dialect specific fingerprint queries. Each returns a single scalar that changes
+# whenever a column is added, dropped, renamed, retyped or reordered.
+_FINGERPRINT_QUERIES = {
+    "postgresql": """
+        SELECT md5(string_agg(
+            table_schema || '.' || table_name || '.' || column_name || ':' || data_type || ':' || is_nullable,
+            ',' ORDER BY table_schema, table_name, ordinal_position
+        ))
+        FROM information_schema.columns
+        {where}
+    """,
+    "mssql": """
+        SELECT CHECKSUM_AGG(CHECKSUM(
+            TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, ORDINAL_POSITION
+        ))
+        FROM INFORMATION_SCHEMA.COLUMNS
+        {where}
+    """,
+}
+_FINGERPRINT_FALLBACK = """
+    SELECT table_schema, table_name, column_name, data_type, is_nullable, ordinal_position
+    FROM information_schema.columns
+    {where}
+    ORDER BY table_schema, table_name, ordinal_position
+"""
+
+
+def get_cache_stats() -> dict:
+    """
+    Get the process-wide reflection cache counters.
+
+    Returns
+    -------
+    dict
+        A copy of the hit, miss, invalidation and error counters, along with
+        the cumulative seconds spent loading cache entries, computing
+        fingerprints and reflecting metadata from the database.
+
+    Examples
+    --------
+    >>> from libs.data.structured.sqlalchemy.cache import get_cache_stats
+    >>> get_cache_stats()["hits_blob"]
+    """
+
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def _record(counter: str, value: float = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[counter] += value
+
+
+class MetadataCache:
+    """
+    Two-tier cache for reflected SQLAlchemy `MetaData`.
+
+    Entries are kept in a local file under the temp directory and, when
+    `AzureWebJobsStorage` is configured, in a blob container shared by every
+    worker. Each entry stores the schema fingerprint that was current when the
+    metadata was reflected, so a schema change on the server invalidates the
+    entry on the next lookup.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine whose database is being reflected.
+    schemas : dict, optional
+        Mapping of schema names to the list of tables to reflect (or None for
+        every table), as used by `SQLAlchemyStructuredProvider`.
+    container_name : str, optional
+        The blob container used for the shared tier, by default "sqlalchemy-cache".
+    validate : bool, optional
+        Whether to compare the stored fingerprint with the live one, by default True.
+        When False, any cached entry is trusted and no database round trip is made.
+
+    Examples
+    --------
+    >>> cache = MetadataCache(engine, {"keystone": None})
+    >>> metadata = cache.get_or_reflect(reflect)
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        schemas: Optional[Dict[str, Optional[List[str]]]] = None,
+        container_name: str = "sqlalchemy-cache",
+        validate: bool = True,
+    ) -> None:
+        self.engine = engine
+        self.schemas = schemas or {}
+        self.container_name = container_name
+        self.validate = validate
+        self.stats = {
+            "hits_local": 0,
+            "hits_blob": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+        self._fingerprint = None
+        self._blob = None
+
+    @property
+    def key(self) -> str:
+        """
+        Cache key built from the normalized bind URL and the reflected schemas.
+
+        The password is stripped from the URL so rotating credentials does not
+        invalidate the cache.
+        """
+
+        url = self.engine.url.render_as_string(hide_password=True)
+        schemas = sorted(
+            (schema, sorted(tables) if tables is not None else None)
+            for schema, tables in self.schemas.items()
+        )
+        digest = hashlib.md5(repr((url, schemas)).encode()).hexdigest()
+        return f"sqlalchemy_metadata_{digest}.pkl"
+
+    @property
+    def local_path(self) -> str:
+        return os.path.join(tempfile.gettempdir(), self.key)
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """
+        A cheap checksum of the reflected schemas' column definitions.
+
+        Returns None when the database does not expose a usable
+        information_schema, in which case cached entries are trusted.
+        """
+
+        if self._fingerprint is None:
+            start = time.perf_counter()
+            self._fingerprint = self._compute_fingerprint()
+            _record("fingerprint_seconds", time.perf_counter() - start)
+        return self._fingerprint or None
+
+    def _compute_fingerprint(self) -> str:
+        dialect = self.engine.dialect.name
+        schemas = list(self.schemas.keys())
+        where = "WHERE table_schema IN :schemas" if schemas else ""
+        params = {"schemas": schemas} if schemas else {}
+
+        def prepare(query: str):
+            statement = text(query.format(where=where))
+            if schemas:
+                statement = statement.bindparams(bindparam("schemas", expanding=True))
+            return statement
+
+        try:
+            with self.engine.connect() as conn:
+                if dialect == "sqlite":
+                    rows = conn.execute(
+                        text("SELECT type, name, sql FROM sqlite_master ORDER BY name")
+                    ).all()
+                    return hashlib.md5(repr(rows).encode()).hexdigest()
+                if dialect in _FINGERPRINT_QUERIES:
+                    try:
+                        value = conn.execute(
+                            prepare(_FINGERPRINT_QUERIES[dialect]), params
+                        ).scalar()
+                        return f"{dialect}:{value}"
+                    except Exception:
+                        conn.rollback()
+                rows = conn.execute(prepare(_FINGERPRINT_FALLBACK), params).all()
+                return hashlib.md5(repr(rows).encode()).hexdigest()
+        except Exception as e:
+            logger.warning(f"Unable to fingerprint {self.key}: {e}")
+            _record("errors")
+            return ""
+
+    def _blob_client(self):
+        if self._blob is not None or not os.environ.get("AzureWebJobsStorage"):
+            return self._blob
+        try:
+            from libs.utils.azure_storage import get_blob_service_client
+
+            service_client = get_blob_service_client(
+                connection_string=os.environ["AzureWebJobsStorage"]
+            )
+            container_client = service_client.get_container_client(self.container_name)
+            if not container_client.exists():
+                service_client.create_container(self.container_name)
+            self._blob = container_client.get_blob_client(self.key)
+            return self._blob
+        except Exception as e:
+            logger.warning(f"Blob tier unavailable for {self.key}: {e}")
+            _record("errors")
+            return None
+
+    def _read_local(self) -> Optional[dict]:
+        try:
+            if os.path.exists(self.local_path):
+                with open(self.local_path, "rb") as f:
+                    return pickle.load(f)
+        except Exception:
+            _record("errors")
+        return None
+
+    def _write_local(self, data: bytes) -> None:
+        try:
+            # Write to a sibling file first so concurrent readers never see a partial entry.
+            temp_path = f"{self.local_path}.{os.getpid()}.{threading.get_ident()}"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self.local_path)
+        except Exception:
+            _record("errors")
+
+    def _is_valid(self, entry: Optional[dict]) -> bool:
+        if not isinstance(entry, dict) or not isinstance(entry.get("metadata"), MetaData):
+            return False
+        if not self.validate:
+            return True
+        fingerprint = self.fingerprint
+        if fingerprint is None or entry.get("fingerprint") == fingerprint:
+            return True
+        self.stats["invalidations"] += 1
+        _record("invalidations")
+        return False
+
+    def load(self) -> Optional[MetaData]:
+        """
+        Load the cached metadata, checking the local tier before the blob tier.
+
+        Returns
+        -------
+        MetaData or None
+            The cached metadata, or None on a miss or a stale entry.
+        """
+
+        start = time.perf_counter()
+        try:
+            entry = self._read_local()
+            if self._is_valid(entry):
+                self.stats["hits_local"] += 1
+                _record("hits_local")
+                return entry["metadata"]
+
+            blob_client = self._blob_client()
+            if blob_client is not None:
+                try:
+                    if blob_client.exists():
+                        data = blob_client.download_blob().readall()
+                        entry = pickle.loads(data)
+                        if self._is_valid(entry):
+                            # Promote to the local tier for the next cold import on this worker.
+                            self._write_local(data)
+                            self.stats["hits_blob"] += 1
+                            _record("hits_blob")
+                            return entry["metadata"]
+                except Exception:
+                    _record("errors")
+
+            self.stats["misses"] += 1
+            _record("misses")
+            return None
+        finally:
+            _record("load_seconds", time.perf_counter() - start)
+
+    def save(self, metadata: MetaData) -> None:
+        """
+        Store metadata in both tiers along with the current fingerprint.
+
+        Parameters
+        ----------
+        metadata : MetaData
+            The reflected metadata to cache.
+        """
+
+        try:
+            data = pickle.dumps(
+                {
+                    "fingerprint": self.fingerprint if self.validate else None,
+                    "created": time.time(),
+                    "metadata": metadata,
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Unable to serialize metadata for {self.key}: {e}")
+            _record("errors")
+            return
+        self._write_local(data)
+        blob_client = self._blob_client()
+        if blob_client is not None:
+            try:
+                blob_client.upload_blob(data, overwrite=True)
+            except Exception:
+                _record("errors")
+
+    def invalidate(self) -> None:
+        """
+        Remove the entry from both tiers.
+        """
+
+        try:
+            if os.path.exists(self.local_path):
+                os.remove(self.local_path)
+        except Exception:
+            _record("errors")
+        blob_client = self._blob_client()
+        if blob_client is not None:
+            try:
+                blob_client.delete_blob()
+            except Exception:
+                pass
+        self._fingerprint = None
+
+    def get_or_reflect(self, reflect: Callable[[], MetaData]) -> MetaData:
+        """
+        Return cached metadata, reflecting and caching it on a miss.
+
+        Parameters
+        ----------
+        reflect : Callable[[], MetaData]
+            A callable that reflects fresh metadata from the database.
+
+        Returns
+        -------
+        MetaData
+            The cached or freshly reflected metadata.
+        """
+
+        metadata = self.load()
+        if metadata is None:
+            start = time.perf_counter()
+            metadata = reflect()
+            _record("reflect_seconds", time.perf_counter() - start)
+            self.save(metadata)
+        return metadata
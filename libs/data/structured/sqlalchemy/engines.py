@@ -0,0 +1,353 @@
+# File: libs/data/structured/sqlalchemy/engines.py
+
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy.pool import Pool
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging, os, threading, time
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing arguments are not part of an engine's identity: the first binding
+# to create an engine for a URL decides the pool size and later bindings share it.
+POOL_SIZING_ARGUMENTS = ("pool_size", "max_overflow", "max_connections")
+
+# Checkouts that wait longer than this are logged as warnings.
+SLOW_CHECKOUT_SECONDS = float(os.environ.get("SQLALCHEMY_SLOW_CHECKOUT_SECONDS", 1.0))
+
+_ENGINES_LOCK = threading.RLock()
+_ENGINES: Dict[Tuple[str, str], Engine | AsyncEngine] = {}
+_STATS: Dict[Tuple[str, str], dict] = {}
+_POOL_CLASSES: Dict[type, type] = {}
+
+
+def normalize_url(url: str | URL) -> URL:
+    """
+    Normalize a database URL so equivalent URLs map to the same engine.
+
+    Parameters
+    ----------
+    url : str or URL
+        The database URL.
+
+    Returns
+    -------
+    URL
+        The URL with a lower-cased driver name and sorted query parameters.
+
+    Examples
+    --------
+    >>> normalize_url("postgresql://u:p@host/db?sslmode=require&application_name=x")
+    """
+
+    url = make_url(url)
+    return url.set(
+        drivername=url.drivername.lower(),
+        query=dict(sorted(url.query.items())),
+    )
+
+
+def pool_size_for_workers(
+    max_connections: Optional[int] = None,
+    processes: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Size a connection pool from the Functions host's worker concurrency.
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        The number of connections this app may hold on the server across every
+        worker process. Defaults to the `SQLALCHEMY_MAX_CONNECTIONS` setting;
+        when neither is set the pool is sized by concurrency alone.
+    processes : int, optional
+        The number of worker processes, by default `FUNCTIONS_WORKER_PROCESS_COUNT` (or 1).
+    threads : int, optional
+        The number of threads per worker, by default `PYTHON_THREADPOOL_THREAD_COUNT`
+        (or the Python worker's default of min(32, cpu_count + 4)).
+
+    Returns
+    -------
+    dict
+        The `pool_size` and `max_overflow` keyword arguments for `create_engine`.
+
+    Examples
+    --------
+    >>> pool_size_for_workers(max_connections=100, processes=4, threads=32)
+    {'pool_size': 25, 'max_overflow': 0}
+
+    Notes
+    -----
+    Each worker thread can hold at most one connection at a time, so the pool
+    keeps one connection per thread with a little headroom for overflow.
+    With a connection budget, each process gets an equal share of it.
+    """
+
+    processes = max(
+        1, int(processes or os.environ.get("FUNCTIONS_WORKER_PROCESS_COUNT") or 1)
+    )
+    threads = max(
+        1,
+        int(
+            threads
+            or os.environ.get("PYTHON_THREADPOOL_THREAD_COUNT")
+            or min(32, (os.cpu_count() or 1) + 4)
+        ),
+    )
+    max_connections = max_connections or os.environ.get("SQLALCHEMY_MAX_CONNECTIONS")
+
+    pool_size = threads
+    max_overflow = max(1, threads // 2)
+    if max_connections:
+        budget = max(1, int(max_connections) // processes)
+        pool_size = min(pool_size, budget)
+        max_overflow = min(max_overflow, budget - pool_size)
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+
+def get_engine(url: str | URL, **kwargs) -> Engine:
+    """
+    Get the process-wide engine for a database URL, creating it on first use.
+
+    Parameters
+    ----------
+    url : str or URL
+        The database URL.
+    **kwargs : dict
+        Keyword arguments for `create_engine`. `pool_size` may be "auto" to size
+        the pool with `pool_size_for_workers`, optionally capped by a
+        `max_connections` budget.
+
+    Returns
+    -------
+    Engine
+        A shared, instrumented engine.
+
+    Examples
+    --------
+    >>> engine = get_engine(os.environ["DATABIND_SQL_KEYSTONE"], pool_size="auto")
+    >>> engine is get_engine(os.environ["DATABIND_SQL_KEYSTONE"])
+    True
+
+    Notes
+    -----
+    Engines are keyed by the normalized URL and every keyword argument except
+    the pool sizing ones, so bindings that point at the same database share a
+    single pool.
+    """
+
+    return _get_or_create(create_engine, url, **kwargs)
+
+
+def get_async_engine(url: str | URL, **kwargs) -> AsyncEngine:
+    """
+    Get the process-wide asyncio engine for a database URL, creating it on first use.
+
+    Parameters
+    ----------
+    url : str or URL
+        The database URL, using an asyncio driver (e.g. "postgresql+psycopg").
+    **kwargs : dict
+        Keyword arguments for `create_async_engine`, with the same pool sizing
+        options as `get_engine`.
+
+    Returns
+    -------
+    AsyncEngine
+        A shared, instrumented asyncio engine.
+
+    Examples
+    --------
+    >>> engine = get_async_engine("postgresql+psycopg://u:p@host/db", pool_size="auto")
+    """
+
+    return _get_or_create(create_async_engine, url, **kwargs)
+
+
+def _get_or_create(factory: Callable, url: str | URL, **kwargs) -> Any:
+    url = normalize_url(url)
+    sizing = {k: kwargs.pop(k) for k in POOL_SIZING_ARGUMENTS if k in kwargs}
+    key = (
+        url.render_as_string(hide_password=False),
+        repr(sorted(kwargs.items())),
+    )
+
+    with _ENGINES_LOCK:
+        if key in _ENGINES:
+            if sizing:
+                logger.debug(
+                    f"Reusing the engine for {_label(key)}; pool sizing {sizing} ignored."
+                )
+            return _ENGINES[key]
+
+        if sizing.get("pool_size") == "auto":
+            auto = pool_size_for_workers(sizing.get("max_connections"))
+            sizing["pool_size"] = auto["pool_size"]
+            sizing.setdefault("max_overflow", auto["max_overflow"])
+        sizing.pop("max_connections", None)
+
+        pool_class = kwargs.pop("poolclass", None) or url.get_dialect().get_pool_class(
+            url
+        )
+        if pool_class.__name__ not in ("QueuePool", "AsyncAdaptedQueuePool"):
+            # Only queue pools accept sizing arguments.
+            sizing = {}
+        engine = factory(url, poolclass=_instrumented(pool_class), **sizing, **kwargs)
+        sync_engine = getattr(engine, "sync_engine", engine)
+        _STATS[key] = {
+            "checkouts": 0,
+            "checkins": 0,
+            "connects": 0,
+            "timeouts": 0,
+            "connect_seconds": 0.0,
+            "connect_seconds_max": 0.0,
+            "wait_seconds": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        sync_engine.pool._engine_key = key
+        _listen(sync_engine, key)
+        _ENGINES[key] = engine
+        logger.info(
+            f"Created engine for {_label(key)} with {sync_engine.pool.status()}"
+        )
+        return engine
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """
+    Get connection pool metrics for every registered engine.
+
+    Returns
+    -------
+    dict
+        Mapping of each engine's URL (password hidden) to its metrics: current
+        `size`, `checked_out` and `overflow`, cumulative `checkouts`, `checkins`,
+        `connects` and `timeouts`, and the total and maximum `connect_seconds`
+        and `wait_seconds`.
+
+    Examples
+    --------
+    >>> from libs.data.structured.sqlalchemy.engines import get_pool_stats
+    >>> get_pool_stats()
+    """
+
+    with _ENGINES_LOCK:
+        stats = {}
+        for key, engine in _ENGINES.items():
+            pool = getattr(engine, "sync_engine", engine).pool
+            stats[_label(key)] = {
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                **_STATS[key],
+            }
+        return stats
+
+
+def log_pool_stats(level: int = logging.INFO) -> None:
+    """
+    Write the current pool metrics for every registered engine to the log.
+
+    Parameters
+    ----------
+    level : int, optional
+        The logging level, by default logging.INFO.
+    """
+
+    for label, stats in get_pool_stats().items():
+        logger.log(level, f"Pool {label}: {stats}")
+
+
+def dispose_engines() -> None:
+    """
+    Dispose of every registered engine and clear the registry.
+    """
+
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            getattr(engine, "sync_engine", engine).dispose()
+        _ENGINES.clear()
+        _STATS.clear()
+
+
+def _label(key: Tuple[str, str]) -> str:
+    return make_url(key[0]).render_as_string(hide_password=True)
+
+
+def _record(key: Tuple[str, str], name: str, seconds: Optional[float] = None) -> None:
+    with _ENGINES_LOCK:
+        stats = _STATS.get(key)
+        if stats is None:
+            return
+        if seconds is None:
+            stats[name] += 1
+        else:
+            stats[f"{name}_seconds"] += seconds
+            stats[f"{name}_seconds_max"] = max(stats[f"{name}_seconds_max"], seconds)
+
+
+def _instrumented(pool_class: type) -> type:
+    """
+    Subclass a pool class so the time spent waiting for a connection is recorded.
+
+    A subclass (rather than a patched instance) survives `Engine.dispose()`,
+    which recreates the pool from its class.
+    """
+
+    if pool_class not in _POOL_CLASSES:
+
+        def _do_get(self) -> Any:
+            start = time.perf_counter()
+            try:
+                return pool_class._do_get(self)
+            except Exception as e:
+                if e.__class__.__name__ == "TimeoutError":
+                    _record(getattr(self, "_engine_key", None), "timeouts")
+                    logger.warning(f"Timed out waiting for a connection: {self.status()}")
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _record(getattr(self, "_engine_key", None), "wait", elapsed)
+                if elapsed > SLOW_CHECKOUT_SECONDS:
+                    logger.warning(
+                        f"Waited {elapsed:.2f}s for a connection: {self.status()}"
+                    )
+
+        def recreate(self) -> Pool:
+            pool = pool_class.recreate(self)
+            pool._engine_key = getattr(self, "_engine_key", None)
+            return pool
+
+        _POOL_CLASSES[pool_class] = type(
+            f"Instrumented{pool_class.__name__}",
+            (pool_class,),
+            {
+                "__module__": pool_class.__module__,
+                "_do_get": _do_get,
+                "recreate": recreate,
+            },
+        )
+    return _POOL_CLASSES[pool_class]
+
+
+def _listen(engine: Engine, key: Tuple[str, str]) -> None:
+    @event.listens_for(engine, "do_connect")
+    def _do_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        start = connection_record.info.pop("connect_start", None)
+        if start is not None:
+            _record(key, "connect", time.perf_counter() - start)
+        _record(key, "connects")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        _record(key, "checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        _record(key, "checkins")
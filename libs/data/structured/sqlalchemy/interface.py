@@ -3,7 +3,8 @@ from sqlalchemy import Column
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import InstrumentedAttribute, Mapper, Query, Session
 from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList
-from typing import Any, List
+from typing import Any, Iterator, List
+import datetime, decimal, os, tempfile
 
 
 class QueryFrame:
@@ -35,6 +36,8 @@ class QueryFrame:
         The limit for the number of results.
     __offset : int
         The offset for the query results.
+    __count : int
+        The memoized row count of the unsliced query, reset when the selection or filters change.
 
     Methods
     -------
@@ -54,8 +57,22 @@ class QueryFrame:
         Handle slicing operations on the query frame.
     sort_values(self, *args)
         Sort the query results based on the given columns.
+    count(self) -> int
+        Get the memoized count of the unsliced query results.
+    pages(self, order_key, page_size: int = 10000)
+        Iterate over the query results with keyset pagination.
     to_pandas(self)
         Convert the query results to a pandas DataFrame.
+    iter_rows(self, size: int = 10000)
+        Stream the query results as lists of Core row tuples.
+    iter_batches(self, size: int = 10000)
+        Stream the query results as pandas DataFrames of at most `size` rows.
+    iter_record_batches(self, size: int = 10000)
+        Stream the query results as pyarrow RecordBatches of at most `size` rows.
+    to_arrow(self, size: int = 10000)
+        Convert the query results to a pyarrow Table.
+    to_parquet(self, path_or_blob, size: int = 10000, **kwargs)
+        Write the query results to a Parquet file or blob.
 
     Examples
     --------
@@ -89,6 +106,7 @@ class QueryFrame:
         self.__sort = ()
         self.__limit = 0
         self.__offset = 0
+        self.__count = None
     
     @property
     def schema(self) -> Schema:
@@ -137,18 +155,25 @@ class QueryFrame:
                 return [self[item] for item in key]
             case InstrumentedAttribute():
                 self.__select.append(key)
+                self.__count = None
             case BinaryExpression() | BooleanClauseList():
                 self.__ops.append(("where", key))
+                self.__count = None
             case str():
                 return self.__getitem_field(key)
             case slice():
                 self.__slice(key)
         return self
 
-    def __build__(self) -> Query:
+    def __build__(self, sliced: bool = True) -> Query:
         """
         Build the SQLAlchemy query object.
 
+        Parameters
+        ----------
+        sliced : bool, optional
+            Whether to apply the sort, limit and offset, by default True.
+
         Returns
         -------
         Query
@@ -162,7 +187,7 @@ class QueryFrame:
         )
         for op in self.__ops:
             query = getattr(query, op[0])(op[1])
-        if len(self.__sort):
+        if sliced and len(self.__sort):
             query = query.order_by(*self.__sort)
             if self.__limit:
                 query = query.limit(self.__limit)
@@ -207,9 +232,42 @@ class QueryFrame:
         --------
         >>> len(query_frame)
         >>> # Perform actions with the count.
+
+        Notes
+        -----
+        The count is derived from the memoized unsliced count, so repeated calls
+        only hit the database after the selection or filters change.
+        """
+
+        count = self.count()
+        if len(self.__sort) and (self.__limit or self.__offset):
+            count = max(count - self.__offset, 0)
+            if self.__limit:
+                count = min(count, self.__limit)
+        return count
+
+    def count(self) -> int:
+        """
+        Get the count of the unsliced query results.
+
+        Returns
+        -------
+        int
+            The number of rows matching the current selection and filters,
+            ignoring any limit or offset.
+
+        Examples
+        --------
+        >>> query_frame.count()
+
+        Notes
+        -----
+        The count is memoized per frame and reset whenever a field or filter is added.
         """
 
-        return self.__build__().count()
+        if self.__count is None:
+            self.__count = self.__build__(sliced=False).count()
+        return self.__count
 
     def __repr__(self) -> str:
         """
@@ -289,19 +347,16 @@ class QueryFrame:
                         self.__sort = [self.__select[0]]
         start = 0
         stop = 0
-        count = 0
         if (
             (isinstance(key.start, int) and key.start < 0)
             or (isinstance(key.stop, int) and key.stop < 0)
             or key.stop == None
         ):
-            self.__limit = 0
-            self.__offset = 0
-            count = self.__build__().count()
-            if key.start < 0:
+            count = self.count()
+            if (key.start or 0) < 0:
                 start = key.start + count
             else:
-                start = key.start
+                start = key.start or 0
             if key.stop == None or key.stop <= 0:
                 stop = (key.stop or 0) + count
             else:
@@ -335,6 +390,77 @@ class QueryFrame:
         """
         self.__sort = args
 
+    def pages(self, order_key: Any = None, page_size: int = 10000) -> Iterator[List[Any]]:
+        """
+        Iterate over the query results with keyset pagination.
+
+        Parameters
+        ----------
+        order_key : InstrumentedAttribute or str, optional
+            A unique, sortable column to page on. Defaults to the primary key.
+            The column is added to the selection if fields were selected without it.
+        page_size : int, optional
+            The number of rows per page, by default 10000.
+
+        Yields
+        ------
+        List[Any]
+            The rows of each page, ordered by `order_key`.
+
+        Examples
+        --------
+        >>> for page in query_frame.pages(query_frame["id"], 50000):
+        >>>     # Perform actions with the page.
+
+        Notes
+        -----
+        Each page is fetched with `WHERE order_key > last_key ORDER BY order_key LIMIT page_size`,
+        so the database seeks straight to the next page through the index instead of
+        rescanning the skipped rows as `LIMIT/OFFSET` would. Any slice applied to the
+        frame is ignored.
+        """
+
+        if order_key is None:
+            primary_key = self.__primary_key__
+            if primary_key is not None and primary_key.name == "fake_pk_id":
+                raise ValueError(
+                    "The model has no primary key in the database (only the synthetic "
+                    "`fake_pk_id`), so an explicit order_key is required for keyset pagination."
+                )
+            if primary_key is not None:
+                # Page on the mapped attribute, which is what `__select` holds
+                order_key = getattr(
+                    self.__model, self.__mapper.get_property_by_column(primary_key).key
+                )
+        elif isinstance(order_key, str):
+            order_key = self.__getitem_field(order_key)
+        if order_key is None:
+            raise ValueError("A unique order_key is required for keyset pagination.")
+
+        columns = self.__select
+        if columns and not any(
+            column.expression is order_key.expression for column in columns
+        ):
+            columns = columns + [order_key]
+        last = None
+        while True:
+            query: Query = (
+                self.__session()
+                .query(*(columns or [self.__model]))
+                .select_from(self.__model)
+            )
+            for op in self.__ops:
+                query = getattr(query, op[0])(op[1])
+            if last is not None:
+                query = query.filter(order_key > last)
+            page = query.order_by(order_key).limit(page_size).all()
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last = getattr(page[-1], order_key.key)
+
     def to_pandas(self):
         """
         Convert the query results to a pandas DataFrame.
@@ -360,3 +486,289 @@ class QueryFrame:
         except:
             raise Exception("Pandas is not installed.")
         return pd.read_sql(str(self), self.__session().connection())
+
+
+    def iter_rows(self, size: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Stream the query results as lists of Core row tuples.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of rows per partition, by default 10000.
+
+        Yields
+        ------
+        List[tuple]
+            Up to `size` rows. The column names are available from `columns()`.
+
+        Examples
+        --------
+        >>> for rows in query_frame.iter_rows(50000):
+        >>>     # Perform actions with the rows.
+
+        Notes
+        -----
+        The statement is executed on a server-side cursor (`stream_results`) and rows
+        are fetched `size` at a time, without hydrating ORM objects, so peak memory is
+        bounded by the partition size rather than the result size.
+        """
+
+        statement = self.__build__().statement
+        with self.__session() as session:
+            connection = session.connection(
+                execution_options={"stream_results": True, "yield_per": size}
+            )
+            result = connection.execute(statement)
+            try:
+                for partition in result.partitions(size):
+                    yield [tuple(row) for row in partition]
+            finally:
+                result.close()
+
+    def columns(self) -> List[str]:
+        """
+        Get the names of the columns returned by the query.
+
+        Returns
+        -------
+        List[str]
+            The column names, in select order.
+        """
+
+        return [column.key for column in self.__build__().statement.selected_columns]
+
+    def iter_batches(self, size: int = 10000):
+        """
+        Stream the query results as pandas DataFrames.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of rows per DataFrame, by default 10000.
+
+        Yields
+        ------
+        pd.DataFrame
+            A DataFrame of up to `size` rows.
+
+        Examples
+        --------
+        >>> for df in query_frame.iter_batches(50000):
+        >>>     # Perform actions with each DataFrame.
+        """
+
+        try:
+            import pandas as pd
+        except:
+            raise Exception("Pandas is not installed.")
+        columns = self.columns()
+        for rows in self.iter_rows(size):
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def arrow_schema(self):
+        """
+        Derive a pyarrow schema from the selected columns' SQL types.
+
+        Returns
+        -------
+        pyarrow.Schema
+            The schema. Columns whose type cannot be mapped are typed as null and
+            resolved from the data by `iter_record_batches`.
+        """
+
+        try:
+            import pyarrow as pa
+        except:
+            raise Exception("PyArrow is not installed.")
+        fields = []
+        for column in self.__build__().statement.selected_columns:
+            fields.append(pa.field(column.key, _arrow_type(column.type)))
+        return pa.schema(fields)
+
+    def iter_record_batches(self, size: int = 10000):
+        """
+        Stream the query results as pyarrow RecordBatches.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of rows per batch, by default 10000.
+
+        Yields
+        ------
+        pyarrow.RecordBatch
+            A batch of up to `size` rows. Columns whose SQL type cannot be mapped are
+            typed as null until the first batch that has values for them, and carry the
+            resolved type from that batch on.
+
+        Examples
+        --------
+        >>> for batch in query_frame.iter_record_batches(50000):
+        >>>     # Perform actions with each RecordBatch.
+        """
+
+        try:
+            import pyarrow as pa
+        except:
+            raise Exception("PyArrow is not installed.")
+        schema = self.arrow_schema()
+        for rows in self.iter_rows(size):
+            arrays = []
+            for i, values in enumerate(zip(*rows)):
+                field = schema.field(i)
+                if pa.types.is_null(field.type):
+                    # Resolve unmapped types from the first batch that has values
+                    array = pa.array(values)
+                    if not pa.types.is_null(array.type):
+                        schema = schema.set(i, pa.field(field.name, array.type))
+                elif pa.types.is_floating(field.type):
+                    # Unbounded numerics arrive as Decimal and have to be coerced explicitly
+                    array = pa.array(
+                        [None if v is None else float(v) for v in values],
+                        type=field.type,
+                    )
+                else:
+                    array = pa.array(values, type=field.type)
+                arrays.append(array)
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def to_arrow(self, size: int = 10000):
+        """
+        Convert the query results to a pyarrow Table.
+
+        Parameters
+        ----------
+        size : int, optional
+            The number of rows fetched per round trip, by default 10000.
+
+        Returns
+        -------
+        pyarrow.Table
+            The query results.
+
+        Examples
+        --------
+        >>> table = query_frame.to_arrow()
+        """
+
+        try:
+            import pyarrow as pa
+        except:
+            raise Exception("PyArrow is not installed.")
+        batches = list(self.iter_record_batches(size))
+        if not batches:
+            return self.arrow_schema().empty_table()
+        schema = batches[-1].schema
+        return pa.Table.from_batches(
+            [batch.cast(schema) if batch.schema != schema else batch for batch in batches],
+            schema=schema,
+        )
+
+    def to_parquet(self, path_or_blob: Any, size: int = 10000, **kwargs) -> None:
+        """
+        Write the query results to Parquet one batch at a time.
+
+        Parameters
+        ----------
+        path_or_blob : str or BlobClient
+            A local path, an fsspec URL (e.g. "az://container/path.parquet"), or an
+            Azure `BlobClient`. Blobs are staged in a temporary file and uploaded once
+            the file is complete.
+        size : int, optional
+            The number of rows per row group, by default 10000.
+        **kwargs : dict
+            Additional keyword arguments passed to `pyarrow.parquet.ParquetWriter`.
+
+        Examples
+        --------
+        >>> query_frame.to_parquet("/tmp/movers.parquet", size=100000)
+        >>> query_frame.to_parquet(container_client.get_blob_client("movers.parquet"))
+        """
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except:
+            raise Exception("PyArrow is not installed.")
+
+        def write(sink) -> None:
+            # Batches are held back until every null-typed column has resolved (or the
+            # stream ends), so the file schema is not fixed to null for a column whose
+            # values only appear in a later batch.
+            writer = None
+            held = []
+            try:
+                for batch in self.iter_record_batches(size):
+                    if writer is None:
+                        held.append(batch)
+                        if any(pa.types.is_null(field.type) for field in batch.schema):
+                            continue
+                        writer = pq.ParquetWriter(sink, batch.schema, **kwargs)
+                    else:
+                        held.append(batch)
+                    for batch in held:
+                        writer.write_batch(
+                            batch.cast(writer.schema) if batch.schema != writer.schema else batch
+                        )
+                    held = []
+                if writer is None:
+                    schema = held[-1].schema if held else self.arrow_schema()
+                    writer = pq.ParquetWriter(sink, schema, **kwargs)
+                    for batch in held:
+                        writer.write_batch(batch.cast(schema) if batch.schema != schema else batch)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        if hasattr(path_or_blob, "upload_blob"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "data.parquet")
+                write(path)
+                with open(path, "rb") as data:
+                    path_or_blob.upload_blob(data, overwrite=True)
+        elif isinstance(path_or_blob, str) and "://" in path_or_blob:
+            import fsspec
+
+            with fsspec.open(path_or_blob, "wb") as sink:
+                write(sink)
+        else:
+            write(path_or_blob)
+
+
+def _arrow_type(sql_type: Any):
+    """
+    Map a SQLAlchemy column type to a pyarrow data type.
+
+    Returns `pyarrow.null()` when the type cannot be determined up front.
+    """
+
+    import pyarrow as pa
+
+    try:
+        python_type = sql_type.python_type
+    except (NotImplementedError, AttributeError):
+        return pa.null()
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is decimal.Decimal:
+        precision = getattr(sql_type, "precision", None)
+        scale = getattr(sql_type, "scale", None)
+        if precision and precision <= 38:
+            return pa.decimal128(precision, scale or 0)
+        return pa.float64()
+    if python_type is str:
+        return pa.string()
+    if python_type is bytes:
+        return pa.binary()
+    if python_type is datetime.datetime:
+        return pa.timestamp("us", tz="UTC" if getattr(sql_type, "timezone", False) else None)
+    if python_type is datetime.date:
+        return pa.date32()
+    if python_type is datetime.time:
+        return pa.time64("us")
+    return pa.null()
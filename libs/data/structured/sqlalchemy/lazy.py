@@ -0,0 +1,140 @@
+# File: libs/data/structured/sqlalchemy/lazy.py
+
+from typing import Any, Iterator, List
+
+
+class LazySchemaModels:
+    """
+    Lazily populated view of the models in a single schema.
+
+    Indexing (or attribute access) reflects and automaps only the requested table
+    and the tables it references through foreign keys.
+
+    Parameters
+    ----------
+    provider : SQLAlchemyStructuredProvider
+        The provider that owns the schema.
+    schema : str
+        The schema name.
+
+    Examples
+    --------
+    >>> tables = provider.models["keystone"]
+    >>> Audience = tables["Audience"]
+    """
+
+    def __init__(self, provider, schema: str) -> None:
+        self._provider = provider
+        self._schema = schema
+
+    def __getitem__(self, table: str) -> Any:
+        return self._provider.load_model(self._schema, table)
+
+    def __getattr__(self, table: str) -> Any:
+        if table.startswith("_"):
+            raise AttributeError(table)
+        try:
+            return self[table]
+        except KeyError as e:
+            raise AttributeError(table) from e
+
+    def __contains__(self, table: str) -> bool:
+        return table in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, table: str, default: Any = None) -> Any:
+        try:
+            return self[table]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        """
+        List the table and view names available in the schema.
+
+        Notes
+        -----
+        This only inspects the catalog; no tables are reflected or mapped.
+        """
+
+        return self._provider.table_names(self._schema)
+
+    def loaded(self) -> List[str]:
+        """
+        List the table names that have already been mapped.
+        """
+
+        return self._provider.loaded_models(self._schema)
+
+    def values(self) -> List[Any]:
+        return [self[table] for table in self.keys()]
+
+    def items(self) -> List[tuple]:
+        return [(table, self[table]) for table in self.keys()]
+
+
+class LazyModels:
+    """
+    Lazily populated view of the models for every configured schema.
+
+    Parameters
+    ----------
+    provider : SQLAlchemyStructuredProvider
+        The provider that owns the models.
+
+    Examples
+    --------
+    >>> Audience = provider.models["keystone"]["Audience"]
+    """
+
+    def __init__(self, provider) -> None:
+        self._provider = provider
+        self._schemas = {}
+
+    def __getitem__(self, schema: str) -> LazySchemaModels:
+        if schema not in self.keys():
+            raise KeyError(schema)
+        if schema not in self._schemas:
+            self._schemas[schema] = LazySchemaModels(self._provider, schema)
+        return self._schemas[schema]
+
+    def __getattr__(self, schema: str) -> LazySchemaModels:
+        if schema.startswith("_"):
+            raise AttributeError(schema)
+        try:
+            return self[schema]
+        except KeyError as e:
+            raise AttributeError(schema) from e
+
+    def __contains__(self, schema: str) -> bool:
+        return schema in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, schema: str, default: Any = None) -> Any:
+        try:
+            return self[schema]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return (
+            list(self._provider.schemas.keys())
+            if self._provider.schemas
+            else [self._provider.DEFAULT_SCHEMA]
+        )
+
+    def values(self) -> List[LazySchemaModels]:
+        return [self[schema] for schema in self.keys()]
+
+    def items(self) -> List[tuple]:
+        return [(schema, self[schema]) for schema in self.keys()]
@@ -75,3 +75,36 @@ def extend_models(models: List[Any], session: Session):
     for func in EXTENSION_STEPS:
         for model in models:
             func(model, session)
+
+
+class _LazyMarshmallowSchema:
+    """
+    Descriptor that builds a model's Marshmallow schema on first access.
+
+    On first access the regular extension steps are run for the owning model,
+    which replace this descriptor with the generated schema class.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def __get__(self, obj, owner):
+        extend_models([owner], self.session)
+        return owner.__dict__["__marshmallow__"]
+
+
+def extend_models_lazy(models: List[Any], session: Session):
+    """
+    Defer Marshmallow schema generation for SQLAlchemy models until first use.
+
+    Parameters
+    ----------
+    models : List[Any]
+        List of SQLAlchemy models to extend the schemas for.
+    session : Session
+        SQLAlchemy session object.
+
+    """
+    for model in models:
+        if "__marshmallow__" not in model.__dict__:
+            setattr(model, "__marshmallow__", _LazyMarshmallowSchema(session))
@@ -1,9 +1,23 @@
-from libs.openapi.clients.meta import Meta
-from libs.openapi.clients.microsoft.graph import MicrosoftGraph
-from libs.openapi.clients.onspot import OnSpotAPI
+from libs.utils.lazy import lazy_exports
+
+# The clients are imported on first use, so importing one of them does not pull in
+# the SDKs (facebook_business, boto3) of the others.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Meta": "libs.openapi.clients.meta",
+        "MicrosoftGraph": "libs.openapi.clients.microsoft.graph",
+        "OnSpotAPI": "libs.openapi.clients.onspot",
+    },
+)
+
+
+def _specification(client: str, method: str):
+    return lambda: getattr(__getattr__(client), method)()
+
 
 specifications = {
-    "Meta": Meta.load,
-    "MicrosoftGraph": MicrosoftGraph.load,
-    "OnSpot": OnSpotAPI.get_spec,
+    "Meta": _specification("Meta", "load"),
+    "MicrosoftGraph": _specification("MicrosoftGraph", "load"),
+    "OnSpot": _specification("OnSpotAPI", "get_spec"),
 }
@@ -2,7 +2,9 @@ from aiopenapi3 import ResponseDecodingError
 from aiopenapi3.plugin import Message
 from io import BytesIO
 from libs.openapi.clients.base import OpenAPIClient
-import pandas as pd
+from libs.utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
 
 
 class FacebookReportError(Exception):
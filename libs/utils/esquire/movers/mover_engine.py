@@ -1,17 +1,28 @@
-import pandas as pd
-import numpy as np
+from __future__ import annotations
 from datetime import date
-from haversine import haversine, Unit
-from shapely.geometry.polygon import Polygon
 from libs.utils.geometry import (
     latlon_buffer,
-    points_in_poly_numpy,
-    points_in_multipoly_numpy,
+    points_in_geometry,
 )
-from libs.utils.h3 import hex_intersections, data_to_shape
-import pandas as pd
+from libs.utils.h3 import compact_ranges, hex_intersections, data_to_shape
+from libs.utils.lazy import lazy_import
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_
+
+haversine = lazy_import("haversine")
+pd = lazy_import("pandas")
+shapely = lazy_import("shapely")
+
+def hex_filter(column, hex_ids, compact:bool=True):
+    """
+    Builds a filter that matches the given H3 hexes in a column of hex ids.
+
+    With compact, the hexes are sent as compact_ranges: an IN list of the hexes that could not be compacted and a BETWEEN per compacted parent hex.
+    """
+    if not compact:
+        return column.in_(hex_ids)
+    cells, ranges = compact_ranges(hex_ids)
+    return or_(column.in_(cells), *[column.between(first, last) for first, last in ranges])
 
 class MoverEngine:
     def __init__(self, provider):
@@ -75,7 +86,7 @@ class MoverEngine:
         return results
 
 
-    def load_from_polygon(self, start_date:date, end_date:date, polygon:Polygon, counts:bool=False, resolution:int=5):
+    def load_from_polygon(self, start_date:date, end_date:date, polygon:shapely.Polygon, counts:bool=False, resolution:int=5, compact:bool=True):
         """
         Given a query polygon, return all mover addresses within that polygon.
         Uses h3 indexing to pull candidates, then runs point-in-polygon checks against the query polygon.
@@ -85,6 +96,8 @@ class MoverEngine:
         end_date        : Pull movers on or before this date.
         polygon         : Polygon data as a shapely.geometry.polygon.Polygon
         counts          : If true, will only return mover counts instead of the address list. Results in significantly faster queries.
+        resolution      : The H3 resolution of the movers' h3_index column.
+        compact         : If true, compacts the hexes into parent-hex id ranges instead of listing every hex. Results in much shorter queries for large polygons.
 
         Returns:
         results         : Pandas DataFrame of mover addresses within the given polygon.
@@ -115,7 +128,7 @@ class MoverEngine:
                     .filter(
                         movers.date >= start_date,
                         movers.date <= end_date,
-                        movers.h3_index.in_(full_indexes)
+                        hex_filter(movers.h3_index, full_indexes, compact=compact)
                     )
                     .count()
                 )
@@ -134,7 +147,7 @@ class MoverEngine:
                     .filter(
                         movers.date >= start_date,
                         movers.date <= end_date,
-                        movers.h3_index.in_(full_indexes),
+                        hex_filter(movers.h3_index, full_indexes, compact=compact),
                     )
                     .all()
                 )
@@ -155,7 +168,7 @@ class MoverEngine:
                     .filter(
                         movers.date >= start_date,
                         movers.date <= end_date,
-                        movers.h3_index.in_(partial_indexes)
+                        hex_filter(movers.h3_index, partial_indexes, compact=compact)
                     )
                     .count()
                 )
@@ -173,20 +186,14 @@ class MoverEngine:
                     .filter(
                         movers.date >= start_date,
                         movers.date <= end_date,
-                        movers.h3_index.in_(partial_indexes),
+                        hex_filter(movers.h3_index, partial_indexes, compact=compact),
                     )
                     .all()
                 )
 
             # conduct point-in-polygon checks to determine which movers from the partial hexes actually fall inside the query polygon
-            if polygon.geom_type == 'Polygon':
-                partial_index_data.loc[:, 'in_polygon'] = points_in_poly_numpy(
-                    partial_index_data['longitude'].values, 
-                    partial_index_data['latitude'].values, 
-                    np.array(polygon.exterior.coords)
-                )
-            elif polygon.geom_type == 'MultiPolygon':
-                partial_index_data.loc[:, 'in_polygon'] = points_in_multipoly_numpy(
+            if polygon.geom_type in ('Polygon', 'MultiPolygon'):
+                partial_index_data.loc[:, 'in_polygon'] = points_in_geometry(
                     partial_index_data['longitude'].values, 
                     partial_index_data['latitude'].values, 
                     polygon
@@ -241,10 +248,10 @@ class MoverEngine:
         # calculate distance from centerpoint (for point/polygon queries only)
         results['distance_miles'] = results.apply(
             lambda x:
-            round(haversine(
+            round(haversine.haversine(
                 [x['latitude'],x['longitude']],
                 [latitude,longitude],
-                unit=Unit.MILES
+                unit=haversine.Unit.MILES
             ),3),
             axis=1
         )
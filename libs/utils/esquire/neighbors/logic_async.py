@@ -119,7 +119,7 @@ async def get_all_neighbors(
             # estated_data = await load_estated_data_partitioned_blob(
             #     f"estated_partition_testing/state={state}/zip_code={zip_code}/city={safe_city}/"
             # )
-            estated_data = await load_estated_data_db(
+            estated_data = await load_estated_data_db_async(
                 city=city,
                 state=state,
                 zip_code=zip_code,
@@ -335,6 +335,23 @@ import pandas as pd
 from sqlalchemy import text
 from libs.data import from_bind
 
+_ESTATED_PARTITION_SQL = """
+    SELECT
+        NULLIF(regexp_replace(street_number, '[^0-9]+', '', 'g'), '')::int AS street_number,
+        street_name,
+        address,
+        city,
+        state,
+        "zipCode",
+        "plus4Code"
+    FROM utils.estated
+    WHERE city = :city
+        AND state = :state
+        AND "zipCode" = :zip_code
+        AND NULLIF(regexp_replace(street_number, '[^0-9]+', '', 'g'), '')::bigint < 999999
+"""
+
+
 def load_estated_data_db(
     *,
     city: str,
@@ -348,62 +365,62 @@ def load_estated_data_db(
     """
 
     provider = from_bind(bind)
-    session = provider.connect()
+    # session() is synchronous for both the sync and asyncio providers.
+    session = provider.session()
 
     try:
-        conn = session.connection()
-        raw = getattr(conn, "connection", None)
-        cur = raw.cursor()
-
-        cur.execute(
-            """
-            SELECT
-                NULLIF(
-                    regexp_replace(
-                        street_number, 
-                        '[^0-9]+', 
-                        '', 
-                        'g'
-                    ), 
-                    ''
-                )::int AS street_number,
-                street_name,
-                address,
-                city,
-                state,
-                "zipCode",
-                "plus4Code"
-            FROM utils.estated
-            WHERE city = %s
-                AND state = %s
-                AND "zipCode" = %s
-                AND NULLIF(
-                    regexp_replace(
-                        street_number, 
-                        '[^0-9]+', 
-                        '', 
-                        'g'
-                    ), 
-                    ''
-                )::bigint < 999999
-            """,
-            (city, state, zip_code),
+        result = session.execute(
+            text(_ESTATED_PARTITION_SQL),
+            {"city": city, "state": state, "zip_code": zip_code},
         )
-
-        rows = cur.fetchall()
+        rows = result.fetchall()
         if not rows:
             return pd.DataFrame()
 
-        cols = [d[0] for d in cur.description]
-        df = pd.DataFrame(rows, columns=cols)
+        return _clean_estated_df(pd.DataFrame(rows, columns=list(result.keys())))
 
-        df["street_number"] = pd.to_numeric(
-            df["street_number"], errors="coerce"
-        ).astype("Int64")
+    finally:
+        session.close()
 
-        df["street_name"] = df["street_name"].astype(str)
 
-        return df.drop_duplicates()
+async def load_estated_data_db_async(
+    *,
+    city: str,
+    state: str,
+    zip_code: str,
+    bind: str = "keystone",
+) -> pd.DataFrame:
+    """
+    Async counterpart of `load_estated_data_db`.
+    When the bind is an asyncio provider ("sql+async"), the query runs on the event
+    loop so concurrent partition loads overlap their I/O; otherwise the sync loader
+    runs in a worker thread.
+    """
 
-    finally:
-        session.close()
+    provider = from_bind(bind)
+    if not hasattr(provider, "fetch_df"):
+        return await asyncio.to_thread(
+            load_estated_data_db,
+            city=city,
+            state=state,
+            zip_code=zip_code,
+            bind=bind,
+        )
+
+    df = await provider.fetch_df(
+        text(_ESTATED_PARTITION_SQL),
+        {"city": city, "state": state, "zip_code": zip_code},
+    )
+    if df.empty:
+        return pd.DataFrame()
+    return _clean_estated_df(df)
+
+
+def _clean_estated_df(df: pd.DataFrame) -> pd.DataFrame:
+    df["street_number"] = pd.to_numeric(
+        df["street_number"], errors="coerce"
+    ).astype("Int64")
+
+    df["street_name"] = df["street_name"].astype(str)
+
+    return df.drop_duplicates()
@@ -1,10 +1,12 @@
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+from __future__ import annotations
 from io import BytesIO
+from libs.utils.lazy import lazy_import
+
+matplotlib = lazy_import("matplotlib", on_load=lambda module: module.use("Agg"))
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
 
 
 def crosstab_jointplot(
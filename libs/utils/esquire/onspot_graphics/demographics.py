@@ -1,12 +1,13 @@
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-from matplotlib import pyplot as plt
-import seaborn as sns
 from .crosstab_jointplot import crosstab_jointplot
 from io import BytesIO
+from libs.utils.lazy import lazy_import
 from pathlib import Path
 
+matplotlib = lazy_import("matplotlib", on_load=lambda module: module.use("Agg"))
+np = lazy_import("numpy")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
 roboto_reg = Path("libs/utils/esquire/onspot_graphics/fonts/Roboto-Regular.ttf")
 roboto_bold = Path("libs/utils/esquire/onspot_graphics/fonts/Roboto-Bold.ttf")
 roboto_black = Path("libs/utils/esquire/onspot_graphics/fonts/Roboto-Black.ttf")
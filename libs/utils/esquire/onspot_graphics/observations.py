@@ -1,21 +1,22 @@
+from __future__ import annotations
 from datetime import datetime as dt, timedelta
-import seaborn as sns
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
-import matplotlib.dates as mdates
-from matplotlib.ticker import MultipleLocator
-from matplotlib.markers import MarkerStyle
-import plotly.express as px
 from io import BytesIO
 import os
 import math
-import numpy as np
+from libs.utils.lazy import lazy_import
 from libs.utils.time import get_local_timezone
 from libs.azure.key_vault import KeyVaultClient
 
+matplotlib = lazy_import("matplotlib", on_load=lambda module: module.use("Agg"))
+mdates = lazy_import("matplotlib.dates")
+mmarkers = lazy_import("matplotlib.markers")
+mtick = lazy_import("matplotlib.ticker")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+px = lazy_import("plotly.express")
+sns = lazy_import("seaborn")
+
 class Observations:
     def __init__(self, data):
         """
@@ -142,7 +143,7 @@ class Observations:
         ax.axhline(y=0, xmin=0, xmax=1, color='gray', linestyle='--')
         ax.set_xlabel('Week')
         ax.set_ylabel('')
-        ax.xaxis.set_major_locator(MultipleLocator(1)) # ensure every week number is showm
+        ax.xaxis.set_major_locator(mtick.MultipleLocator(1)) # ensure every week number is showm
 
         # bottom ticks: one per week, labeled by date
         ax.set_xticks(self.obs["x"])
@@ -178,9 +179,9 @@ class Observations:
         best_fill = 'right' if self.get_latest_week()['Week'] == self.get_best_week()['Week'] else 'full'
         worst_fill = 'right' if self.get_latest_week()['Week'] == self.get_worst_week()['Week'] else 'full'
         # colored marker centers for best, worst, and latest weeks
-        ax3.plot([self.get_latest_week()['RefDate']], [self.get_latest_week()['traffic_pct']], marker=MarkerStyle('o', fillstyle='full'),     markersize=7, color='#035FC5', markeredgewidth=0)
-        ax3.plot([self.get_best_week()['RefDate']],   [self.get_best_week()['traffic_pct']],   marker=MarkerStyle('o', fillstyle=best_fill),  markersize=7, color='#6CBE4F', markeredgewidth=0)
-        ax3.plot([self.get_worst_week()['RefDate']],  [self.get_worst_week()['traffic_pct']],  marker=MarkerStyle('o', fillstyle=worst_fill), markersize=7, color='#E41226', markeredgewidth=0)
+        ax3.plot([self.get_latest_week()['RefDate']], [self.get_latest_week()['traffic_pct']], marker=mmarkers.MarkerStyle('o', fillstyle='full'),     markersize=7, color='#035FC5', markeredgewidth=0)
+        ax3.plot([self.get_best_week()['RefDate']],   [self.get_best_week()['traffic_pct']],   marker=mmarkers.MarkerStyle('o', fillstyle=best_fill),  markersize=7, color='#6CBE4F', markeredgewidth=0)
+        ax3.plot([self.get_worst_week()['RefDate']],  [self.get_worst_week()['traffic_pct']],  marker=mmarkers.MarkerStyle('o', fillstyle=worst_fill), markersize=7, color='#E41226', markeredgewidth=0)
 
         # y-axis formatting
         bounds = max(abs(self.obs['traffic_pct'].min()), abs(self.obs['traffic_pct'].max())) # make sure 0 is in the center of the y-axis
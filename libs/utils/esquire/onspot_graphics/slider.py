@@ -1,11 +1,12 @@
-import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.ticker import LinearLocator
 from io import BytesIO
+from libs.utils.lazy import lazy_import
+
+matplotlib = lazy_import("matplotlib", on_load=lambda module: module.use("Agg"))
+mtick = lazy_import("matplotlib.ticker")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
 
 class SliderGraph:
     def __init__(
@@ -29,7 +30,7 @@ class SliderGraph:
             cbar=False,
         )
 
-        g.xaxis.set_major_locator(LinearLocator(numticks=len(labels)))
+        g.xaxis.set_major_locator(mtick.LinearLocator(numticks=len(labels)))
         g.xaxis.set_ticklabels(labels)
         g.xaxis.set_tick_params(length=0)
         g.yaxis.set_ticks([])
@@ -1,18 +1,25 @@
-from haversine import haversine, Unit
-from libs.utils.geometry import latlon_buffer
-from libs.utils.h3 import hex_intersections
-from shapely.ops import unary_union
-from shapely.wkt import loads as wkt_loads
-from sklearn.neighbors import BallTree
+from __future__ import annotations
+from libs.utils.geometry import latlon_buffer, latlon_buffers
+from libs.utils.geometry_conversion import from_wkt
+from libs.utils.h3 import hex_filter_sql, hex_intersections
+from libs.utils.lazy import lazy_import
 from sqlalchemy.orm import Session
-import orjson as json, pandas as pd, numpy as np
+import orjson as json
+
+haversine = lazy_import("haversine")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+shapely = lazy_import("shapely")
+sklearn = lazy_import("sklearn")
 
 
 class POIEngine:
     def __init__(self, provider):
         self.provider = provider
 
-    def load_from_polygon(self, polygon_wkt: str, categories: list = None):
+    def load_from_polygon(
+        self, polygon_wkt: str, categories: list = None, compact: bool = True
+    ):
         """
         Given a query polygon, return all POI data within that polygon.
         Uses an indexed search method to pull data in hexes that fully or partially intersect the query polygon.
@@ -20,6 +27,7 @@ class POIEngine:
         Params:
         polygon_wkt  : Polygon data as a WKT str.
         categories   : A list of integers representing FSQ category IDs.
+        compact      : If true, compacts the hexes into parent-hex id ranges instead of listing every hex. Results in much shorter queries for large polygons.
 
         Returns:
         poi_data     : Pandas DataFrame of POI data (with associated category lists) within the given polygon.
@@ -37,7 +45,7 @@ class POIEngine:
         )
 
         # Build the base query that applies the H3 and spatial filters
-        h3_ids = "','".join(h3_indexes)
+        h3_filter = hex_filter_sql("h3_index", h3_indexes, compact=compact)
         query = f"""
             SELECT
                 fsq.*,
@@ -48,7 +56,7 @@ class POIEngine:
             LEFT JOIN poi.foursquare_chains AS chain
                 ON cha.chain_id = chain.chain_id
             WHERE 
-                h3_index IN ('{h3_ids}')
+                {h3_filter}
                 AND ST_Within(
                     fsq.point,
                     ST_SetSRID(ST_GeomFromText('{polygon_wkt}'), 4326)
@@ -79,7 +87,7 @@ class POIEngine:
                 LEFT JOIN poi.foursquare_chains AS chain
                     ON cha.chain_id = chain.chain_id
                 WHERE 
-                    h3_index IN ('{h3_ids}')
+                    {h3_filter}
                     AND cat.category_id IN (SELECT id FROM cat_tree)
                     AND ST_Within(
                         fsq.point::geometry(point),
@@ -116,14 +124,10 @@ class POIEngine:
 
             if len(esq_exists):
                 # Parse centroid_wkt to get latitude and longitude
-                esq_exists["geometry"] = esq_exists["centroid_wkt"].apply(wkt_loads)
-                esq_exists["esq_longitude"] = esq_exists["geometry"].apply(
-                    lambda geom: geom.x
-                )
-                esq_exists["esq_latitude"] = esq_exists["geometry"].apply(
-                    lambda geom: geom.y
-                )
-                esq_exists.drop(columns=["geometry", "centroid_wkt"], inplace=True)
+                centroids = from_wkt(esq_exists["centroid_wkt"])
+                esq_exists["esq_longitude"] = shapely.get_x(centroids)
+                esq_exists["esq_latitude"] = shapely.get_y(centroids)
+                esq_exists.drop(columns=["centroid_wkt"], inplace=True)
 
                 # Convert lat/lon to radians
                 results["lat_rad"] = np.deg2rad(results["latitude"])
@@ -132,7 +136,7 @@ class POIEngine:
                 esq_exists["esq_lon_rad"] = np.deg2rad(esq_exists["esq_longitude"])
 
                 # Build BallTree with ESQ centroids
-                esq_tree = BallTree(
+                esq_tree = sklearn.neighbors.BallTree(
                     np.vstack((esq_exists["esq_lat_rad"], esq_exists["esq_lon_rad"])).T,
                     metric="haversine",
                 )
@@ -200,10 +204,10 @@ class POIEngine:
         # calculate distance from centerpoint (for point/polygon queries only)
         results["distance_miles"] = results.apply(
             lambda x: round(
-                haversine(
+                haversine.haversine(
                     [x["latitude"], x["longitude"]],
                     [latitude, longitude],
-                    unit=Unit.MILES,
+                    unit=haversine.Unit.MILES,
                 ),
                 3,
             ),
@@ -232,13 +236,10 @@ class POIEngine:
         """
 
         # find the unary union of each search area to avoid double-searching areas of overlap
-        circle_list = [
-            latlon_buffer(
-                latitude=point[0], longitude=point[1], radius=radius, cap_style=1
-            )
-            for point in points
-        ]
-        polygon_wkt = unary_union(circle_list).wkt
+        latitudes, longitudes = np.asarray(points, dtype=float).reshape(-1, 2).T
+        polygon_wkt = latlon_buffers(
+            latitudes=latitudes, longitudes=longitudes, radii=radius, dissolve=True
+        ).wkt
 
         # query as a polygon using the unary union of each point/radius area
         return self.load_from_polygon(polygon_wkt=polygon_wkt, categories=categories)
@@ -302,7 +303,7 @@ def recreate_POI_form(sources, query_pool, radius=10):
     r_m = 3958.8
 
     # setup a BallTree and query for a max of X miles
-    tree = BallTree(
+    tree = sklearn.neighbors.BallTree(
         np.deg2rad(query_pool[["latitude", "longitude"]].values), metric="haversine"
     )
     indices, distances = tree.query_radius(
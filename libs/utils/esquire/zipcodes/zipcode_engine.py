@@ -1,172 +1,214 @@
+from __future__ import annotations
+from datetime import timedelta
+from libs.utils.esquire.zipcodes.zipcode_index import DEFAULT_MAX_AGE, DEFAULT_TOLERANCE, ZipcodeIndex, load_index
+from libs.utils.geometry_conversion import wkb_column
+from libs.utils.lazy import lazy_import
+import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
+pd = lazy_import("pandas")
+
+# the most rows a SQL Server table value constructor (VALUES) accepts
+MAX_VALUES_ROWS = 1000
+
+# the geometry modes of the lookups, see geometry_columns
+GEOMETRY_MODES = ("none", "centroid", "simplified", "full")
+
+# the attribute columns returned by every query, in order
+ZIPCODE_COLUMNS = [
+    "Zipcode",
+    "City",
+    "State",
+    "Population",
+    "Density",
+    "Military",
+    "AgeMedian",
+    "Male",
+    "Female",
+    "Married",
+    "FamilySize",
+    "IncomeHouseholdMedian",
+    "IncomeHouseholdSixFigure",
+    "HomeOwnership",
+    "HomeValue",
+    "RentMedian",
+    "EducationCollegeOrAbove",
+    "LaborForceParticipation",
+    "UnemploymentRate",
+    "RaceWhite",
+    "RaceBlack",
+    "RaceAsian",
+    "RaceNative",
+    "RacePacific",
+    "RaceOther",
+    "RaceMultiple",
+]
+
+def boundary_column(boundary_format:str="geojson", tolerance:float=None) -> str:
+    """
+    The SQL projection of the zipcode boundary.
+
+    Params:
+    boundary_format : "geojson" for a GeoJSON string in the [GeoJSON] column (converted in SQL by dbo.geo2json),
+                      or "wkb" for WKB bytes in the [Boundary] column, to convert with libs.utils.geometry_conversion.
+    tolerance       : if given, the boundary is simplified in SQL (geography.Reduce) with this tolerance in meters.
+    """
+    boundary = f"[Boundary].Reduce({float(tolerance)})" if tolerance else "[Boundary]"
+    if boundary_format == "geojson":
+        return f"dbo.geo2json({boundary}) AS [GeoJSON]"
+    elif boundary_format == "wkb":
+        return wkb_column(boundary, dialect="mssql", alias="[Boundary]")
+    else:
+        raise Exception(f"Unsupported boundary format: {boundary_format}")
+
+def geometry_columns(geometry:str="full", boundary_format:str="geojson", tolerance:float=DEFAULT_TOLERANCE) -> list[str]:
+    """
+    The SQL projection of the zipcode geometry, which usually dominates the size of the results.
+
+    Params:
+    geometry        : "full" for the boundary and centroid (Latitude, Longitude),
+                      "simplified" for the boundary simplified with `tolerance` and the centroid,
+                      "centroid" for the centroid only, or "none" for the attribute columns only.
+    boundary_format : "geojson" (default) or "wkb", see boundary_column.
+    tolerance       : simplification tolerance in meters, for geometry="simplified".
+    """
+    if geometry not in GEOMETRY_MODES:
+        raise Exception(f"Unsupported geometry mode: {geometry}")
+    columns = []
+    if geometry in ("full", "simplified"):
+        columns.append(boundary_column(boundary_format, tolerance if geometry == "simplified" else None))
+    if geometry != "none":
+        columns += ["[LatLong].Lat AS [Latitude]", "[LatLong].Long AS [Longitude]"]
+    return columns
+
 class ZipcodeEngine:
-    def __init__(self, provider):
+    def __init__(self, provider, index=None, max_age:timedelta=DEFAULT_MAX_AGE):
+        """
+        Params:
+        provider    : the data provider of the legacy database.
+        index       : optional in-memory index answering the lookups without a database round trip,
+                      as a ZipcodeIndex or the BlobClient of its Parquet snapshot (loaded once per process).
+        max_age     : the index is skipped, and the lookups fall back to SQL, once its snapshot is older than this.
+        """
         self.provider = provider
+        self.index = index
+        self.max_age = max_age
+
+    def _index(self) -> ZipcodeIndex | None:
+        if self.index is None:
+            return None
+        if not isinstance(self.index, ZipcodeIndex):
+            return load_index(self.index, self.max_age)
+        if self.index.age > self.max_age:
+            logging.warning(f"Zipcode index is {self.index.age} old, falling back to SQL.")
+            return None
+        return self.index
 
-    def load_from_list(self, zipcode_list:list[str]):
+    def _query(self, session:Session, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE):
+        zipcodes = self.provider.models["dbo"]["Zipcodes"]
+        return zipcodes, session.query(
+            *[getattr(zipcodes, column) for column in ZIPCODE_COLUMNS],
+            *[text(column) for column in geometry_columns(geometry, boundary_format, tolerance)]
+        )
+
+    def load_from_list(self, zipcode_list:list[str], boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE):
         """
         Load zipcode information given a list of zipcodes.
 
         Params:
         zipcode_list    : a list of 5-digit zipcode strings. Zero padding will be applied for zipcodes with less than 5 characters.
+        boundary_format : "geojson" (default) or "wkb", see boundary_column.
+        geometry        : "full" (default), "simplified", "centroid" or "none", see geometry_columns.
+        tolerance       : simplification tolerance in meters, for geometry="simplified".
         """
-        session:Session = self.provider.connect()
-        zipcodes = self.provider.models["dbo"]["Zipcodes"]
-
         # check that input is a list
         if not isinstance(zipcode_list, list):
             raise Exception(f"Input `zipcode_list` must be type list, not {type(zipcode_list)}")
+
+        if (index := self._index()) is not None:
+            return index.load_from_list(zipcode_list, boundary_format, geometry, tolerance)
+
+        session:Session = self.provider.connect()
         
         # format zipcode inputs as zero-padded strings
         zipcode_list = [('00000'+str(z))[-5:] for z in zipcode_list]
 
+        zipcodes, query = self._query(session, boundary_format, geometry, tolerance)
         return (
-            session
-            .query(
-                zipcodes.Zipcode,
-                zipcodes.City,
-                zipcodes.State,
-                zipcodes.Population,
-                zipcodes.Density,
-                zipcodes.Military,
-                zipcodes.AgeMedian,
-                zipcodes.Male,
-                zipcodes.Female,
-                zipcodes.Married,
-                zipcodes.FamilySize,
-                zipcodes.IncomeHouseholdMedian,
-                zipcodes.IncomeHouseholdSixFigure,
-                zipcodes.HomeOwnership,
-                zipcodes.HomeValue,
-                zipcodes.RentMedian,
-                zipcodes.EducationCollegeOrAbove,
-                zipcodes.LaborForceParticipation,
-                zipcodes.UnemploymentRate,
-                zipcodes.RaceWhite,
-                zipcodes.RaceBlack,
-                zipcodes.RaceAsian,
-                zipcodes.RaceNative,
-                zipcodes.RacePacific,
-                zipcodes.RaceOther,
-                zipcodes.RaceMultiple,
-                text("dbo.geo2json([Boundary]) AS [GeoJSON]"),
-                text("[LatLong].Lat AS [Latitude]"),
-                text("[LatLong].Long AS [Longitude]")
-            )
+            query
             .filter(zipcodes.Zipcode.in_(zipcode_list))
         ).all()
     
-    def load_from_state(self, state:str):
+    def load_from_state(self, state:str, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE):
         """
         Load zipcode information for all zipcodes within a given US state.
 
         Params:
-        state   : two-character string state abbreviation (e.g. "NC")
+        state           : two-character string state abbreviation (e.g. "NC")
+        boundary_format : "geojson" (default) or "wkb", see boundary_column.
+        geometry        : "full" (default), "simplified", "centroid" or "none", see geometry_columns.
+        tolerance       : simplification tolerance in meters, for geometry="simplified".
         """
+        if (index := self._index()) is not None:
+            return index.load_from_state(state, boundary_format, geometry, tolerance)
+
         session:Session = self.provider.connect()
-        zipcodes = self.provider.models["dbo"]["Zipcodes"]
 
+        zipcodes, query = self._query(session, boundary_format, geometry, tolerance)
         return (
-            session
-            .query(
-                zipcodes.Zipcode,
-                zipcodes.City,
-                zipcodes.State,
-                zipcodes.Population,
-                zipcodes.Density,
-                zipcodes.Military,
-                zipcodes.AgeMedian,
-                zipcodes.Male,
-                zipcodes.Female,
-                zipcodes.Married,
-                zipcodes.FamilySize,
-                zipcodes.IncomeHouseholdMedian,
-                zipcodes.IncomeHouseholdSixFigure,
-                zipcodes.HomeOwnership,
-                zipcodes.HomeValue,
-                zipcodes.RentMedian,
-                zipcodes.EducationCollegeOrAbove,
-                zipcodes.LaborForceParticipation,
-                zipcodes.UnemploymentRate,
-                zipcodes.RaceWhite,
-                zipcodes.RaceBlack,
-                zipcodes.RaceAsian,
-                zipcodes.RaceNative,
-                zipcodes.RacePacific,
-                zipcodes.RaceOther,
-                zipcodes.RaceMultiple,
-                text("dbo.geo2json([Boundary]) AS [GeoJSON]"),
-                text("[LatLong].Lat AS [Latitude]"),
-                text("[LatLong].Long AS [Longitude]")
-            )
+            query
             .filter(zipcodes.State == state)
         ).all()
 
-    def load_from_citystate(self, city:str, state:str):
+    def load_from_citystate(self, city:str, state:str, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE):
         """
         Load zipcode information for all zipcodes within a given US city and state.
 
         Params:
-        city    : string city name
-        state   : two-character string state abbreviation (e.g. "NC")
+        city            : string city name
+        state           : two-character string state abbreviation (e.g. "NC")
+        boundary_format : "geojson" (default) or "wkb", see boundary_column.
+        geometry        : "full" (default), "simplified", "centroid" or "none", see geometry_columns.
+        tolerance       : simplification tolerance in meters, for geometry="simplified".
         """
+        if (index := self._index()) is not None:
+            return index.load_from_citystate(city, state, boundary_format, geometry, tolerance)
+
         session:Session = self.provider.connect()
-        zipcodes = self.provider.models["dbo"]["Zipcodes"]
 
+        zipcodes, query = self._query(session, boundary_format, geometry, tolerance)
         return (
-            session
-            .query(
-                zipcodes.Zipcode,
-                zipcodes.City,
-                zipcodes.State,
-                zipcodes.Population,
-                zipcodes.Density,
-                zipcodes.Military,
-                zipcodes.AgeMedian,
-                zipcodes.Male,
-                zipcodes.Female,
-                zipcodes.Married,
-                zipcodes.FamilySize,
-                zipcodes.IncomeHouseholdMedian,
-                zipcodes.IncomeHouseholdSixFigure,
-                zipcodes.HomeOwnership,
-                zipcodes.HomeValue,
-                zipcodes.RentMedian,
-                zipcodes.EducationCollegeOrAbove,
-                zipcodes.LaborForceParticipation,
-                zipcodes.UnemploymentRate,
-                zipcodes.RaceWhite,
-                zipcodes.RaceBlack,
-                zipcodes.RaceAsian,
-                zipcodes.RaceNative,
-                zipcodes.RacePacific,
-                zipcodes.RaceOther,
-                zipcodes.RaceMultiple,
-                text("dbo.geo2json([Boundary]) AS [GeoJSON]"),
-                text("[LatLong].Lat AS [Latitude]"),
-                text("[LatLong].Long AS [Longitude]")
-            )
+            query
             .filter(zipcodes.State == state)
             .filter(zipcodes.City == city)
         ).all()
 
-    def load_from_radius(self, latitude:float, longitude:float, radius:float):
+    def load_from_radius(self, latitude:float, longitude:float, radius:float, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE):
         """
         Load zipcode information for zipcodes within a given point and radius.
 
         Params:
-        latitude    : latitude of the search area centerpoint
-        longitude   : longitude of the search area centerpoint
-        radius      : radius to search around the centerpoint
+        latitude        : latitude of the search area centerpoint
+        longitude       : longitude of the search area centerpoint
+        radius          : radius to search around the centerpoint
+        boundary_format : "geojson" (default) or "wkb", see boundary_column.
+        geometry        : "full" (default), "simplified", "centroid" or "none", see geometry_columns.
+        tolerance       : simplification tolerance in meters, for geometry="simplified".
         """
 
+        if (index := self._index()) is not None:
+            return index.load_from_radius(latitude, longitude, radius, boundary_format, geometry, tolerance)
+
         session:Session = self.provider.connect()
 
         # define a custom query to pass to SQL Alchemy (this query is more performant than a simple select)
         # this uses super-polygons of each 2-digit zipcode prefix as indexes to narrow down zipcodes which need to be checked for intersection with the search area
         # NOTE this query does not conform to the SQLAlchemy best practices and may cause issues in the future
+        columns = "\n                ,".join(
+            [f"[{column}]" for column in ZIPCODE_COLUMNS]
+            + geometry_columns(geometry, boundary_format, tolerance)
+        )
         query = f"""
             DECLARE @circle GEOGRAPHY;
             SET @circle = GEOGRAPHY::Point({latitude},{longitude}, 4326).STBuffer({radius});
@@ -179,35 +221,7 @@ class ZipcodeEngine:
                     @circle.STWithin(ZPP.[Boundary]) = 0
             )
             SELECT
-                [Zipcode]
-                ,[City]
-                ,[State]
-                ,[Population]
-                ,[Density]
-                ,[Military]
-                ,[AgeMedian]
-                ,[Male]
-                ,[Female]
-                ,[Married]
-                ,[FamilySize]
-                ,[IncomeHouseholdMedian]
-                ,[IncomeHouseholdSixFigure]
-                ,[HomeOwnership]
-                ,[HomeValue]
-                ,[RentMedian]
-                ,[EducationCollegeOrAbove]
-                ,[LaborForceParticipation]
-                ,[UnemploymentRate]
-                ,[RaceWhite]
-                ,[RaceBlack]
-                ,[RaceAsian]
-                ,[RaceNative]
-                ,[RacePacific]
-                ,[RaceOther]
-                ,[RaceMultiple]
-                ,[LatLong].Lat AS [Latitude]
-                ,[LatLong].Long AS [Longitude]
-                ,dbo.geo2json([Boundary]) AS [GeoJSON]
+                {columns}
             FROM ZipPolys
             WHERE
                 [Boundary].STWithin(@circle) = 1
@@ -217,4 +231,70 @@ class ZipcodeEngine:
                 @circle.STWithin([Boundary]) = 1
             """
         
-        return session.execute(text(query))
\ No newline at end of file
+        return session.execute(text(query))
+
+    def load_from_radii(self, points:list, radii:list[float]):
+        """
+        Find the zipcodes within each of several radii of each of several points.
+        All (point, radius) pairs are answered by a single query (per 1000 points), instead of a load_from_radius call each.
+
+        Params:
+        points  : sequence of (latitude, longitude) pairs, e.g. df[["latitude", "longitude"]].to_numpy()
+        radii   : radii in meters to search around every point
+
+        Returns:
+        results : Pandas DataFrame with one row per (point_id, radius, zipcode), where point_id is the position of the point in `points`,
+                  and distance is the distance in meters from the point to the zipcode boundary (0 if the point is inside it).
+                  Sorted by point_id, radius and distance.
+        """
+        points = [(float(latitude), float(longitude)) for latitude, longitude in points]
+        radii = [float(radius) for radius in radii]
+        if not points or not radii:
+            return pd.DataFrame(columns=["point_id", "radius", "zipcode", "distance"])
+
+        if (index := self._index()) is not None:
+            return index.load_from_radii(points, radii)
+
+        session:Session = self.provider.connect()
+        results = []
+        for start in range(0, len(points), MAX_VALUES_ROWS):
+            # the points and radii are sent as table value constructors, and joined with the zipcodes by boundary distance
+            # the zipcodes are first narrowed down to the 2-digit prefixes whose super-polygons are within the largest radius of a point
+            point_values = ",".join(
+                f"({start + i},{latitude},{longitude})"
+                for i, (latitude, longitude) in enumerate(points[start:start + MAX_VALUES_ROWS])
+            )
+            radius_values = ",".join(f"({i},{radius})" for i, radius in enumerate(radii))
+            query = f"""
+                WITH Points AS (
+                    SELECT [point_id], GEOGRAPHY::Point([latitude], [longitude], 4326) AS [center]
+                    FROM (VALUES {point_values}) AS P([point_id], [latitude], [longitude])
+                ),
+                Radii AS (
+                    SELECT [radius_id], CAST([radius] AS FLOAT) AS [radius]
+                    FROM (VALUES {radius_values}) AS R([radius_id], [radius])
+                ),
+                Prefixes AS (
+                    SELECT P.[point_id], P.[center], RIGHT('00' + CAST(ZPP.[Prefix] AS VARCHAR(2)),2) AS [prefix]
+                    FROM Points AS P
+                        JOIN [dbo].[Zipcode Prefix Polygons] AS ZPP
+                        ON ZPP.[Boundary].STDistance(P.[center]) <= {max(radii, default=0)}
+                ),
+                Distances AS (
+                    SELECT PR.[point_id], ZP.[Zipcode] AS [zipcode], ZP.[Boundary].STDistance(PR.[center]) AS [distance]
+                    FROM Prefixes AS PR
+                        JOIN [dbo].[Zipcodes] AS ZP
+                        ON ZP.[Zipcode] LIKE CONCAT(PR.[prefix],'%')
+                )
+                SELECT D.[point_id], R.[radius_id], D.[zipcode], D.[distance]
+                FROM Distances AS D
+                    JOIN Radii AS R
+                    ON D.[distance] <= R.[radius]
+                """
+            results += session.execute(text(query)).all()
+
+        results = pd.DataFrame(results, columns=["point_id", "radius_id", "zipcode", "distance"])
+        # return the radii as given, rather than as parsed by SQL Server
+        results.insert(1, "radius", [radii[i] for i in results.pop("radius_id")])
+        results["distance"] = results["distance"].astype(float)
+        return results.sort_values(["point_id", "radius", "distance"], ignore_index=True)
@@ -0,0 +1,278 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from libs.utils.geometry import latlon_buffers
+from libs.utils.geometry_conversion import from_wkb, to_geojson, to_wkb
+from libs.utils.lazy import lazy_import
+import io, logging, threading
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+shapely = lazy_import("shapely")
+
+# the sphere radius used by latlon_buffers, in meters
+EARTH_RADIUS = 6371000
+
+# the default simplification tolerance of geometry="simplified", in meters
+DEFAULT_TOLERANCE = 100.0
+
+# how old a snapshot may be before the engine falls back to SQL
+DEFAULT_MAX_AGE = timedelta(days=35)
+
+_INDEXES: dict = {}
+_LOCK = threading.Lock()
+
+class ZipcodeIndex:
+    """
+    In-memory copy of the Zipcodes table, answering the ZipcodeEngine lookups without a database round trip.
+
+    The index is built from a Parquet snapshot holding the ZipcodeEngine columns, Latitude, Longitude and the boundary as WKB.
+    Attributes are kept in an Arrow table, boundaries in an STRtree, and zipcodes, states and city/states in hash maps.
+    Rows are returned as dictionaries with the same keys as the SQL queries.
+    """
+
+    def __init__(self, table:"pa.Table", created:datetime=None):
+        """
+        Params:
+        table   : Arrow table with the zipcode_engine.ZIPCODE_COLUMNS, Latitude, Longitude and Boundary (WKB) columns.
+        created : when the snapshot was taken. Defaults to the "created" entry of the table metadata, or now.
+        """
+        if created is None:
+            metadata = table.schema.metadata or {}
+            created = (
+                datetime.fromisoformat(metadata[b"created"].decode())
+                if b"created" in metadata
+                else datetime.now(timezone.utc)
+            )
+        self.created = created
+        self.boundaries = from_wkb(table.column("Boundary").to_pylist())
+        self.table = table.drop_columns(["Boundary"])
+        shapely.prepare(self.boundaries)
+        self.tree = shapely.STRtree(self.boundaries)
+        self._simplified = {}
+
+        # hash maps for the attribute lookups
+        zipcodes = self.table.column("Zipcode").to_pylist()
+        cities = self.table.column("City").to_pylist()
+        states = self.table.column("State").to_pylist()
+        self._zipcodes = {zipcode:i for i, zipcode in enumerate(zipcodes)}
+        self._states = {}
+        self._citystates = {}
+        for i, (city, state) in enumerate(zip(cities, states)):
+            self._states.setdefault(state, []).append(i)
+            self._citystates.setdefault((city, state), []).append(i)
+
+    @property
+    def age(self) -> timedelta:
+        """
+        Age of the snapshot.
+        """
+        return datetime.now(timezone.utc) - self.created
+
+    @classmethod
+    def from_sql(cls, engine) -> "ZipcodeIndex":
+        """
+        Build an index by reading the whole Zipcodes table through a ZipcodeEngine.
+        """
+        session = engine.provider.connect()
+        _, query = engine._query(session, boundary_format="wkb")
+        rows = [row._asdict() for row in query.all()]
+        for row in rows:
+            row["Boundary"] = bytes(row["Boundary"]) if row["Boundary"] is not None else None
+        return cls(pa.Table.from_pylist(rows), created=datetime.now(timezone.utc))
+
+    @classmethod
+    def from_parquet(cls, source) -> "ZipcodeIndex":
+        """
+        Load an index from a Parquet snapshot.
+
+        Params:
+        source  : path, file-like object or bytes of the snapshot.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = pa.BufferReader(source)
+        return cls(pq.read_table(source))
+
+    @classmethod
+    def from_blob(cls, blob_client) -> "ZipcodeIndex":
+        """
+        Load an index from a Parquet snapshot in blob storage.
+
+        Params:
+        blob_client : azure.storage.blob.BlobClient of the snapshot (see libs.utils.azure_storage.init_blob_client).
+        """
+        return cls.from_parquet(blob_client.download_blob().readall())
+
+    def to_parquet(self, destination):
+        """
+        Write the index as a Parquet snapshot that `from_parquet` can load.
+
+        Params:
+        destination : path or file-like object.
+        """
+        table = self.table.append_column(
+            "Boundary", pa.array(list(to_wkb(self.boundaries)), type=pa.binary())
+        )
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"created": self.created.isoformat().encode()}
+        )
+        pq.write_table(table, destination, compression="zstd")
+
+    def to_blob(self, blob_client):
+        """
+        Upload the index as a Parquet snapshot, overwriting any previous one.
+        """
+        buffer = io.BytesIO()
+        self.to_parquet(buffer)
+        blob_client.upload_blob(buffer.getvalue(), overwrite=True)
+
+    def load_from_list(self, zipcode_list:list[str], boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE) -> list[dict]:
+        """
+        Load zipcode information given a list of zipcodes (see ZipcodeEngine.load_from_list).
+        """
+        zipcode_list = [('00000'+str(z))[-5:] for z in zipcode_list]
+        indices = {self._zipcodes[z] for z in zipcode_list if z in self._zipcodes}
+        return self._rows(sorted(indices), boundary_format, geometry, tolerance)
+
+    def load_from_state(self, state:str, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE) -> list[dict]:
+        """
+        Load zipcode information for all zipcodes within a given US state (see ZipcodeEngine.load_from_state).
+        """
+        return self._rows(self._states.get(state, []), boundary_format, geometry, tolerance)
+
+    def load_from_citystate(self, city:str, state:str, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE) -> list[dict]:
+        """
+        Load zipcode information for all zipcodes within a given US city and state (see ZipcodeEngine.load_from_citystate).
+        """
+        return self._rows(self._citystates.get((city, state), []), boundary_format, geometry, tolerance)
+
+    def load_from_radius(self, latitude:float, longitude:float, radius:float, boundary_format:str="geojson", geometry:str="full", tolerance:float=DEFAULT_TOLERANCE) -> list[dict]:
+        """
+        Load zipcode information for zipcodes intersecting a circle around a point (see ZipcodeEngine.load_from_radius).
+
+        Params:
+        latitude        : latitude of the search area centerpoint
+        longitude       : longitude of the search area centerpoint
+        radius          : radius in meters to search around the centerpoint
+        boundary_format : "geojson" (default) or "wkb"
+        geometry        : "full" (default), "simplified", "centroid" or "none"
+        tolerance       : simplification tolerance in meters, for geometry="simplified"
+        """
+        circle = latlon_buffers([latitude], [longitude], radii=radius)[0]
+        indices = self.tree.query(circle, predicate="intersects")
+        return self._rows(np.sort(indices), boundary_format, geometry, tolerance)
+
+    def load_from_radii(self, points:list, radii:list[float]) -> "pd.DataFrame":
+        """
+        Find the zipcodes within each of several radii of each of several points (see ZipcodeEngine.load_from_radii).
+
+        Distances are measured in an azimuthal equidistant projection centered on each point,
+        which is exact along the straight lines from the point to each boundary vertex.
+        """
+        radii = sorted(float(radius) for radius in radii)
+        zipcodes = self.table.column("Zipcode").to_numpy(zero_copy_only=False)
+        results = []
+        for point_id, (latitude, longitude) in enumerate(points):
+            if not radii:
+                break
+            circle = latlon_buffers([latitude], [longitude], radii=radii[-1])[0]
+            # the bounding box query keeps zipcodes that the (inscribed) polygon circle misses but the true circle reaches
+            indices = self.tree.query(circle.buffer(circle.length / 1000))
+            if not len(indices):
+                continue
+            distances = shapely.distance(
+                shapely.transform(self.boundaries[indices], _azimuthal_equidistant(latitude, longitude)),
+                shapely.Point(0, 0),
+            )
+            for radius in radii:
+                within = distances <= radius
+                results.append(pd.DataFrame({
+                    "point_id": point_id,
+                    "radius": radius,
+                    "zipcode": zipcodes[indices[within]],
+                    "distance": distances[within],
+                }))
+        if not results:
+            return pd.DataFrame(columns=["point_id", "radius", "zipcode", "distance"])
+        return pd.concat(results).sort_values(["point_id", "radius", "distance"], ignore_index=True)
+
+    def simplified(self, indices, tolerance:float) -> "np.ndarray":
+        """
+        The boundaries at the given indices, simplified with a tolerance in meters.
+        Each boundary is simplified once per tolerance and cached for map rendering.
+        """
+        cache = self._simplified.setdefault(tolerance, np.full(len(self.boundaries), None, dtype=object))
+        missing = indices[shapely.is_missing(cache[indices])]
+        if len(missing):
+            # meters to degrees of latitude, on the sphere of latlon_buffers
+            cache[missing] = shapely.simplify(
+                self.boundaries[missing], np.degrees(tolerance / EARTH_RADIUS), preserve_topology=True
+            )
+        return cache[indices]
+
+    def _rows(self, indices, boundary_format:str, geometry:str="full", tolerance:float=DEFAULT_TOLERANCE) -> list[dict]:
+        indices = np.asarray(indices, dtype=np.int64)
+        if geometry == "none":
+            return self.table.drop_columns(["Latitude", "Longitude"]).take(indices).to_pylist()
+        rows = self.table.take(indices).to_pylist()
+        if geometry == "centroid":
+            return rows
+        elif geometry == "simplified":
+            boundaries = self.simplified(indices, float(tolerance))
+        elif geometry == "full":
+            boundaries = self.boundaries[indices]
+        else:
+            raise Exception(f"Unsupported geometry mode: {geometry}")
+        if boundary_format == "geojson":
+            column, values = "GeoJSON", to_geojson(boundaries)
+        elif boundary_format == "wkb":
+            column, values = "Boundary", to_wkb(boundaries)
+        else:
+            raise Exception(f"Unsupported boundary format: {boundary_format}")
+        for row, value in zip(rows, values):
+            row[column] = value
+        return rows
+
+def _azimuthal_equidistant(latitude:float, longitude:float):
+    """
+    Build a coordinate transform from lon/lat degrees to meters in the spherical azimuthal equidistant projection centered on a point.
+    """
+    phi0, lambda0 = np.radians(latitude), np.radians(longitude)
+
+    def transform(coordinates):
+        lam, phi = np.radians(coordinates[:, 0]) - lambda0, np.radians(coordinates[:, 1])
+        # angular distance (haversine) and bearing from the center
+        h = np.sin((phi - phi0) / 2) ** 2 + np.cos(phi0) * np.cos(phi) * np.sin(lam / 2) ** 2
+        c = 2 * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+        azimuth = np.arctan2(
+            np.sin(lam) * np.cos(phi),
+            np.cos(phi0) * np.sin(phi) - np.sin(phi0) * np.cos(phi) * np.cos(lam),
+        )
+        return np.column_stack([c * np.sin(azimuth), c * np.cos(azimuth)]) * EARTH_RADIUS
+
+    return transform
+
+def load_index(blob_client, max_age:timedelta=DEFAULT_MAX_AGE) -> ZipcodeIndex | None:
+    """
+    Get the zipcode index of a blob snapshot, cached for the life of the process.
+
+    The snapshot is downloaded again once the cached copy is older than `max_age`.
+    Returns None, so that the caller can fall back to SQL, if the snapshot can't be loaded or is itself older than `max_age`.
+
+    Params:
+    blob_client : azure.storage.blob.BlobClient of the snapshot.
+    max_age     : maximum age of the snapshot.
+    """
+    with _LOCK:
+        index = _INDEXES.get(blob_client.url)
+        if index is None or index.age > max_age:
+            try:
+                index = _INDEXES[blob_client.url] = ZipcodeIndex.from_blob(blob_client)
+            except Exception as e:
+                logging.warning(f"Zipcode index snapshot {blob_client.url} could not be loaded: {e}")
+                return None
+        if index.age > max_age:
+            logging.warning(f"Zipcode index snapshot {blob_client.url} is {index.age} old, falling back to SQL.")
+            return None
+        return index
@@ -1,35 +1,24 @@
+from __future__ import annotations
 from functools import partial
-from pyproj import Proj, transform as pyproj_transform
-from shapely.geometry import (
-    shape,
-    GeometryCollection,
-    Point,
-    MultiPoint,
-    LineString,
-    MultiLineString,
-    Polygon,
-    MultiPolygon,
-    polygon,
-    multipolygon,
-)
-from shapely.ops import transform as shapely_transform
+from libs.utils.lazy import lazy_import
 from typing import Union
-import numpy as np
 import geojson
-import shapely.wkb
-import shapely.wkt
-import pandas as pd
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pyproj = lazy_import("pyproj")
+shapely = lazy_import("shapely")
 
 # Define type aliases
 GeoJsonType: type = Union[geojson.Feature, geojson.FeatureCollection]
 WkbType: type = Union[
-    GeometryCollection,
-    Point,
-    MultiPoint,
-    LineString,
-    MultiLineString,
-    Polygon,
-    MultiPolygon,
+    "shapely.geometry.GeometryCollection",
+    "shapely.geometry.Point",
+    "shapely.geometry.MultiPoint",
+    "shapely.geometry.LineString",
+    "shapely.geometry.MultiLineString",
+    "shapely.geometry.Polygon",
+    "shapely.geometry.MultiPolygon",
 ]
 WktType: type = WkbType
 
@@ -57,7 +46,7 @@ def wkb2geojson(wkb: bytes) -> GeoJsonType:
     """
     wkb = shapely.wkb.loads(wkb)
     wkb = validate_wkb(wkb)
-    if type(wkb) == GeometryCollection:
+    if type(wkb) == shapely.geometry.GeometryCollection:
         features = [geojson.Feature(geometry=o, properties={}) for o in wkb.geoms]
         feature_collection = geojson.FeatureCollection(features)
         return feature_collection
@@ -89,7 +78,7 @@ def wkt2geojson(wkt: str) -> GeoJsonType:
     """
     wkt = shapely.wkt.loads(wkt)
     wkt = validate_wkt(wkt)
-    if type(wkt) == GeometryCollection:
+    if type(wkt) == shapely.geometry.GeometryCollection:
         features = [geojson.Feature(geometry=o, properties={}) for o in wkt.geoms]
         feature_collection = geojson.FeatureCollection(features)
         return feature_collection
@@ -100,7 +89,7 @@ def wkt2geojson(wkt: str) -> GeoJsonType:
 
 def geojson2shape(
     data: Union[GeoJsonType, dict]
-) -> Union[GeometryCollection, Polygon, MultiPolygon,]:
+) -> Union[shapely.geometry.GeometryCollection, shapely.geometry.Polygon, shapely.geometry.MultiPolygon,]:
     """
     Converts GeoJSON format to Shapely geometry objects.
 
@@ -124,16 +113,16 @@ def geojson2shape(
     """
     data = validate_geojson(data)
     if data.get("type") == "Polygon":
-        return polygon.orient(shape(data), sign=1.0)
+        return shapely.geometry.polygon.orient(shapely.geometry.shape(data), sign=1.0)
     elif data.get("type") == "MultiPolygon":
-        return MultiPolygon(
-            [polygon.orient(poly, sign=1.0) for poly in shape(data).geoms]
+        return shapely.geometry.MultiPolygon(
+            [shapely.geometry.polygon.orient(poly, sign=1.0) for poly in shapely.geometry.shape(data).geoms]
         )
     elif data.get("type") == "Feature":
         return geojson2shape(data.get("geometry"))
     elif data.get("type") == "FeatureCollection":
         g = [geojson2shape(f.get("geometry")) for f in data.get("features")]
-        return GeometryCollection(g)
+        return shapely.geometry.GeometryCollection(g)
     else:
         raise Exception
 
@@ -256,7 +245,7 @@ def validate_wkt(data: WktType) -> WktType:
     return data
 
 
-def latlon_buffer(latitude: float, longitude: float, radius: int, cap_style=int):
+def latlon_buffer(latitude: float, longitude: float, radius: int, cap_style: int = 1):
     """
     Create a buffer circle around a latitude-longitude point with a given radius in meters.
 
@@ -273,7 +262,7 @@ def latlon_buffer(latitude: float, longitude: float, radius: int, cap_style=int)
             - round: 1
             - flat: 2
             - square: 3
-        Default is `int`.
+        Default is 1.
 
     Returns
     -------
@@ -285,29 +274,90 @@ def latlon_buffer(latitude: float, longitude: float, radius: int, cap_style=int)
     This function creates a buffer circle around a latitude-longitude point using the Shapely library.
     It transforms the coordinates to an azimuthal equidistant projection centered at the given point,
     creates a buffer using the projected coordinates, and then transforms the buffer back to latitude-longitude coordinates.
+    Round buffers are built by `latlon_buffers`, which gives the same circle without the projections.
     """
 
+    if cap_style in (1, "round"):
+        return latlon_buffers([latitude], [longitude], radius)[0]
+
     local_azimuthal_projection = (
         "+proj=aeqd +R=6371000 +units=m +lat_0={} +lon_0={}".format(latitude, longitude)
     )
     wgs84_to_aeqd = partial(
-        pyproj_transform,
-        Proj("+proj=longlat +datum=WGS84 +no_defs"),
-        Proj(local_azimuthal_projection),
+        pyproj.transform,
+        pyproj.Proj("+proj=longlat +datum=WGS84 +no_defs"),
+        pyproj.Proj(local_azimuthal_projection),
     )
     aeqd_to_wgs84 = partial(
-        pyproj_transform,
-        Proj(local_azimuthal_projection),
-        Proj("+proj=longlat +datum=WGS84 +no_defs"),
+        pyproj.transform,
+        pyproj.Proj(local_azimuthal_projection),
+        pyproj.Proj("+proj=longlat +datum=WGS84 +no_defs"),
     )
 
-    point_transformed = shapely_transform(wgs84_to_aeqd, Point(float(longitude), float(latitude)))
+    point_transformed = shapely.ops.transform(wgs84_to_aeqd, shapely.geometry.Point(float(longitude), float(latitude)))
     buffer = point_transformed.buffer(radius, cap_style=cap_style)
     # Get the polygon with lat lon coordinates
-    buffered_poly = shapely_transform(aeqd_to_wgs84, buffer)
+    buffered_poly = shapely.ops.transform(aeqd_to_wgs84, buffer)
     return buffered_poly
 
 
+def latlon_buffers(
+    latitudes: np.array,
+    longitudes: np.array,
+    radii: Union[float, np.array],
+    quad_segs: int = 16,
+    dissolve: bool = False,
+) -> Union[np.array, WkbType]:
+    """
+    Create buffer circles around many latitude-longitude points at once.
+
+    Parameters
+    ----------
+    latitudes : numpy.ndarray
+        The latitudes of the center points.
+    longitudes : numpy.ndarray
+        The longitudes of the center points.
+    radii : float or numpy.ndarray
+        The radius of the circles in meters, for all points or per point.
+    quad_segs : int, optional
+        The number of segments per quarter circle, by default 16 (as in shapely's `buffer`).
+    dissolve : bool, optional
+        If True, return the union of the circles instead of the circles, by default False.
+
+    Returns
+    -------
+    numpy.ndarray or WkbType
+        An array of shapely Polygons, one per point, or their union if `dissolve` is True.
+
+    Notes
+    -----
+    A circle in a local azimuthal equidistant projection, as built by `latlon_buffer`, is the set of points at the radius'
+    geodesic distance from its center. This function computes those vertices directly, for all points and azimuths in one
+    vectorized `pyproj.Geod.fwd` call on the same sphere (R=6371000), and builds the polygons with `shapely.polygons`.
+    """
+
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), latitudes.shape)
+
+    # the vertices of shapely's buffer start east of the center and run clockwise
+    vertices = 4 * quad_segs
+    azimuths = 90.0 + 360.0 * np.arange(vertices) / vertices
+    lons, lats, _ = pyproj.Geod(a=6371000, b=6371000).fwd(
+        np.repeat(longitudes, vertices),
+        np.repeat(latitudes, vertices),
+        np.tile(azimuths, len(latitudes)),
+        np.repeat(radii, vertices),
+    )
+    circles = shapely.polygons(
+        np.stack([lons, lats], axis=-1).reshape(len(latitudes), vertices, 2)
+    )
+
+    if dissolve:
+        return shapely.union_all(circles)
+    return circles
+
+
 def points_in_poly_numpy(x: np.array, y: np.array, poly: np.array) -> np.array:
     """
     Find points that are within a given polygon.
@@ -378,7 +428,7 @@ def points_in_poly_numpy(x: np.array, y: np.array, poly: np.array) -> np.array:
 
     return inside
 
-def points_in_multipoly_numpy(x:np.array, y:np.array, multipoly:shape) -> np.array:
+def points_in_multipoly_numpy(x:np.array, y:np.array, multipoly:shapely.geometry.shape) -> np.array:
     """
     Finds points that are within given multipolygon coordinates.
     Uses numpy to vectorize and check all points quickly
@@ -405,4 +455,130 @@ def points_in_multipoly_numpy(x:np.array, y:np.array, multipoly:shape) -> np.arr
     inside_df = pd.DataFrame(bool_arrays).T
     inside_df['inside'] = inside_df.max(axis=1)
 
-    return np.array(inside_df['inside'].tolist())
\ No newline at end of file
+    return np.array(inside_df['inside'].tolist())
+
+def points_in_geometry(
+    x: np.array,
+    y: np.array,
+    geometry: WkbType,
+    processes: int = None,
+    chunk_size: int = 1_000_000,
+    grid_size: int = 64,
+) -> np.array:
+    """
+    Find points that are within a given geometry, holes and MultiPolygon parts included.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The x-coordinates (longitudes) of the points to check.
+    y : numpy.ndarray
+        The y-coordinates (latitudes) of the points to check.
+    geometry : WkbType
+        A shapely geometry, usually a Polygon or MultiPolygon, or an array of geometries.
+    processes : int, optional
+        The number of worker processes. By default, the points are checked in this process.
+    chunk_size : int, optional
+        The number of points checked per task when using processes, by default 1,000,000.
+    grid_size : int, optional
+        The number of grid cells per side used to bin the points, by default 64.
+
+    Returns
+    -------
+    numpy.ndarray
+        A boolean array with the same length as the input points.
+        True if the point is inside the geometry or on its boundary, False otherwise.
+
+    Notes
+    -----
+    The points are binned into a grid over the geometry's bounds, and an STRtree of the geometry's parts is queried with
+    the grid cells. Each part is prepared once: points in cells within the part are inside without further checks, and
+    points in cells crossing its boundary are checked with the vectorized `shapely.intersects_xy`. Each point is therefore
+    only checked against the parts whose cells it falls in, and no Point objects are created.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    parts = shapely.get_parts(geometry)
+
+    if not processes or len(x) <= chunk_size:
+        return _points_in_parts(x, y, parts, grid_size)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts = range(0, len(x), chunk_size)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(
+            _points_in_parts,
+            [x[start : start + chunk_size] for start in starts],
+            [y[start : start + chunk_size] for start in starts],
+            [parts] * len(starts),
+            [grid_size] * len(starts),
+        )
+        return np.concatenate(list(results))
+
+
+def _points_in_parts(x: np.array, y: np.array, parts: np.array, grid_size: int) -> np.array:
+    inside = np.zeros(len(x), np.bool_)
+    if not len(parts) or not len(x):
+        return inside
+
+    # only points within the geometry's bounds are candidates
+    minx, miny, maxx, maxy = shapely.total_bounds(parts)
+    candidates = np.flatnonzero((x >= minx) & (x <= maxx) & (y >= miny) & (y <= maxy))
+
+    # bin the candidates into grid cells, sorted by cell; points on the max edges go in the last cell
+    width = max(maxx - minx, 1e-12) / grid_size
+    height = max(maxy - miny, 1e-12) / grid_size
+    column = np.minimum(((x[candidates] - minx) / width).astype(np.int64), grid_size - 1)
+    row = np.minimum(((y[candidates] - miny) / height).astype(np.int64), grid_size - 1)
+    cell = row * grid_size + column
+    # with up to 2**16 cells, the stable sort of 16-bit keys is a linear-time radix sort
+    if grid_size <= 256:
+        cell = cell.astype(np.uint16)
+    points = candidates[np.argsort(cell, kind="stable")]
+    counts = np.bincount(cell, minlength=grid_size * grid_size)
+    ends = np.cumsum(counts)
+
+    # the non-empty cells as boxes
+    cells = np.flatnonzero(counts)
+    boxes = shapely.box(
+        minx + cells % grid_size * width,
+        miny + cells // grid_size * height,
+        minx + (cells % grid_size + 1) * width,
+        miny + (cells // grid_size + 1) * height,
+    )
+
+    def cell_points(cell_indexes: np.array) -> np.array:
+        if not len(cell_indexes):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(
+            [points[ends[c] - counts[c] : ends[c]] for c in cells[cell_indexes]]
+        )
+
+    # the cells whose bounding boxes intersect each part
+    tree = shapely.STRtree(parts)
+    for cell_indexes, part_index in _cells_by_part(tree.query(boxes)):
+        part = parts[part_index]
+        shapely.prepare(part)
+
+        # cells within the part: all of their points are inside
+        covered = shapely.contains(part, boxes[cell_indexes])
+        inside[cell_points(cell_indexes[covered])] = True
+
+        # cells crossing the part's boundary: check their remaining points against the part
+        indexes = cell_points(cell_indexes[~covered])
+        indexes = indexes[~inside[indexes]]
+        inside[indexes] = shapely.intersects_xy(part, x[indexes], y[indexes])
+
+    return inside
+
+
+def _cells_by_part(pairs: np.array):
+    # group the (cell, part) index pairs of STRtree.query by part
+    cell_indexes, part_indexes = pairs
+    order = np.argsort(part_indexes, kind="stable")
+    cell_indexes, part_indexes = cell_indexes[order], part_indexes[order]
+    starts = np.flatnonzero(np.diff(part_indexes, prepend=-1))
+    for start, end in zip(starts, np.append(starts[1:], len(part_indexes))):
+        yield cell_indexes[start:end], part_indexes[start]
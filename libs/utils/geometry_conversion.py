@@ -0,0 +1,254 @@
+from __future__ import annotations
+from libs.utils.lazy import lazy_import
+from typing import Iterable, Union
+import orjson as json
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+shapely = lazy_import("shapely")
+
+FORMATS = ("geometry", "geojson", "dict", "wkb", "wkt")
+
+
+def from_geojson(values: Iterable[Union[str, bytes, dict]]) -> np.ndarray:
+    """
+    Parse GeoJSON geometries into an array of shapely geometries.
+
+    Parameters
+    ----------
+    values : Iterable[Union[str, bytes, dict]]
+        GeoJSON geometries as strings, bytes or dictionaries. None values stay None.
+
+    Returns
+    -------
+    numpy.ndarray
+        The shapely geometries.
+
+    Notes
+    -----
+    Strings are parsed by GEOS in a single vectorized `shapely.from_geojson` call. Dictionaries are serialized with orjson
+    first, which is faster than building each geometry with `shapely.geometry.shape`.
+    """
+
+    values = _object_array(values)
+    for index in np.flatnonzero([isinstance(value, dict) for value in values]):
+        values[index] = json.dumps(values[index])
+    return shapely.from_geojson(values)
+
+
+def from_wkb(values: Iterable[Union[bytes, memoryview, str]]) -> np.ndarray:
+    """
+    Parse Well-Known Binary (WKB) geometries into an array of shapely geometries.
+
+    Parameters
+    ----------
+    values : Iterable[Union[bytes, memoryview, str]]
+        WKB geometries as bytes, memoryviews (as returned by psycopg2 for bytea) or hex strings. None values stay None.
+
+    Returns
+    -------
+    numpy.ndarray
+        The shapely geometries.
+    """
+
+    values = _object_array(values)
+    for index in np.flatnonzero([isinstance(value, (memoryview, bytearray)) for value in values]):
+        values[index] = bytes(values[index])
+    return shapely.from_wkb(values)
+
+
+def from_wkt(values: Iterable[str]) -> np.ndarray:
+    """
+    Parse Well-Known Text (WKT) geometries into an array of shapely geometries.
+
+    Parameters
+    ----------
+    values : Iterable[str]
+        WKT geometries. None values stay None.
+
+    Returns
+    -------
+    numpy.ndarray
+        The shapely geometries.
+    """
+
+    return shapely.from_wkt(_object_array(values))
+
+
+def to_geojson(geometries: Iterable, as_dict: bool = False) -> np.ndarray:
+    """
+    Serialize shapely geometries to GeoJSON.
+
+    Parameters
+    ----------
+    geometries : Iterable
+        The shapely geometries. None values stay None.
+    as_dict : bool, optional
+        If True, return the geometries as dictionaries instead of strings, by default False.
+
+    Returns
+    -------
+    numpy.ndarray
+        The GeoJSON geometries as strings, or as dictionaries.
+    """
+
+    values = shapely.to_geojson(_object_array(geometries))
+    if as_dict:
+        values = _object_array([json.loads(value) if value is not None else None for value in values])
+    return values
+
+
+def to_wkb(geometries: Iterable, hex: bool = False) -> np.ndarray:
+    """
+    Serialize shapely geometries to Well-Known Binary (WKB).
+
+    Parameters
+    ----------
+    geometries : Iterable
+        The shapely geometries. None values stay None.
+    hex : bool, optional
+        If True, return hex strings instead of bytes, by default False.
+
+    Returns
+    -------
+    numpy.ndarray
+        The WKB geometries.
+    """
+
+    return shapely.to_wkb(_object_array(geometries), hex=hex)
+
+
+def to_wkt(geometries: Iterable, rounding_precision: int = -1) -> np.ndarray:
+    """
+    Serialize shapely geometries to Well-Known Text (WKT).
+
+    Parameters
+    ----------
+    geometries : Iterable
+        The shapely geometries. None values stay None.
+    rounding_precision : int, optional
+        The number of decimals to keep, by default -1 (full precision, as the `.wkt` attribute).
+
+    Returns
+    -------
+    numpy.ndarray
+        The WKT geometries.
+    """
+
+    return shapely.to_wkt(_object_array(geometries), rounding_precision=rounding_precision)
+
+
+def convert(values: Iterable, source: str, target: str) -> np.ndarray:
+    """
+    Convert an array of geometries between formats.
+
+    Parameters
+    ----------
+    values : Iterable
+        The geometries.
+    source : str
+        The format of `values`, one of FORMATS: "geometry" (shapely), "geojson" (strings), "dict" (GeoJSON
+        dictionaries), "wkb" or "wkt".
+    target : str
+        The format to convert to, one of FORMATS.
+
+    Returns
+    -------
+    numpy.ndarray
+        The converted geometries.
+
+    Example
+    -------
+    >>> zips["GeoJSON"] = convert(zips["Boundary"], "wkb", "dict")
+    """
+
+    readers = {
+        "geometry": _object_array,
+        "geojson": from_geojson,
+        "dict": from_geojson,
+        "wkb": from_wkb,
+        "wkt": from_wkt,
+    }
+    writers = {
+        "geometry": _object_array,
+        "geojson": to_geojson,
+        "dict": lambda geometries: to_geojson(geometries, as_dict=True),
+        "wkb": to_wkb,
+        "wkt": to_wkt,
+    }
+    if source not in readers or target not in writers:
+        raise ValueError(f"Formats must be one of {FORMATS}, not '{source}' and '{target}'.")
+    return writers[target](readers[source](values))
+
+
+def wkb_column(column: str, dialect: str = "mssql", alias: str = None) -> str:
+    """
+    Build the SQL expression that fetches a geometry or geography column as WKB.
+
+    Parameters
+    ----------
+    column : str
+        The (quoted) column expression, e.g. "[Boundary]" or "fsq.point".
+    dialect : str, optional
+        "mssql" (SQL Server, `STAsBinary()`) or "postgresql" (PostGIS, `ST_AsBinary`), by default "mssql".
+    alias : str, optional
+        The alias of the expression, if any.
+
+    Returns
+    -------
+    str
+        The SQL expression.
+
+    Notes
+    -----
+    Fetching WKB skips the text serialization on the server (e.g. `dbo.geo2json`) and the parsing in Python, and the
+    result can be passed to `from_wkb` as is. Both dialects write longitude as x, also for SQL Server geographies.
+    """
+
+    if dialect == "mssql":
+        expression = f"{column}.STAsBinary()"
+    elif dialect == "postgresql":
+        expression = f"ST_AsBinary({column})"
+    else:
+        raise ValueError(f"Unsupported dialect: {dialect}")
+    return f"{expression} AS {alias}" if alias else expression
+
+
+def read_sql_geometries(sql, con, geometry_columns: Iterable[str], target: str = "geometry", **kwargs) -> pd.DataFrame:
+    """
+    Run a query with `pandas.read_sql` and convert its WKB geometry columns in bulk.
+
+    Parameters
+    ----------
+    sql : str or SQLAlchemy Selectable
+        The query, selecting the geometry columns as WKB (see `wkb_column`).
+    con : SQLAlchemy connectable
+        The database connection.
+    geometry_columns : Iterable[str]
+        The names of the WKB columns in the result.
+    target : str, optional
+        The format to convert the columns to, one of FORMATS, by default "geometry".
+    **kwargs
+        Passed to `pandas.read_sql`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The result, with the geometry columns converted.
+    """
+
+    results = pd.read_sql(sql, con, **kwargs)
+    for column in geometry_columns:
+        results[column] = convert(results[column].to_numpy(dtype=object), "wkb", target)
+    return results
+
+
+def _object_array(values: Iterable) -> np.ndarray:
+    # a copy, so the converters can replace values in place
+    if isinstance(values, (pd.Series, pd.Index)):
+        values = values.to_numpy(dtype=object)
+    elif not hasattr(values, "__len__"):
+        values = list(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
@@ -1,5 +1,12 @@
-from shapely.geometry import shape, box
-import geojson, h3, orjson as json, pandas as pd, shapely.wkt
+from __future__ import annotations
+from libs.utils.lazy import lazy_import
+import geojson, orjson as json
+
+h3 = lazy_import("h3")
+h3_int = lazy_import("h3.api.numpy_int")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+shapely = lazy_import("shapely")
 
 # main entry point is the hex_intersections function
 
@@ -35,12 +42,12 @@ def data_to_shape(data) -> shapely.geometry.shape:
     # load data into a shapely Shape object
     try:
         # load from geojson dictionary
-        poly_as_shape = shape(data['geometry'])
+        poly_as_shape = shapely.geometry.shape(data['geometry'])
     except:
         try:
             # load from geojson string
             poly = json.loads(data)
-            poly_as_shape = shape(poly['geometry'])
+            poly_as_shape = shapely.geometry.shape(poly['geometry'])
         except:
             try:
                 # load from wkt string
@@ -48,18 +55,18 @@ def data_to_shape(data) -> shapely.geometry.shape:
             except:
                 try:
                     # load from coordinate string in a double list
-                    poly_as_shape = shape({"coordinates":data,"type":"Polygon"})
+                    poly_as_shape = shapely.geometry.shape({"coordinates":data,"type":"Polygon"})
                 except:
                     try:
                         # load from coordinate string in a single list
-                        poly_as_shape = shape({"coordinates":[data],"type":"Polygon"})
+                        poly_as_shape = shapely.geometry.shape({"coordinates":[data],"type":"Polygon"})
                     except:
                         raise Exception("Could not convert data to a shapely object. Accepted types are GeoJSON dictionary, GeoJSON string, and WKT string.")
 
     return poly_as_shape
 
 
-def hex_intersections(data, resolution:int=8) -> pd.DataFrame:
+def hex_intersections(data, resolution:int=8, engine:str="vectorized") -> pd.DataFrame:
     """"
     Given a geometry and resolution, returns the H3 hexes that are needed to completely cover the given geometry.
 
@@ -69,16 +76,104 @@ def hex_intersections(data, resolution:int=8) -> pd.DataFrame:
 
     * resolution: The resolution level at which to generate H3 hexes.
 
+    * engine: "vectorized" (default) or "legacy".
+
+        * "vectorized" polyfills each polygon part (holes included), finds the hexes crossed by the polygon's rings,
+          and tests only those against the polygon with vectorized shapely predicates. Hexes inside the polygon and
+          away from its rings are "full" without any geometry test. Returns the columns id, intersection
+          ("full" or "partial") and source ("polyfill" or "boundary").
+
+        * "legacy" polyfills the polygon (or the bounding box of a MultiPolygon), tests each hex and then walks the
+          neighbors of intersecting hexes. Returns the columns id, feature, shape, intersection ("full", "partial"
+          or "none") and source ("polyfill" or "neighbor").
+
     """
     # get a shapely Shape from the input data (supported types in docstring)
     poly_as_shape = data_to_shape(data)
 
+    if poly_as_shape.geom_type not in ('Polygon', 'MultiPolygon'):
+        raise Exception(f"Unsupported geometry type: {poly_as_shape.geom_type}")
+
+    if engine == 'vectorized':
+        return vectorized_intersections(poly_as_shape, resolution)
+    elif engine == 'legacy':
+        return legacy_intersections(poly_as_shape, resolution)
+    else:
+        raise Exception(f"Unsupported engine: {engine}")
+
+def vectorized_intersections(poly_as_shape:shapely.geometry.shape, resolution:int) -> pd.DataFrame:
+    """
+    Intermediate function called by hex_intersections.
+
+    Splits the covering hexes into interior hexes, whose centroids are inside the polygon and which no ring crosses,
+    and boundary hexes, which are classified with vectorized shapely predicates.
+    """
+    parts = list(getattr(poly_as_shape, 'geoms', [poly_as_shape]))
+
+    # hexes with centroids inside a part (polyfill excludes the part's holes)
+    filled_hexes = set()
+    for part in parts:
+        filled_hexes.update(h3.polyfill_geojson(geojson=shapely.geometry.mapping(part), res=resolution))
+
+    # hexes that any ring (exterior or hole) may cross
+    boundary_hexes = boundary_cells(poly_as_shape, resolution)
+
+    interior = np.array(sorted(filled_hexes - boundary_hexes), dtype=object)
+    candidates = np.array(sorted(boundary_hexes), dtype=object)
+
+    # exact tests for the boundary hexes only
+    shapely.prepare(poly_as_shape)
+    hex_shapes = hex_polygons(candidates)
+    full = shapely.contains(poly_as_shape, hex_shapes)
+    partial = ~full & shapely.intersects(poly_as_shape, hex_shapes)
+
+    return pd.DataFrame({
+        'id': np.concatenate([interior, candidates[full], candidates[partial]]),
+        'intersection': ['full'] * (len(interior) + int(full.sum())) + ['partial'] * int(partial.sum()),
+        'source': ['polyfill'] * len(interior) + ['boundary'] * int(full.sum() + partial.sum()),
+    })
+
+def boundary_cells(poly_as_shape:shapely.geometry.shape, resolution:int) -> set:
+    """
+    Returns the hexes that the rings of a shape may cross.
+
+    The rings are sampled at a third of the resolution's average edge length, so every hex a ring crosses is either
+    hit by a sample or is a neighbor of a hex that is, and the sampled hexes are grown by one ring of neighbors.
+    """
+    # degrees of latitude are the longest, so this spacing is an upper bound in kilometers
+    spacing = h3.edge_length(resolution, unit='km') / 111.32 / 3
+    rings = shapely.segmentize(poly_as_shape.boundary, spacing)
+    coordinates = shapely.get_coordinates(rings)
+
+    sampled = {h3.geo_to_h3(lat, lng, resolution) for lng, lat in coordinates.tolist()}
+    cells = set()
+    for hex_id in sampled:
+        cells.update(h3.k_ring(hex_id, 1))
+    return cells
+
+def hex_polygons(hex_ids) -> np.ndarray:
+    """
+    Returns an array of shapely Polygons for an array of H3 hex_ids.
+    """
+    boundaries = [h3.h3_to_geo_boundary(hex_id, geo_json=True) for hex_id in hex_ids]
+    if not boundaries:
+        return np.empty(0, dtype=object)
+    coordinates = np.array([point for boundary in boundaries for point in boundary], dtype=float)
+    indices = np.repeat(np.arange(len(boundaries)), [len(boundary) for boundary in boundaries])
+    return shapely.polygons(shapely.linearrings(coordinates, indices=indices))
+
+def legacy_intersections(poly_as_shape:shapely.geometry.shape, resolution:int) -> pd.DataFrame:
+    """
+    Intermediate function called by hex_intersections.
+
+    Polyfills the polygon (or the bounding box of a MultiPolygon), tests each hex against the polygon and then checks the neighbors of intersecting hexes.
+    """
     # use built-in h3 polyfill to get hexes with centroids inside the bounding box
     if poly_as_shape.geom_type == 'Polygon':
         filled_hexes = h3.polyfill_geojson(geojson=shape_to_feature(poly_as_shape)['geometry'], res=resolution)
     elif poly_as_shape.geom_type == 'MultiPolygon':
         # for multipolygons, use a bounding box that encapsulates the entire bounded area
-        bounding_box = box(
+        bounding_box = shapely.geometry.box(
             minx=poly_as_shape.bounds[0],
             miny=poly_as_shape.bounds[1],
             maxx=poly_as_shape.bounds[2],
@@ -95,7 +190,7 @@ def hex_intersections(data, resolution:int=8) -> pd.DataFrame:
     # create dataframe of hexes and store them as geometry types
     hexes = pd.DataFrame(filled_hexes, columns=['id'])
     hexes['feature'] = hexes['id'].apply(hex_to_feature)
-    hexes['shape'] = hexes['feature'].apply(lambda x: shape(x['geometry']))
+    hexes['shape'] = hexes['feature'].apply(lambda x: shapely.geometry.shape(x['geometry']))
 
     # check for full/partial intersection on the polyfill-generated hexes
     intersection_list = []
@@ -126,60 +221,151 @@ def neighbor_check(df:pd.DataFrame, poly_as_shape:shapely.geometry.shape) -> pd.
     """
     Intermediate function called by hex_intersections.
 
-    Takes the list of polyfilled hexes and recursively checks for intersections between the neighbors of known hexes and the original polygon.
+    Takes the list of polyfilled hexes and repeatedly checks for intersections between the neighbors of known hexes and the original polygon.
+    Each round tests all unchecked neighbors of the last round's intersecting hexes at once.
     """
-    # check the neighbors of all partially-contained hexes
     hexes = df.copy()
-    partials = hexes[hexes['intersection'].isin(['partial','full'])].copy()
-
-    # a list of hexes whose neighbors will be checked for intersection with the polygon
-    border_queue = partials['id'].copy().tolist()
-
-    while len(border_queue):
-        hex_id = border_queue[0]
-
-        hex_neighbors = h3.k_ring(hex_id, 1)
-
-        # find neighbors and calculate their intersections with the polygon
-        for neighbor_id in hex_neighbors:
-            if neighbor_id in hexes['id'].unique():
-                # skip hexes we have already evaluated
-                continue
-            else:
-                neighbor_as_feature = hex_to_feature(neighbor_id)
-                neighbor_as_shape = shape(neighbor_as_feature['geometry'])
-                
-                # append as a partial neighbor if it intersects with the polygon
-                if poly_as_shape.intersects(neighbor_as_shape):
-                    hexes = pd.concat([
-                        hexes,
-                        pd.DataFrame([{
-                            'id':neighbor_id,
-                            'feature':neighbor_as_feature,
-                            'shape':neighbor_as_shape,
-                            'intersection':'partial',
-                            'source':'neighbor'
-                        }])
-                    ])
-                    border_queue.append(neighbor_id) # add new partial intersections to the border queue
-
-                # append as a non-intersecting neighbor if no intersection with the polygon
-                else:    
-                    hexes = pd.concat([
-                        hexes,
-                        pd.DataFrame([{
-                            'id':neighbor_id,
-                            'feature':neighbor_as_feature,
-                            'shape':neighbor_as_shape,
-                            'intersection':'none',
-                            'source':'neighbor'
-                        }]
-)
-                    ])
-
-        border_queue.remove(hex_id)
+    checked = set(hexes['id'])
 
-    return hexes
+    # the hexes whose neighbors will be checked for intersection with the polygon
+    border = hexes.loc[hexes['intersection'].isin(['partial','full']), 'id'].tolist()
+
+    shapely.prepare(poly_as_shape)
+    found = [hexes]
+    while len(border):
+        # neighbors we have not evaluated yet, in the order they are first reached
+        neighbor_ids = list(dict.fromkeys(
+            neighbor_id
+            for hex_id in border
+            for neighbor_id in h3.k_ring(hex_id, 1)
+            if neighbor_id not in checked
+        ))
+        checked.update(neighbor_ids)
+
+        neighbors = pd.DataFrame({'id':neighbor_ids})
+        neighbors['feature'] = neighbors['id'].apply(hex_to_feature)
+        neighbors['shape'] = hex_polygons(neighbor_ids)
+        intersects = shapely.intersects(poly_as_shape, neighbors['shape'].to_numpy())
+        neighbors['intersection'] = np.where(intersects, 'partial', 'none')
+        neighbors['source'] = 'neighbor'
+        found.append(neighbors)
+
+        # new partial intersections are checked in the next round
+        border = neighbors.loc[intersects, 'id'].tolist()
+
+    return pd.concat(found)
+
+def hex_clusters(hex_ids) -> np.ndarray:
+    """
+    Labels the connected components of a set of H3 hexes.
+
+    Hexes are connected when they are neighbors (k_ring distance 1). Clusters are numbered from 0 in the order of their first hex in hex_ids,
+    and the labels are returned in the same order as hex_ids.
+    """
+    # map the hexes to their positions once, through the sorted integer ids
+    ids = np.array([int(hex_id, 16) for hex_id in hex_ids], dtype=np.uint64)
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+
+    # neighbor pairs (u, v) between positions in hex_ids
+    rings = [h3_int.k_ring(hex_id, 1) for hex_id in ids.tolist()]
+    neighbors = np.concatenate(rings) if rings else np.empty(0, dtype=np.uint64)
+    u = np.repeat(np.arange(len(ids)), [len(ring) for ring in rings])
+    found = np.searchsorted(sorted_ids, neighbors).clip(max=max(len(ids) - 1, 0))
+    present = sorted_ids[found] == neighbors if len(ids) else np.zeros(0, dtype=bool)
+    u, v = u[present], order[found[present]]
+
+    # union-find over the pairs: hook the larger root onto the smaller one, then compress with pointer jumping,
+    # until every pair shares a root. Roots end up being the first position of their cluster.
+    parent = np.arange(len(ids))
+    while True:
+        root_u, root_v = parent[u], parent[v]
+        split = root_u != root_v
+        if not split.any():
+            break
+        np.minimum.at(parent, np.maximum(root_u[split], root_v[split]), np.minimum(root_u[split], root_v[split]))
+        while True:
+            jumped = parent[parent]
+            if (jumped == parent).all():
+                break
+            parent = jumped
+
+    # sorted roots are in order of first appearance
+    return np.unique(parent, return_inverse=True)[1].astype(np.int64)
+
+def compact_ranges(hex_ids) -> tuple:
+    """
+    Compacts a set of H3 hexes of one resolution into fewer terms for an id filter.
+
+    Returns the hexes that are left on their own, and inclusive (first, last) id ranges for the rest.
+    H3 ids are fixed-width hex strings, so the descendants of a compacted parent at the original resolution are exactly the ids
+    of that resolution which sort between its first and last descendant, and `id BETWEEN first AND last` matches them without
+    listing them. Ranges and hexes that follow each other in id order are merged.
+    """
+    hex_ids = list(dict.fromkeys(hex_ids))
+    if not len(hex_ids):
+        return [], []
+    resolution = h3.h3_get_resolution(hex_ids[0])
+
+    # the id range of each compacted hex at the original resolution, in id order
+    spans = sorted(descendant_range(int(hex_id, 16), resolution) for hex_id in h3.compact(hex_ids))
+
+    # merge a span into the previous one when no other valid id of the resolution sorts between them
+    merged = [list(spans[0])]
+    for first, last in spans[1:]:
+        if first == next_id(merged[-1][1], resolution):
+            merged[-1][1] = last
+        else:
+            merged.append([first, last])
+
+    cells = [format(first, '015x') for first, last in merged if first == last]
+    ranges = [(format(first, '015x'), format(last, '015x')) for first, last in merged if first != last]
+    return cells, ranges
+
+def descendant_range(cell:int, resolution:int) -> tuple:
+    """
+    Returns the first and last integer ids of the descendants of a hex (as an integer id) at the same or a finer resolution.
+    """
+    parent_resolution = (cell >> 52) & 0xF
+
+    # set the resolution bits, then the digits below the parent to 0 (first) or 6 (last); finer digits stay 7
+    cell = (cell & ~(0xF << 52)) | (resolution << 52)
+    first = last = cell
+    for digit in range(parent_resolution + 1, resolution + 1):
+        offset = 3 * (15 - digit)
+        first &= ~(0x7 << offset)
+        last = (last & ~(0x7 << offset)) | (0x6 << offset)
+    return first, last
+
+def next_id(cell:int, resolution:int) -> int:
+    """
+    Returns the integer id that follows a hex (as an integer id) in id order among the hexes of its resolution.
+
+    Digits run from 0 to 6, so the last digit is incremented and carried into the coarser digits, then the base cell.
+    Deleted pentagon subsequences are not skipped, so the result may not be a valid hex.
+    """
+    for digit in range(resolution, 0, -1):
+        offset = 3 * (15 - digit)
+        if (cell >> offset) & 0x7 < 6:
+            return cell + (1 << offset)
+        cell &= ~(0x7 << offset)
+    return cell + (1 << 45)
+
+def hex_filter_sql(column:str, hex_ids, compact:bool=True) -> str:
+    """
+    Builds a SQL condition that matches the given H3 hexes in a column of hex ids.
+
+    With compact, the hexes are sent as compact_ranges: an IN list of the hexes that could not be compacted and a BETWEEN
+    per compacted parent hex. Otherwise every hex is listed in the IN list.
+    """
+    cells, ranges = compact_ranges(hex_ids) if compact else (list(dict.fromkeys(hex_ids)), [])
+
+    conditions = [f"{column} BETWEEN '{first}' AND '{last}'" for first, last in ranges]
+    if len(cells):
+        conditions.insert(0, f"{column} IN ('" + "','".join(cells) + "')")
+    if not len(conditions):
+        return "1 = 0"
+    return "(" + " OR ".join(conditions) + ")"
 
 
 from bitarray.util import hex2ba, ba2int
@@ -0,0 +1,286 @@
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List, Optional
+import json, os, sys, time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Packages reported as heavy when a module pulls them in.
+HEAVY_MODULES = (
+    "azure.storage",
+    "boto3",
+    "botocore",
+    "facebook_business",
+    "fsspec",
+    "geopandas",
+    "googlemaps",
+    "h3",
+    "marshmallow",
+    "matplotlib",
+    "numpy",
+    "pandas",
+    "pptx",
+    "pyarrow",
+    "pydantic",
+    "pyodbc",
+    "pyproj",
+    "s3fs",
+    "scipy",
+    "shapely",
+    "sklearn",
+    "sqlalchemy",
+)
+
+
+class ImportBudgetExceeded(RuntimeError):
+    """
+    Raised when an import profile exceeds its budget.
+    """
+
+
+class ImportProfiler:
+    """
+    Record the cost of importing modules.
+
+    Each measurement records the wall time, the growth of the process's peak RSS,
+    the number of modules newly added to `sys.modules` and the heavy packages among
+    them. Shared dependencies are attributed to the first module that imports them.
+    """
+
+    def __init__(self, heavy: Iterable[str] = HEAVY_MODULES) -> None:
+        """
+        Initialize an ImportProfiler.
+
+        Parameters
+        ----------
+        heavy : Iterable[str], optional
+            The (dotted) package names to report as heavy, by default HEAVY_MODULES.
+        """
+
+        self.heavy = tuple(heavy)
+        self.records: List[dict] = []
+        self._stack: List[dict] = []
+
+    @contextmanager
+    def measure(self, name: str, kind: str = "module"):
+        """
+        Measure the imports made inside the context.
+
+        Parameters
+        ----------
+        name : str
+            The name of the measured module or blueprint path.
+        kind : str, optional
+            The kind of the measured item, by default "module".
+
+        Example
+        -------
+        >>> profiler = ImportProfiler()
+        >>> with profiler.measure("libs/azure/functions/blueprints/keep_alive.py"):
+        >>>     import_blueprints("libs/azure/functions/blueprints/keep_alive.py")
+        """
+
+        record = {
+            "name": name,
+            "kind": kind,
+            "parent": self._stack[-1]["name"] if self._stack else None,
+        }
+        modules = set(sys.modules)
+        rss = _peak_rss_mb()
+        start = time.perf_counter()
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            self._stack.pop()
+            record["seconds"] = time.perf_counter() - start
+            record["rss_delta_mb"] = _peak_rss_mb() - rss if rss is not None else None
+            added = set(sys.modules) - modules
+            record["modules"] = len(added)
+            record["heavy"] = sorted(
+                package
+                for package in self.heavy
+                if any(m == package or m.startswith(package + ".") for m in added)
+            )
+            self.records.append(record)
+
+    def report(self, label: str = None) -> dict:
+        """
+        Build the profile report.
+
+        Parameters
+        ----------
+        label : str, optional
+            A label for the report, such as the deployment site.
+
+        Returns
+        -------
+        dict
+            The total time of the outermost measurements, the process's peak RSS, and
+            the records sorted by descending wall time.
+        """
+
+        return {
+            "label": label,
+            "total_seconds": sum(r["seconds"] for r in self.records if r["parent"] is None),
+            "peak_rss_mb": _peak_rss_mb(),
+            "modules": len(sys.modules),
+            "records": sorted(self.records, key=lambda r: r["seconds"], reverse=True),
+        }
+
+    def table(self, limit: int = 25) -> str:
+        """
+        Format the slowest records as a console table.
+
+        Parameters
+        ----------
+        limit : int, optional
+            The number of records to show, by default 25.
+
+        Returns
+        -------
+        str
+            The table.
+        """
+
+        report = self.report()
+        lines = [f"{'seconds':>9}{'rss (MB)':>10}{'modules':>9}  {'name':<60}heavy"]
+        for record in report["records"][:limit]:
+            rss = record["rss_delta_mb"]
+            lines.append(
+                f"{record['seconds']:>9.3f}{rss if rss is not None else float('nan'):>10.1f}"
+                f"{record['modules']:>9}  {record['name']:<60}{', '.join(record['heavy'])}"
+            )
+        lines.append(
+            f"{report['total_seconds']:>9.3f}{report['peak_rss_mb'] or float('nan'):>10.1f}"
+            f"{report['modules']:>9}  {'total (peak RSS, loaded modules)':<60}"
+        )
+        return "\n".join(lines)
+
+    def write(self, path: str, label: str = None) -> None:
+        """
+        Write the profile report to a JSON file.
+        """
+
+        with open(path, "w") as file:
+            json.dump(self.report(label), file, indent=1)
+
+    def check(
+        self,
+        seconds: float = None,
+        module_seconds: float = None,
+        rss_mb: float = None,
+    ) -> None:
+        """
+        Check the profile against a budget.
+
+        Parameters
+        ----------
+        seconds : float, optional
+            The maximum total import time.
+        module_seconds : float, optional
+            The maximum import time of any single module.
+        rss_mb : float, optional
+            The maximum peak RSS of the process, in megabytes.
+
+        Raises
+        ------
+        ImportBudgetExceeded
+            If any of the limits is exceeded.
+        """
+
+        report = self.report()
+        violations = []
+        if seconds is not None and report["total_seconds"] > seconds:
+            violations.append(f"total import time {report['total_seconds']:.3f}s > {seconds}s")
+        if module_seconds is not None:
+            violations.extend(
+                f"'{r['name']}' took {r['seconds']:.3f}s > {module_seconds}s"
+                for r in report["records"]
+                if r["kind"] == "module" and r["seconds"] > module_seconds
+            )
+        if rss_mb is not None and report["peak_rss_mb"] and report["peak_rss_mb"] > rss_mb:
+            violations.append(f"peak RSS {report['peak_rss_mb']:.1f}MB > {rss_mb}MB")
+        if violations:
+            raise ImportBudgetExceeded("Import budget exceeded: " + "; ".join(violations))
+
+
+_PROFILER: Optional[ImportProfiler] = (
+    ImportProfiler() if os.environ.get("IMPORT_PROFILE") else None
+)
+
+
+def get_profiler() -> Optional[ImportProfiler]:
+    """
+    Get the process's import profiler.
+
+    Returns
+    -------
+    ImportProfiler or None
+        The profiler, or None unless the IMPORT_PROFILE environment variable is set.
+    """
+
+    return _PROFILER
+
+
+def profile(name: str, kind: str = "module"):
+    """
+    Measure the imports made inside the context when profiling is enabled.
+
+    Returns
+    -------
+    ContextManager
+        The profiler's measurement, or a no-op context.
+    """
+
+    return _PROFILER.measure(name, kind) if _PROFILER else nullcontext()
+
+
+def finish_profile(label: str = None) -> None:
+    """
+    Report the import profile and check it against the budget from the environment.
+
+    When profiling is enabled (IMPORT_PROFILE is set to the path of the JSON report),
+    this writes the report, prints the console table, then checks the budget set by
+    the IMPORT_BUDGET_SECONDS, IMPORT_BUDGET_MODULE_SECONDS and IMPORT_BUDGET_RSS_MB
+    environment variables.
+
+    Parameters
+    ----------
+    label : str, optional
+        A label for the report, such as the deployment site.
+
+    Raises
+    ------
+    ImportBudgetExceeded
+        If the profile exceeds the budget.
+    """
+
+    if not _PROFILER:
+        return
+    _PROFILER.write(os.environ["IMPORT_PROFILE"], label)
+    print(_PROFILER.table())
+    _PROFILER.check(**_budget_from_env())
+
+
+def _budget_from_env() -> Dict[str, float]:
+    variables = {
+        "seconds": "IMPORT_BUDGET_SECONDS",
+        "module_seconds": "IMPORT_BUDGET_MODULE_SECONDS",
+        "rss_mb": "IMPORT_BUDGET_RSS_MB",
+    }
+    return {
+        key: float(os.environ[variable])
+        for key, variable in variables.items()
+        if os.environ.get(variable)
+    }
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
@@ -0,0 +1,145 @@
+from types import ModuleType
+from typing import Callable, Dict, Iterable, Tuple
+import importlib, sys, threading
+
+_PROXIES: Dict[str, "LazyModule"] = {}
+_LOCK = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Once loaded, the module's attributes are copied onto the stand-in, so later
+    lookups cost the same as on the real module. Submodules are imported on access,
+    as if imported with `import package.submodule`.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_hooks"] = []
+        self.__dict__["_lazy_module"] = None
+
+    def _lazy_load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        # Load lazy parent packages first, so their hooks run before the submodule is imported.
+        parent = self.__name__.rpartition(".")[0]
+        if parent in _PROXIES:
+            _PROXIES[parent]._lazy_load()
+        # The import itself is thread-safe; the lock only ensures the hooks run once.
+        module = importlib.import_module(self.__name__)
+        with _LOCK:
+            if self.__dict__["_lazy_module"] is None:
+                for hook in self.__dict__["_lazy_hooks"]:
+                    hook(module)
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        module = self._lazy_load()
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            # Mirror `import package.submodule`, which makes the submodule an attribute.
+            if name.startswith("__"):
+                raise
+            try:
+                return importlib.import_module(f"{self.__name__}.{name}")
+            except ModuleNotFoundError as error:
+                if error.name != f"{self.__name__}.{name}":
+                    raise
+            raise
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, on_load: Callable[[ModuleType], None] = None) -> ModuleType:
+    """
+    Import a module lazily.
+
+    Parameters
+    ----------
+    name : str
+        The absolute name of the module, e.g. "shapely.geometry".
+    on_load : Callable[[ModuleType], None], optional
+        A function called with the module once it is imported, e.g. to configure it.
+
+    Returns
+    -------
+    ModuleType
+        A stand-in that imports the module on first attribute access, or at once if
+        it is already imported.
+
+    Examples
+    --------
+    >>> from libs.utils.lazy import lazy_import
+    >>> pd = lazy_import("pandas")
+    >>> matplotlib = lazy_import("matplotlib", on_load=lambda m: m.use("Agg"))
+    >>> plt = lazy_import("matplotlib.pyplot")
+
+    Notes
+    -----
+    Attributes used at import time (base classes, decorators, default values and,
+    without `from __future__ import annotations`, annotations) load the module
+    immediately, so lazily imported modules should only be used inside functions.
+    """
+
+    with _LOCK:
+        module = _PROXIES.get(name)
+        if module is None:
+            module = _PROXIES[name] = LazyModule(name)
+        if on_load:
+            if module.__dict__["_lazy_module"] is not None:
+                on_load(module.__dict__["_lazy_module"])
+            else:
+                module.__dict__["_lazy_hooks"].append(on_load)
+        if name in sys.modules:
+            # Load already imported modules now; the stand-in still imports submodules on access.
+            module._lazy_load()
+        return module
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build the module `__getattr__` and `__dir__` of a package with lazy exports.
+
+    Parameters
+    ----------
+    package : str
+        The name of the package, usually `__name__`.
+    exports : Dict[str, str]
+        The exported names, mapped to the module defining them.
+
+    Returns
+    -------
+    Tuple[Callable, Callable]
+        The `__getattr__` and `__dir__` functions for the package (PEP 562).
+
+    Example
+    -------
+    >>> __getattr__, __dir__ = lazy_exports(
+    >>>     __name__, {"OnSpotAPI": "libs.openapi.clients.onspot"}
+    >>> )
+    """
+
+    module = sys.modules[package]
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(exports[name]), name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> Iterable[str]:
+        return sorted(set(module.__dict__) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,4 +1,6 @@
-import numpy as np
+from libs.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
 
 def auto_zoom_level(geometries, fig_width=600, fig_height=600, margin=1.5):
     """
@@ -1,3 +1,4 @@
+from libs.utils.import_profiler import profile
 from pathlib import Path
 import importlib.util
 import os
@@ -35,6 +36,8 @@ def load(path: str, file_mode: str = "init", depth: int = 0):
     It recursively traverses subdirectories based on the specified depth and filters modules based on the file mode.
 
     The loaded modules are returned as a list of module objects.
+    When import profiling is enabled (see `libs.utils.import_profiler`), the import of
+    each module is measured.
 
     Examples
     --------
@@ -71,7 +74,8 @@ def load(path: str, file_mode: str = "init", depth: int = 0):
                             module_name, os.path.join(root, file)
                         )
                         module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
+                        with profile(module_name):
+                            spec.loader.exec_module(module)
                         modules.append(module)
                     else:
                         modules.append(sys.modules[module_name])
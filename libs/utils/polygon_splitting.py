@@ -1,14 +1,24 @@
+from concurrent.futures import ProcessPoolExecutor
 from math import hypot
 from numpy import arctan2, degrees
 from pyproj import Geod
 from shapely.geometry import Polygon, LineString, Point, GeometryCollection
 from shapely.ops import split
 from shapely.affinity import rotate
+from typing import Callable, Union
 import geojson, orjson as json
 
 
 def polygon_splitting_wrapper(
-    feature, axis="minor", max_area=2.8, export_path=False, prints=False
+    feature,
+    axis="minor",
+    max_area=2.8,
+    export_path=False,
+    prints=False,
+    max_vertices=None,
+    device_density=None,
+    max_devices=None,
+    processes=None,
 ):
     """
     Take in a geojson feature and split it up into polygons until all are smaller than a max area
@@ -21,6 +31,8 @@ def polygon_splitting_wrapper(
         export_path:    export path of the final file (if exporting)
                             will export to a file based on the "name" property of the input feature
         prints:         binary flag to print info on the end result
+        max_vertices, device_density, max_devices, processes:
+                        additional stop criteria and parallelism, see split_iterative
     Returns:
         a geojson string FeatureCollection of polygons if export is false
         nothing if export is true, instead writing to a file
@@ -29,7 +41,15 @@ def polygon_splitting_wrapper(
         only supports polygon features, not multipolys yet
     """
     # do the actual work
-    splits = split_recursive(polygonify(feature), axis=axis, max_area=max_area)
+    splits = split_iterative(
+        polygonify(feature),
+        axis=axis,
+        max_area=max_area,
+        max_vertices=max_vertices,
+        device_density=device_density,
+        max_devices=max_devices,
+        processes=processes,
+    )
 
     # if you want to print info on the end results, do that
     if prints:
@@ -90,7 +110,7 @@ def dictify_geojson(feature):
 
 def split_recursive(polygon, axis="minor", max_area=2.8):
     """
-    recursively splits a shapely polygon into parts that are all smaller than the max_area
+    splits a shapely polygon into parts that are all smaller than the max_area
 
     Args:
         polygon:    shapely polygon to split up
@@ -99,27 +119,94 @@ def split_recursive(polygon, axis="minor", max_area=2.8):
                         defaults to 2.8 km^2 or 2,800,000 m^2
     Returns:
         shapely GeometryCollection of the split parts
+
+    Notes:
+        kept for compatibility, the work is done by split_iterative and doesn't recurse anymore
     """
+    return split_iterative(polygon, axis=axis, max_area=max_area)
+
+
+def split_iterative(
+    polygon,
+    axis="minor",
+    max_area: float = 2.8,
+    max_vertices: int = None,
+    device_density: Union[float, Callable[[Polygon], float]] = None,
+    max_devices: float = None,
+    processes: int = None,
+):
+    """
+    splits a shapely polygon in halves with a work queue until every part meets the stop criteria
+
+    Args:
+        polygon:        shapely polygon to split up
+        axis:           the type of split by axis (vertical, horizontal, minor)
+        max_area:       the maximum area of each part in km^2, or None for no area limit
+                            defaults to 2.8 km^2 or 2,800,000 m^2
+        max_vertices:   the maximum number of exterior vertices of each part, or None for no limit
+        device_density: estimated devices per km^2, either a number or a function of the part (e.g. a lookup
+                            against device counts of the area), used with max_devices
+        max_devices:    the maximum estimated number of devices in each part (density times area)
+        processes:      number of worker processes that split the parts of each round, by default none
+    Returns:
+        shapely GeometryCollection of the split parts, in the same order as split_recursive would produce them
+
+    Notes:
+        a part that a split can't divide any further is kept as it is, rather than split forever
+    """
+
+    def done(part):
+        area = polygon_area(part)
+        if max_area is not None and area > max_area:
+            return False
+        if max_vertices is not None and len(part.exterior.coords) - 1 > max_vertices:
+            return False
+        if max_devices is not None and device_density is not None:
+            density = device_density(part) if callable(device_density) else device_density
+            if density * area > max_devices:
+                return False
+        return True
+
+    # each part is keyed by its path of split indexes, so sorting the keys gives depth-first order
+    finished = []
+    queue = [((), polygon)]
+    executor = ProcessPoolExecutor(max_workers=processes) if processes else None
+    try:
+        while queue:
+            pending = []
+            for key, part in queue:
+                (finished if done(part) else pending).append((key, part))
+
+            if executor and len(pending) > 1:
+                halves = list(
+                    executor.map(
+                        split_polygon,
+                        [part for _, part in pending],
+                        [axis] * len(pending),
+                        chunksize=max(1, len(pending) // (4 * processes)),
+                    )
+                )
+            else:
+                halves = [split_polygon(part, axis=axis) for _, part in pending]
+
+            queue = []
+            for (key, part), split_parts in zip(pending, halves):
+                if len(split_parts.geoms) < 2:
+                    # the splitter missed the part, so it can't get any smaller
+                    finished.append((key, part))
+                    continue
+                queue.extend(
+                    (key + (index,), split_part)
+                    for index, split_part in enumerate(split_parts.geoms)
+                )
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return GeometryCollection([part for _, part in sorted(finished, key=lambda item: item[0])])
 
-    # if this polygon is smaller than max area, coolio
-    if polygon_area(polygon) <= max_area:
-        return GeometryCollection(geoms=[polygon])
-    else:
-        # if it's too big, split it in half
-        polys = split_polygon(polygon, axis=axis)
-        # make an empty list for what we end up with
-        split_geoms = []
-        # for each of the split polys, redo this until they're all smaller than the max
-        for poly in polys.geoms:
-            # adding the new split parts to the existing polys for this chunk
-            split_geoms = split_geoms + [
-                split_poly
-                for split_poly in split_recursive(
-                    poly, axis=axis, max_area=max_area
-                ).geoms
-            ]
 
-        return GeometryCollection(split_geoms)
+_GEOD = Geod(ellps="WGS84")
 
 
 def polygon_area(polygon):
@@ -131,7 +218,7 @@ def polygon_area(polygon):
     Returns:
         The area of that polygon in square kilometers
     """
-    return abs(Geod(ellps="WGS84").geometry_area_perimeter(polygon)[0]) / 1e6
+    return abs(_GEOD.geometry_area_perimeter(polygon)[0]) / 1e6
 
 
 def azimuth(mrr):
@@ -1,6 +1,10 @@
 # from dotenv import load_dotenv  # pip install as  `python-dotenv`
-import ast, orjson as json, os, pandas as pd
-from fuzzywuzzy import fuzz, process
+from __future__ import annotations
+from libs.utils.lazy import lazy_import
+import ast, orjson as json, os
+
+fuzzywuzzy = lazy_import("fuzzywuzzy")
+pd = lazy_import("pandas")
 
 # def load_env():
 #     """
@@ -18,7 +22,7 @@ def load_local_settings():
         for key, value in env.items():
             os.environ[key] = value
 
-def fuzzy_merge(left:pd.DataFrame, right:pd.DataFrame, left_on:str, right_on:str, threshold:int=90, limit:int=None, scorer=fuzz.ratio) -> pd.DataFrame:
+def fuzzy_merge(left:pd.DataFrame, right:pd.DataFrame, left_on:str, right_on:str, threshold:int=90, limit:int=None, scorer=None) -> pd.DataFrame:
     """
     Merge two dataframes on a string column using fuzzy matching with a given threshold.
 
@@ -29,6 +33,7 @@ def fuzzy_merge(left:pd.DataFrame, right:pd.DataFrame, left_on:str, right_on:str
     right_on : The key column for the right DataFrame
     threshold: How close the threshold should be to return a match, based on fuzzywuzzy's Levenshtein distance
     limit: The maximum amount of matches that will get returned for a single record
+    scorer: The fuzzywuzzy scorer used to compare strings, fuzz.ratio by default
 
     Returns
     m2 : A merged Pandas DataFrame indexed according to the left dataframe, with the right_index included as an integer column.
@@ -36,7 +41,7 @@ def fuzzy_merge(left:pd.DataFrame, right:pd.DataFrame, left_on:str, right_on:str
     """
 
     # get the top matches up to a certain limit per entry
-    matches = left[left_on].apply(lambda x: process.extract(query=x, choices=right[right_on], limit=limit,  scorer=scorer))
+    matches = left[left_on].apply(lambda x: fuzzywuzzy.process.extract(query=x, choices=right[right_on], limit=limit,  scorer=scorer or fuzzywuzzy.fuzz.ratio))
 
     # explode each match tuple and filter by match strength
     m = pd.DataFrame(matches.explode())
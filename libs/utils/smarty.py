@@ -1,9 +1,11 @@
-from smartystreets_python_sdk import StaticCredentials, ClientBuilder, Batch
-from smartystreets_python_sdk.us_street import Lookup as StreetLookup
-import pandas as pd
-import os
+from __future__ import annotations
 from libs.azure.key_vault import KeyVaultClient
-from fuzzywuzzy import fuzz
+from libs.utils.lazy import lazy_import
+import os
+
+fuzzywuzzy = lazy_import("fuzzywuzzy")
+pd = lazy_import("pandas")
+smartystreets_python_sdk = lazy_import("smartystreets_python_sdk")
 
 def get_items_recursive(obj, dict={}):
     """
@@ -78,21 +80,21 @@ def bulk_validate(
             df[col] = df[col].astype(str)
 
     # authentication
-    credentials = StaticCredentials(smarty_id, smarty_token)
+    credentials = smartystreets_python_sdk.StaticCredentials(smarty_id, smarty_token)
     # launch the street lookup client
     client = (
-        ClientBuilder(credentials)
+        smartystreets_python_sdk.ClientBuilder(credentials)
         .with_licenses([smarty_license])
         .build_us_street_api_client()
     )
 
     # initialize the first batch and the list to store results
-    batch = Batch()
+    batch = smartystreets_python_sdk.Batch()
     data_list = []
 
     # build batches and send lookups
     for i, row in df.reset_index(drop=True).iterrows():
-        lookup = StreetLookup()
+        lookup = smartystreets_python_sdk.us_street.Lookup()
 
         # add data for the address field
         lookup.street = row[address_col]
@@ -144,7 +146,7 @@ def bulk_validate(
                     )
 
             # restart an empty Batch
-            batch = Batch()
+            batch = smartystreets_python_sdk.Batch()
 
     # prevent duplicate columns in the output by dropping the original column for any name conflicts
     dupe_cols = [col for col in list(data_list[0].keys()) if col in df.columns]
@@ -197,7 +199,7 @@ def detect_column_names(cols:list, override_mappings:dict={}) -> dict:
         # otherwise, use fuzzy matching to find the best match
         else:
             column_scores = [
-                max([fuzz.WRatio(column.upper(), default.upper()) for default in defaults])
+                max([fuzzywuzzy.fuzz.WRatio(column.upper(), default.upper()) for default in defaults])
                 for column in cols
             ]
             if key == 'state':
@@ -1,6 +1,8 @@
 import pytz
-from timezonefinder import TimezoneFinder
 from datetime import datetime as dt
+from libs.utils.lazy import lazy_import
+
+timezonefinder = lazy_import("timezonefinder")
 
 
 def local_time_to_utc(local_time: dt, local_timezone: pytz.timezone) -> dt:
@@ -19,7 +21,7 @@ def get_local_timezone(latitude: float, longitude: float) -> pytz.timezone:
     Given a latlong, return the pytz timezone of that point.
     """
     # initialize the timezone objects
-    tf = TimezoneFinder()
+    tf = timezonefinder.TimezoneFinder()
     # returns the closest reasonable candidate, even if the point is not strictly in a timezone polygon
 
     # get end time in local timezone
@@ -0,0 +1,66 @@
+from pathlib import Path
+import json, subprocess, sys, textwrap
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that defer their heavy dependencies with libs.utils.lazy.lazy_import.
+LAZY_MODULES = [
+    "libs.utils",
+    "libs.utils.h3",
+    "libs.utils.geometry",
+    "libs.utils.plots",
+    "libs.utils.smarty",
+    "libs.utils.esquire.movers.mover_engine",
+    "libs.utils.esquire.point_of_interest.poi_engine",
+    *sorted(
+        f"libs.utils.esquire.onspot_graphics.{path.stem}"
+        for path in (ROOT / "libs/utils/esquire/onspot_graphics").glob("*.py")
+        if path.stem != "__init__"
+    ),
+    "libs.openapi.clients",
+]
+
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "shapely",
+    "geopandas",
+    "sklearn",
+    "matplotlib",
+    "seaborn",
+    "plotly",
+    "fuzzywuzzy",
+]
+
+SCRIPT = textwrap.dedent(
+    """
+    import importlib, json, sys
+
+    modules, heavy = json.loads(sys.argv[1])
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ModuleNotFoundError as error:
+            if error.name and not error.name.startswith("libs"):
+                print(json.dumps({"missing": error.name}))
+                sys.exit(0)
+            raise
+    print(json.dumps({"loaded": [m for m in heavy if m in sys.modules]}))
+    """
+)
+
+
+def test_importing_libs_does_not_load_heavy_modules():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, json.dumps([LAZY_MODULES, HEAVY_MODULES])],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if "missing" in report:
+        pytest.skip(f"The '{report['missing']}' dependency is not installed.")
+    assert report["loaded"] == []
@@ -0,0 +1,25 @@
+import pytest
+
+
+def test_tiered_provider_from_scheme_tiers_round_trips():
+    try:
+        from libs.data import from_bind, register_binding
+    except ModuleNotFoundError as error:
+        if error.name and error.name.startswith("libs"):
+            raise
+        pytest.skip(f"The '{error.name}' dependency is not installed.")
+
+    register_binding(
+        "test_tiered_schemes",
+        "KeyValue",
+        "tiered",
+        tiers=[{"scheme": "ram", "max_entries": 1}, {"scheme": "ram"}],
+    )
+    provider = from_bind("test_tiered_schemes")
+    provider.save("a", 1)
+    provider.save("b", 2)
+    # "a" was evicted from the bounded first tier and is read back from the second
+    assert provider.load("a") == 1
+    assert provider.load("b") == 2
+    with pytest.raises(KeyError):
+        provider.load("c")